@@ -5,9 +5,11 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_socketio import SocketIO
 
+from app.db_routing import RoutingSession, init_routing
+from app.json_provider import init_json
 from config import config
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 socketio = SocketIO(cors_allowed_origins="*", async_mode="threading")
 
@@ -68,7 +70,8 @@ def create_app(config_name: str = None) -> Flask:
     db.init_app(app)
     migrate.init_app(app, db)
     CORS(app)
-    socketio.init_app(app)
+    socketio.init_app(app, json=init_json(app))
+    init_routing(app)
 
     # Register blueprints
     from app.routes.events import events_bp
@@ -96,4 +99,19 @@ def create_app(config_name: str = None) -> Flask:
     def health():
         return {"status": "healthy"}
 
+    # Dependency health from the background monitor's latest probes
+    @app.route("/health/deep")
+    def health_deep():
+        from app.services.health_monitor import health_monitor
+
+        health_monitor.ensure_started()
+        checks = health_monitor.snapshot()
+        if checks["database"]["ok"] is False:
+            status, code = "unhealthy", 503
+        elif all(check["ok"] for check in checks.values()):
+            status, code = "healthy", 200
+        else:
+            status, code = "degraded", 200
+        return {"status": status, "checks": checks}, code
+
     return app
@@ -0,0 +1,160 @@
+"""
+Read-replica routing.
+
+Replicas are listed in DATABASE_REPLICA_URLS (comma-separated) and registered
+as the ``replica_<n>`` binds. Blueprints wrapped with ``replica_reads`` send
+the SELECTs of their GET requests to a replica whose replication lag is at
+most REPLICA_MAX_LAG seconds, chosen once per request. Everything else goes
+to the primary: writes, requests from the first write on, views decorated
+with ``read_from_primary`` (read-your-writes paths), and every read when no
+replica is configured or fresh enough.
+"""
+import itertools
+import math
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+from flask import Blueprint, current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+REPLICA_PREFIX = "replica_"
+
+# Seconds the replica is behind; 0 when it replayed everything it received
+# (an idle primary leaves pg_last_xact_replay_timestamp() old), NULL when
+# nothing was replayed yet. A replica whose WAL receiver is not streaming, or
+# has heard nothing from the primary for :max_lag seconds, is NULL too: it
+# keeps replaying what it already received, so its LSNs match however far
+# behind it is (pg_stat_wal_receiver needs pg_read_all_stats)
+_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver "
+    "WHERE status = 'streaming' "
+    "AND last_msg_receipt_time >= now() - make_interval(secs => :max_lag)) THEN NULL "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+@lru_cache(maxsize=None)
+def _probe_engine(engine, timeout: float):
+    """
+    Unpooled engine on ``engine``'s database for lag checks, giving up after
+    ``timeout`` seconds to connect or to answer.
+    """
+    return create_engine(
+        engine.url,
+        poolclass=NullPool,
+        connect_args={
+            "connect_timeout": max(1, math.ceil(timeout)),
+            "options": f"-c statement_timeout={int(timeout * 1000)}",
+        },
+    )
+
+
+class ReplicaRouter:
+    """Tracks replica lag and picks a fresh replica for each request."""
+
+    def __init__(self):
+        self._lag: dict[str, Optional[float]] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+
+    @staticmethod
+    def replica_keys(engines) -> list[str]:
+        return sorted(k for k in engines if k and k.startswith(REPLICA_PREFIX))
+
+    @staticmethod
+    def measure_lag(engine) -> Optional[float]:
+        """
+        Replication lag of ``engine`` in seconds, None when unknown or
+        unreachable. Checked on a separate connection with
+        REPLICA_LAG_CHECK_TIMEOUT, so an unreachable replica only delays the
+        request that re-measures by that long.
+        """
+        if engine.dialect.name != "postgresql":
+            return 0.0
+        config = current_app.config
+        try:
+            probe = _probe_engine(engine, config["REPLICA_LAG_CHECK_TIMEOUT"])
+            with probe.connect() as conn:
+                lag = conn.execute(_LAG_QUERY, {"max_lag": config["REPLICA_MAX_LAG"]}).scalar()
+        except Exception as e:
+            current_app.logger.warning(f"Replica lag check failed: {e}")
+            return None
+        return None if lag is None else float(lag)
+
+    def fresh_replicas(self, engines) -> list[str]:
+        """Replicas within REPLICA_MAX_LAG, re-measured every REPLICA_LAG_CHECK_INTERVAL s."""
+        keys = self.replica_keys(engines)
+        if not keys:
+            return []
+        config = current_app.config
+        stale = time.monotonic() - self._checked_at >= config["REPLICA_LAG_CHECK_INTERVAL"]
+        # One request re-measures; the others keep using the previous results
+        if stale and self._lock.acquire(blocking=False):
+            try:
+                self._lag = {key: self.measure_lag(engines[key]) for key in keys}
+                self._checked_at = time.monotonic()
+            finally:
+                self._lock.release()
+        max_lag = config["REPLICA_MAX_LAG"]
+        return [k for k in keys if self._lag.get(k) is not None and self._lag[k] <= max_lag]
+
+    def choose(self, engines) -> Optional[str]:
+        """Bind key of a fresh replica (round robin), or None for the primary."""
+        fresh = self.fresh_replicas(engines)
+        if not fresh:
+            return None
+        return fresh[next(self._turn) % len(fresh)]
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(Session):
+    """Session sending the SELECTs of replica-routed requests to a replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context() and g.get("read_replica"):
+            if self._flushing or not getattr(clause, "is_select", False):
+                # Read-your-writes: the rest of the request uses the primary
+                g.read_replica = False
+            else:
+                if "replica_key" not in g:
+                    g.replica_key = replica_router.choose(self._db.engines)
+                if g.replica_key is not None:
+                    return self._db.engines[g.replica_key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_routing(app):
+    """Forget each request's routing once it ends (app contexts can outlive it)."""
+
+    @app.teardown_request
+    def reset_routing(exc=None):
+        g.pop("read_replica", None)
+        g.pop("replica_key", None)
+
+
+def replica_reads(blueprint: Blueprint) -> Blueprint:
+    """Route the GET requests of ``blueprint`` to read replicas."""
+
+    @blueprint.before_request
+    def route_reads_to_replica():
+        view = current_app.view_functions.get(request.endpoint)
+        g.read_replica = request.method in ("GET", "HEAD") and not getattr(
+            view, "read_from_primary", False
+        )
+
+    return blueprint
+
+
+def read_from_primary(view):
+    """Keep a GET view of a replica-routed blueprint on the primary."""
+    view.read_from_primary = True
+    return view
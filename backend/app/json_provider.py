@@ -0,0 +1,94 @@
+"""
+JSON encoding for responses, request bodies and Socket.IO payloads.
+
+JSON_PROVIDER selects the implementation. "orjson" (the default) encodes and
+decodes in C, with native datetime, UUID, enum and dataclass support, several
+times faster than the stdlib on event pages and ingest batches (see
+tests/integration/test_json_benchmark.py). "default" keeps Flask's stdlib
+provider, which is also used when orjson is not installed.
+
+Unlike Flask's provider, keys are not sorted (they keep the order to_dict()
+builds them in) and datetimes are encoded as ISO 8601, like to_dict() does.
+"""
+import dataclasses
+import decimal
+import json
+from typing import Any
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not encode natively, as Flask's provider encodes them."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _options(sort_keys: bool = False, indent: bool = False) -> int:
+    options = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        options |= orjson.OPT_SORT_KEYS
+    if indent:
+        options |= orjson.OPT_INDENT_2
+    return options
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.dumps_bytes(obj, **kwargs).decode()
+
+    def dumps_bytes(self, obj: Any, **kwargs: Any) -> bytes:
+        options = _options(kwargs.get("sort_keys", self.sort_keys), bool(kwargs.get("indent")))
+        return orjson.dumps(obj, default=_default, option=options)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Indented in debug mode, as Flask's provider does
+        body = self.dumps_bytes(obj, indent=self._app.debug)
+        return self._app.response_class(body, mimetype="application/json")
+
+
+class SocketIOJSON:
+    """json module for python-socketio packets (no app context needed)."""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_options()).decode()
+
+    @staticmethod
+    def loads(s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+def init_json(app):
+    """
+    Install the JSON_PROVIDER provider on ``app`` and return the json module
+    to give Socket.IO. The stdlib module is returned explicitly rather than
+    None: python-socketio keeps the module of the previous app otherwise,
+    since it sets it on its packet class.
+    """
+    if app.config["JSON_PROVIDER"] == "orjson" and orjson is not None:
+        app.json = OrjsonProvider(app)
+        return SocketIOJSON
+    if app.config["JSON_PROVIDER"] == "orjson":
+        app.logger.warning("orjson is not installed, using the stdlib JSON provider")
+    app.json = DefaultJSONProvider(app)
+    return json
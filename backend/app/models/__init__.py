@@ -2,6 +2,9 @@ from app.models.event import Event, EventStatus, EventSeverity, EventSource
 from app.models.alert_rule import AlertRule, AlertAction
 from app.models.user import User, UserRole
 from app.models.incident import Incident, IncidentStatus, IncidentSeverity
+from app.models.baseline import EventBaseline
+from app.models.rollup import EventRollup
+from app.models.sketch import SketchBucket
 from app.models.playbook import (
     Playbook,
     PlaybookExecution,
@@ -29,4 +32,7 @@ __all__ = [
     "Incident",
     "IncidentStatus",
     "IncidentSeverity",
+    "EventBaseline",
+    "EventRollup",
+    "SketchBucket",
 ]
@@ -36,6 +36,11 @@ class AlertRule(db.Model):
     last_triggered = db.Column(db.DateTime)
     trigger_count = db.Column(db.Integer, default=0)
 
+    # Cooldown bookkeeping per group key:
+    # {"site_001": {"last_notified": "2025-01-15T10:30:00", "suppressed": 12}}
+    # where "suppressed" counts the events matched but not notified
+    suppression_state = db.Column(JSONB, default={})
+
     def to_dict(self) -> dict:
         """Serialize rule to dictionary."""
         return {
@@ -49,5 +54,9 @@ class AlertRule(db.Model):
             'severity': self.severity,
             'created_at': self.created_at.isoformat(),
             'last_triggered': self.last_triggered.isoformat() if self.last_triggered else None,
-            'trigger_count': self.trigger_count
+            'trigger_count': self.trigger_count,
+            'suppressed_count': sum(
+                entry.get('suppressed', 0)
+                for entry in (self.suppression_state or {}).values()
+            )
         }
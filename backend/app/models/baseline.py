@@ -0,0 +1,26 @@
+from datetime import datetime
+from app import db
+
+
+class EventBaseline(db.Model):
+    """
+    Persisted hourly volume baseline for one (site_id, event_type) pair.
+
+    The EWMA mean, variance and sample count for each of the 168
+    hours-of-week are stored as packed float/short arrays, so a site's
+    whole weekly profile is one small row.
+    """
+
+    __tablename__ = "event_baselines"
+
+    site_id = db.Column(db.String(50), primary_key=True)
+    event_type = db.Column(db.String(100), primary_key=True)
+    means = db.Column(db.LargeBinary, nullable=False)
+    variances = db.Column(db.LargeBinary, nullable=False)
+    samples = db.Column(db.LargeBinary, nullable=False)
+    # Hour (since epoch) still being counted, and its running count
+    open_hour = db.Column(db.BigInteger, nullable=False, default=-1)
+    open_count = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -1,8 +1,8 @@
-import uuid
 import enum
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID
 from app import db
+from app.models.ids import uuid7
 
 
 class IncidentStatus(enum.Enum):
@@ -25,7 +25,7 @@ class Incident(db.Model):
 
     __tablename__ = "incidents"
 
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
 
@@ -4,6 +4,7 @@ from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm.attributes import flag_modified
 from app import db
+from app.models.ids import uuid7
 
 
 class PlaybookStatus(enum.Enum):
@@ -105,7 +106,7 @@ class PlaybookExecution(db.Model):
     """Individual execution/run of a playbook."""
     __tablename__ = 'playbook_executions'
 
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     playbook_id = db.Column(UUID(as_uuid=True), db.ForeignKey('playbooks.id'), nullable=False)
 
     # Optional link to triggering alert/event
@@ -0,0 +1,21 @@
+from app import db
+
+
+class EventRollup(db.Model):
+    """
+    Per-minute event counts by source, severity, status, event type and site.
+
+    Maintained at ingest (and on status changes) so the dashboard aggregates
+    a bounded number of pre-counted rows instead of scanning raw events.
+    Keepalive heartbeats are not counted. Events without a site use ''.
+    """
+
+    __tablename__ = "event_rollups"
+
+    bucket = db.Column(db.DateTime, primary_key=True)  # start of the minute (UTC)
+    source = db.Column(db.String(30), primary_key=True)
+    severity = db.Column(db.String(20), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    event_type = db.Column(db.String(100), primary_key=True)
+    site_id = db.Column(db.String(50), primary_key=True, default="")
+    count = db.Column(db.Integer, nullable=False, default=0)
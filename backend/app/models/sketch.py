@@ -0,0 +1,23 @@
+from datetime import datetime
+from app import db
+
+
+class SketchBucket(db.Model):
+    """
+    Serialized streaming sketch for one time bucket and one dimension.
+
+    ``kind`` names the sketch family ("topk" Space-Saving heavy hitters per
+    hour, "distinct" HyperLogLog counters per day) and ``dimension`` what it
+    summarizes (site, ip, user, host). Sketches of consecutive buckets merge
+    into a summary of any window of whole buckets.
+    """
+
+    __tablename__ = "sketch_buckets"
+
+    bucket = db.Column(db.DateTime, primary_key=True)  # start of the hour or day (UTC)
+    kind = db.Column(db.String(20), primary_key=True)
+    dimension = db.Column(db.String(30), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -1,10 +1,47 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app import db
 from app.models import AlertRule, AlertAction
+from app.services.rule_cost import estimate_rule_cost
+from app.services.rule_dsl import compile_expression, RuleSyntaxError
 
 alerts_bp = Blueprint('alerts', __name__)
 
 
+def _check_rule_cost(condition):
+    """
+    Run the cost guardrails on a condition.
+    Returns (report, error_response); error_response is set when the rule
+    is over budget and enforcement is "reject".
+    """
+    if not isinstance(condition, dict):
+        return None, (jsonify({'error': 'condition must be a JSON object'}), 400)
+
+    for key in ('timeframe', 'cooldown'):
+        if key in condition and not isinstance(condition[key], str):
+            return None, (jsonify({'error': f'{key} must be a string such as "10m"'}), 400)
+    for key in ('count', 'min_count', 'sigma'):
+        if key in condition and (
+            isinstance(condition[key], bool)
+            or not isinstance(condition[key], (int, float))
+            or condition[key] <= 0
+        ):
+            return None, (jsonify({'error': f'{key} must be a positive number'}), 400)
+
+    if 'match' in condition:
+        try:
+            compile_expression(condition['match'])
+        except RuleSyntaxError as e:
+            return None, (jsonify({'error': f'Invalid match expression: {e}'}), 400)
+
+    report = estimate_rule_cost(condition)
+    if report['over_budget'] and current_app.config['RULE_COST_ENFORCEMENT'] == 'reject':
+        return report, (jsonify({
+            'error': 'Rule condition exceeds the evaluation budget',
+            'cost': report
+        }), 400)
+    return report, None
+
+
 @alerts_bp.route('/alerts/rules', methods=['GET'])
 def list_rules():
     """List all alert rules."""
@@ -55,6 +92,10 @@ def create_rule():
             'error': f"Invalid action: {action}. Must be one of: {[a.value for a in AlertAction]}"
         }), 400
 
+    cost, error = _check_rule_cost(data['condition'])
+    if error:
+        return error
+
     rule = AlertRule(
         name=data['name'],
         description=data.get('description'),
@@ -68,7 +109,19 @@ def create_rule():
     db.session.add(rule)
     db.session.commit()
 
-    return jsonify(rule.to_dict()), 201
+    return jsonify({**rule.to_dict(), 'cost': cost}), 201
+
+
+@alerts_bp.route('/alerts/rules/estimate', methods=['POST'])
+def estimate_rule():
+    """Estimate the evaluation cost of a condition without saving it."""
+    data = request.get_json()
+    if not data or 'condition' not in data:
+        return jsonify({'error': 'Expected {"condition": {...}}'}), 400
+    report, error = _check_rule_cost(data['condition'])
+    if report is None:
+        return error
+    return jsonify(report)
 
 
 @alerts_bp.route('/alerts/rules/<uuid:rule_id>', methods=['GET'])
@@ -84,6 +137,12 @@ def update_rule(rule_id):
     rule = AlertRule.query.get_or_404(rule_id)
     data = request.get_json()
 
+    cost = None
+    if 'condition' in data:
+        cost, error = _check_rule_cost(data['condition'])
+        if error:
+            return error
+
     if 'name' in data:
         rule.name = data['name']
     if 'description' in data:
@@ -103,7 +162,7 @@ def update_rule(rule_id):
         rule.enabled = data['enabled']
 
     db.session.commit()
-    return jsonify(rule.to_dict())
+    return jsonify({**rule.to_dict(), 'cost': cost})
 
 
 @alerts_bp.route('/alerts/rules/<uuid:rule_id>', methods=['DELETE'])
@@ -1,9 +1,12 @@
-from flask import Blueprint, jsonify, request
-from sqlalchemy import func, case
+from flask import Blueprint, current_app, g, jsonify, request
+from sqlalchemy import and_, func, case, cast, literal, select, union_all
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-import os
-import requests as http_requests
+from functools import partial
+from typing import Optional
+from urllib.parse import urlencode
 from app import db
+from app.db_routing import replica_reads
 from app.models import (
     Event,
     EventStatus,
@@ -12,161 +15,155 @@ from app.models import (
     Incident,
     IncidentStatus,
     AlertRule,
+    EventRollup,
+)
+from app.services.health_monitor import health_monitor
+from app.services.response_cache import cached_response, response_cache
+from app.services.timeseries import fill_gaps, lttb
+from app.services.sketches import (
+    DIMENSIONS,
+    DISTINCT,
+    DISTINCT_DIMENSIONS,
+    TOPK,
+    day_bucket,
+    sketch_store,
 )
 
-dashboard_bp = Blueprint("dashboard", __name__)
-
-# ── GLPI reachability cache ────────────────────────────────────────────────────
-# Cached so the blocking HTTP call only runs once every 30 s, not on every request.
-_glpi_cache: dict = {"alive": False, "checked_at": None}
-_GLPI_CACHE_TTL = 30  # seconds
+dashboard_bp = replica_reads(Blueprint("dashboard", __name__))
 
 
 def _glpi_alive() -> bool:
-    """Return True if GLPI is reachable, using a 30-second TTL cache."""
-    now = datetime.utcnow()
-    if _glpi_cache["checked_at"] is not None:
-        age = (now - _glpi_cache["checked_at"]).total_seconds()
-        if age < _GLPI_CACHE_TTL:
-            return _glpi_cache["alive"]
-    # Probe GLPI
-    alive = False
-    try:
-        glpi_url = os.environ.get("GLPI_URL", "http://glpi-crm/apirest.php")
-        app_token = os.environ.get("GLPI_APP_TOKEN", "")
-        resp = http_requests.get(
-            f"{glpi_url}/initSession",
-            headers={"App-Token": app_token},
-            timeout=2,  # short timeout — cached result used most of the time
-        )
-        alive = resp.status_code < 500
-    except Exception:
-        alive = False
-    _glpi_cache["alive"] = alive
-    _glpi_cache["checked_at"] = now
-    return alive
+    """Whether GLPI answered its latest background health probe."""
+    health_monitor.ensure_started()
+    latest = health_monitor.latest("glpi")
+    return bool(latest and latest["ok"])
 
 
 @dashboard_bp.route("/dashboard/stats", methods=["GET"])
+@cached_response
 def get_stats():
     """Get dashboard statistics."""
-    now = datetime.utcnow()
-    last_24h = now - timedelta(hours=24)
-    last_7d = now - timedelta(days=7)
-
-    # Base filter: exclude keepalive heartbeats from all stats
-    security_events = Event.query.filter(Event.event_type != 'keepalive')
+    return jsonify(compute_stats())
 
-    # Total events
-    total_events = security_events.count()
 
-    # Events in last 24h
-    events_24h = security_events.filter(Event.timestamp >= last_24h).count()
+def compute_stats() -> dict:
+    """
+    Dashboard statistics.
 
-    # Events in previous 24h (for trend comparison)
+    Every KPI is a conditional aggregate (SUM ... FILTER) over one scan of
+    the per-minute rollups; rule triggers and open incidents are scalar
+    subqueries of the same statement, so the endpoint costs one round-trip.
+    """
+    now = datetime.utcnow()
+    last_24h = now - timedelta(hours=24)
     prev_24h_start = last_24h - timedelta(hours=24)
-    events_prev_24h = security_events.filter(
-        Event.timestamp >= prev_24h_start, Event.timestamp < last_24h
-    ).count()
-
-    # Critical open in previous 24h (for trend comparison)
-    critical_prev_24h = security_events.filter(
-        Event.severity == EventSeverity.CRITICAL,
-        Event.status.in_([EventStatus.NEW, EventStatus.INVESTIGATING]),
-        Event.created_at >= prev_24h_start,
-        Event.created_at < last_24h,
-    ).count()
-
-    # Events by status
-    status_counts = dict(
-        db.session.query(Event.status, func.count(Event.id))
-        .filter(Event.event_type != 'keepalive')
-        .group_by(Event.status)
-        .all()
-    )
-
-    # Events by severity
-    severity_counts = dict(
-        db.session.query(Event.severity, func.count(Event.id))
-        .filter(Event.event_type != 'keepalive')
-        .group_by(Event.severity)
-        .all()
+    is_open = EventRollup.status.in_(
+        [EventStatus.NEW.value, EventStatus.INVESTIGATING.value]
     )
-
-    # Critical events not resolved
-    critical_open = security_events.filter(
-        Event.severity == EventSeverity.CRITICAL,
-        Event.status.in_([EventStatus.NEW, EventStatus.INVESTIGATING]),
-    ).count()
-
-    # All unresolved events (any severity)
-    active_alerts = security_events.filter(
-        Event.status.in_([EventStatus.NEW, EventStatus.INVESTIGATING])
-    ).count()
-
-    # Events by source
-    source_counts = dict(
-        db.session.query(Event.source, func.count(Event.id))
-        .filter(Event.event_type != 'keepalive')
-        .group_by(Event.source)
-        .all()
+    is_critical = EventRollup.severity == EventSeverity.CRITICAL.value
+    in_prev_24h = and_(
+        EventRollup.bucket >= prev_24h_start, EventRollup.bucket < last_24h
     )
 
-    # Unique sites
-    total_sites = (
-        db.session.query(func.count(func.distinct(Event.site_id)))
-        .filter(Event.event_type != 'keepalive')
-        .scalar() or 0
-    )
+    def total(*criteria):
+        summed = func.sum(EventRollup.count)
+        if criteria:
+            summed = summed.filter(and_(*criteria))
+        return func.coalesce(summed, 0)
 
-    # Total alert rule triggers (sum of trigger_count across all rules)
-    total_rule_triggers = db.session.query(
-        func.coalesce(func.sum(AlertRule.trigger_count), 0)
-    ).scalar()
+    breakdowns = {
+        "by_status": (EventRollup.status, [s.value for s in EventStatus]),
+        "by_severity": (EventRollup.severity, [s.value for s in EventSeverity]),
+        "by_source": (EventRollup.source, [s.value for s in EventSource]),
+    }
 
-    # Open incidents
-    open_incidents = Incident.query.filter(
-        Incident.status.in_(
-            [IncidentStatus.NEW, IncidentStatus.OPEN, IncidentStatus.INVESTIGATING]
+    # Keepalive heartbeats are never counted in the rollups
+    columns = [
+        total().label("total_events"),
+        total(EventRollup.bucket >= last_24h).label("events_last_24h"),
+        total(in_prev_24h).label("events_prev_24h"),
+        total(is_critical, is_open).label("critical_open"),
+        total(is_critical, is_open, in_prev_24h).label("critical_prev_24h"),
+        total(is_open).label("active_alerts"),
+        func.count(func.distinct(EventRollup.site_id))
+        .filter(EventRollup.site_id != "", EventRollup.count > 0)
+        .label("total_sites"),
+        db.session.query(func.coalesce(func.sum(AlertRule.trigger_count), 0))
+        .scalar_subquery()
+        .label("total_rule_triggers"),
+        db.session.query(func.count(Incident.id))
+        .filter(
+            Incident.status.in_(
+                [IncidentStatus.NEW, IncidentStatus.OPEN, IncidentStatus.INVESTIGATING]
+            )
         )
-    ).count()
-
-    return jsonify(
-        {
-            "total_events": total_events,
-            "events_last_24h": events_24h,
-            "events_prev_24h": events_prev_24h,
-            "critical_open": critical_open,
-            "critical_prev_24h": critical_prev_24h,
-            "total_rule_triggers": total_rule_triggers,
-            "active_alerts": active_alerts,
-            "total_sites": total_sites,
-            "open_incidents": open_incidents,
-            "by_status": {
-                status.value if hasattr(status, "value") else str(status): count
-                for status, count in status_counts.items()
-            },
-            "by_severity": {
-                sev.value if hasattr(sev, "value") else str(sev): count
-                for sev, count in severity_counts.items()
-            },
-            "by_source": {
-                src.value if hasattr(src, "value") else str(src): count
-                for src, count in source_counts.items()
-            },
+        .scalar_subquery()
+        .label("open_incidents"),
+    ]
+    for name, (column, values) in breakdowns.items():
+        columns += [total(column == v).label(f"{name}:{v}") for v in values]
+
+    row = db.session.query(*columns).select_from(EventRollup).one()._mapping
+
+    stats = {
+        key: int(row[key] or 0)
+        for key in (
+            "total_events",
+            "events_last_24h",
+            "events_prev_24h",
+            "critical_open",
+            "critical_prev_24h",
+            "total_rule_triggers",
+            "active_alerts",
+            "total_sites",
+            "open_incidents",
+        )
+    }
+    for name, (_, values) in breakdowns.items():
+        stats[name] = {
+            v: int(row[f"{name}:{v}"]) for v in values if row[f"{name}:{v}"]
         }
-    )
+
+    return stats
+
+
+# Bucket width of each date_trunc unit used by the trends timeframes
+_TRUNC_STEPS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
 
 
 @dashboard_bp.route("/dashboard/trends", methods=["GET"])
+@cached_response
 def get_trends():
     """Get event trends over time.
 
     Query params:
-        timeframe: '5m', '15m', '30m', '1h', '6h', '24h', '7d', '30d' (default: '24h')
+        timeframe: '5m', '15m', '30m', '1h', '6h', '24h', '7d', '30d', '90d', '1y'
+            (default: '24h')
+        max_points: downsample the series to at most this many points (LTTB)
+    """
+    return jsonify(
+        compute_trends(
+            request.args.get("timeframe", "24h"),
+            request.args.get("max_points", type=int),
+        )
+    )
+
+
+def compute_trends(timeframe: str = "24h", max_points: Optional[int] = None) -> dict:
+    """
+    Event counts over ``timeframe``, plus daily counts by severity for 7d
+    and longer. Older rollups are compacted to hours, then days, which the
+    coarser timeframes group by anyway.
+
+    Buckets without events are filled with zeros, so the series covers the
+    whole window. With ``max_points`` it is then reduced to that many points
+    with LTTB, which keeps spikes visible.
     """
     now = datetime.utcnow()
-    timeframe = request.args.get("timeframe", "24h")
 
     # Define timeframe configurations
     # interval_minutes: for custom minute-based grouping (0 means use trunc directly)
@@ -183,27 +180,32 @@ def get_trends():
         "24h": {"delta": timedelta(hours=24), "trunc": "hour", "interval_minutes": 0},
         "7d": {"delta": timedelta(days=7), "trunc": "hour", "interval_minutes": 0},
         "30d": {"delta": timedelta(days=30), "trunc": "day", "interval_minutes": 0},
+        "90d": {"delta": timedelta(days=90), "trunc": "day", "interval_minutes": 0},
+        "1y": {"delta": timedelta(days=365), "trunc": "day", "interval_minutes": 0},
     }
 
     config = timeframe_config.get(timeframe, timeframe_config["24h"])
     start_time = now - config["delta"]
     interval_minutes = config.get("interval_minutes", 0)
     trunc_unit = config.get("trunc")
+    step = timedelta(minutes=interval_minutes) if interval_minutes > 0 else _TRUNC_STEPS[trunc_unit]
+    # Rollup buckets are whole minutes: include the partially elapsed first minute
+    start_bucket = start_time.replace(second=0, microsecond=0)
+    total = func.sum(EventRollup.count)
 
     # Get event counts grouped by time unit
     if interval_minutes > 0:
         # Custom interval grouping using epoch-based rounding
         interval_seconds = interval_minutes * 60
         time_bucket = func.to_timestamp(
-            func.floor(func.extract("epoch", Event.timestamp) / interval_seconds)
+            func.floor(func.extract("epoch", EventRollup.bucket) / interval_seconds)
             * interval_seconds
         )
         time_counts = (
-            db.session.query(
-                time_bucket.label("time_bucket"), func.count(Event.id).label("count")
-            )
-            .filter(Event.timestamp >= start_time, Event.event_type != 'keepalive')
+            db.session.query(time_bucket.label("time_bucket"), total.label("count"))
+            .filter(EventRollup.bucket >= start_bucket)
             .group_by(time_bucket)
+            .having(total > 0)
             .order_by(time_bucket)
             .all()
         )
@@ -211,36 +213,47 @@ def get_trends():
         # Standard date_trunc grouping
         time_counts = (
             db.session.query(
-                func.date_trunc(trunc_unit, Event.timestamp).label("time_bucket"),
-                func.count(Event.id).label("count"),
+                func.date_trunc(trunc_unit, EventRollup.bucket).label("time_bucket"),
+                total.label("count"),
             )
-            .filter(Event.timestamp >= start_time, Event.event_type != 'keepalive')
+            .filter(EventRollup.bucket >= start_bucket)
             .group_by("time_bucket")
+            .having(total > 0)
             .order_by("time_bucket")
             .all()
         )
 
+    series = fill_gaps(dict(time_counts), start_bucket, now, step)
+    if max_points:
+        series = lttb(
+            series,
+            max_points,
+            x=lambda p: (p[0] - start_bucket).total_seconds(),
+            y=lambda p: p[1],
+        )
+
     # Format results based on timeframe
     hourly = []
-    for t, c in time_counts:
+    for t, c in series:
         if trunc_unit == "day":
-            hourly.append({"hour": t.strftime("%Y-%m-%d"), "count": c})
+            label = t.strftime("%Y-%m-%d")
         elif trunc_unit == "hour" and timeframe == "7d":
-            hourly.append({"hour": t.strftime("%m-%d %H:%M"), "count": c})
+            label = t.strftime("%m-%d %H:%M")
         else:
-            hourly.append({"hour": t.strftime("%H:%M"), "count": c})
+            label = t.strftime("%H:%M")
+        hourly.append({"hour": label, "timestamp": t.isoformat() + "Z", "count": int(c)})
 
     # Daily counts by severity (for longer timeframes)
     daily = {}
-    if timeframe in ["7d", "30d"]:
+    if timeframe in ["7d", "30d", "90d", "1y"]:
         daily_severity = (
             db.session.query(
-                func.date_trunc("day", Event.timestamp).label("day"),
-                Event.severity,
-                func.count(Event.id).label("count"),
+                func.date_trunc("day", EventRollup.bucket).label("day"),
+                EventRollup.severity,
+                total.label("count"),
             )
-            .filter(Event.timestamp >= start_time, Event.event_type != 'keepalive')
-            .group_by("day", Event.severity)
+            .filter(EventRollup.bucket >= start_bucket)
+            .group_by("day", EventRollup.severity)
             .order_by("day")
             .all()
         )
@@ -255,44 +268,50 @@ def get_trends():
                     "medium": 0,
                     "low": 0,
                 }
-            daily[day_str][severity.value] = count
+            daily[day_str][severity] = count
 
-    return jsonify(
-        {"hourly": hourly, "daily": list(daily.values()), "timeframe": timeframe}
+    return {"hourly": hourly, "daily": list(daily.values()), "timeframe": timeframe}
+
+
+def _severity_sum(severity: EventSeverity):
+    return func.sum(
+        case((EventRollup.severity == severity.value, EventRollup.count), else_=0)
     )
 
 
 @dashboard_bp.route("/dashboard/heatmap", methods=["GET"])
+@cached_response
 def get_heatmap():
     """Get event activity heatmap — count by date × hour-of-day."""
-    days = request.args.get("days", 30, type=int)
+    return jsonify(compute_heatmap(request.args.get("days", 30, type=int)))
+
+
+def compute_heatmap(days: int = 30) -> dict:
+    """
+    Event counts by date × hour-of-day over the last ``days`` days, at most
+    ROLLUP_HOURLY_RETENTION_DAYS: older rollups are compacted to whole days.
+    """
+    days = min(days, current_app.config["ROLLUP_HOURLY_RETENTION_DAYS"])
 
     # We want to get the last N days including today, starting at midnight
     now = datetime.utcnow()
     since = now - timedelta(days=days - 1)
     since = since.replace(hour=0, minute=0, second=0, microsecond=0)
 
-    # Note: EventSeverity values are typically lowercase like 'critical', 'high'
+    total = func.sum(EventRollup.count)
     results = (
         db.session.query(
-            func.date_trunc("day", Event.timestamp).label("date"),
-            func.extract("hour", Event.timestamp).label("hour"),
-            func.count(Event.id).label("count"),
-            func.sum(
-                case((Event.severity == EventSeverity.CRITICAL, 1), else_=0)
-            ).label("critical"),
-            func.sum(case((Event.severity == EventSeverity.HIGH, 1), else_=0)).label(
-                "high"
-            ),
-            func.sum(case((Event.severity == EventSeverity.MEDIUM, 1), else_=0)).label(
-                "medium"
-            ),
-            func.sum(case((Event.severity == EventSeverity.LOW, 1), else_=0)).label(
-                "low"
-            ),
+            func.date_trunc("day", EventRollup.bucket).label("date"),
+            func.extract("hour", EventRollup.bucket).label("hour"),
+            total.label("count"),
+            _severity_sum(EventSeverity.CRITICAL).label("critical"),
+            _severity_sum(EventSeverity.HIGH).label("high"),
+            _severity_sum(EventSeverity.MEDIUM).label("medium"),
+            _severity_sum(EventSeverity.LOW).label("low"),
         )
-        .filter(Event.timestamp >= since, Event.event_type != 'keepalive')
+        .filter(EventRollup.bucket >= since)
         .group_by("date", "hour")
+        .having(total > 0)
         .all()
     )
 
@@ -308,59 +327,133 @@ def get_heatmap():
         }
         for r in results
     ]
-    return jsonify({"heatmap": data, "days": days})
+    return {"heatmap": data, "days": days}
 
 
 @dashboard_bp.route("/dashboard/top-ips", methods=["GET"])
+@cached_response
 def get_top_ips():
-    """Get top source IPs by event count (from JSONB metadata)."""
-    hours = request.args.get("hours", 24, type=int)
-    since = datetime.utcnow() - timedelta(hours=hours)
+    """Get top source IPs by event count."""
+    return jsonify(compute_top_ips(request.args.get("hours", 24, type=int)))
 
-    ip_field = Event.event_metadata["source_ip"].astext
 
-    results = (
-        db.session.query(
-            ip_field.label("ip"),
-            func.count(Event.id).label("count"),
-            func.sum(
-                case((Event.severity == EventSeverity.CRITICAL, 1), else_=0)
-            ).label("critical"),
-            func.sum(case((Event.severity == EventSeverity.HIGH, 1), else_=0)).label(
-                "high"
-            ),
-        )
-        .filter(
-            Event.timestamp >= since,
-            Event.event_type != 'keepalive',
-            ip_field.isnot(None),
-            ip_field != "null",
-            ip_field != "",
-        )
-        .group_by(ip_field)
-        .order_by(func.count(Event.id).desc())
-        .limit(10)
-        .all()
-    )
+def compute_top_ips(hours: int = 24) -> dict:
+    """
+    Top source IPs over the last ``hours``.
+
+    Served from the hourly heavy-hitter sketches: ``count`` may over-estimate
+    an IP's true count by at most its ``error``.
+    """
+    sketch = sketch_store.window(TOPK, "ip", datetime.utcnow() - timedelta(hours=hours))
+
+    return {
+        "top_ips": [
+            {
+                "ip": item["value"],
+                "count": item["count"],
+                "error": item["error"],
+                "critical": item["critical"],
+                "high": item["high"],
+            }
+            for item in sketch.top(10)
+        ],
+        "max_error": sketch.bound(),
+    }
+
+
+@dashboard_bp.route("/dashboard/top/<dimension>", methods=["GET"])
+@cached_response
+def get_top_values(dimension):
+    """Get the most frequent IPs, users or hosts over the last ``hours``."""
+    if dimension not in DIMENSIONS:
+        return jsonify(
+            {"error": f"Invalid dimension. Must be one of: {list(DIMENSIONS)}"}
+        ), 400
+    hours = request.args.get("hours", 24, type=int)
+    limit = min(request.args.get("limit", 10, type=int), 100)
+    sketch = sketch_store.window(TOPK, dimension, datetime.utcnow() - timedelta(hours=hours))
 
     return jsonify(
         {
-            "top_ips": [
+            "dimension": dimension,
+            "hours": hours,
+            "items": sketch.top(limit),
+            "max_error": sketch.bound(),
+        }
+    )
+
+
+@dashboard_bp.route("/dashboard/distinct", methods=["GET"])
+@cached_response
+def get_distinct_counts():
+    """
+    Approximate distinct sites, IPs, users and hosts per day and over the
+    last ``days`` days (today included), from the daily HyperLogLog sketches.
+    """
+    days = max(1, min(request.args.get("days", 1, type=int), 90))
+    dimension = request.args.get("dimension")
+    if dimension is not None and dimension not in DISTINCT_DIMENSIONS:
+        return jsonify(
+            {"error": f"Invalid dimension. Must be one of: {list(DISTINCT_DIMENSIONS)}"}
+        ), 400
+
+    first_day = day_bucket(datetime.utcnow()) - timedelta(days=days - 1)
+    result = {}
+    for name in [dimension] if dimension else DISTINCT_DIMENSIONS:
+        buckets = sketch_store.buckets(DISTINCT, name, first_day)
+        total = sketch_store.new_sketch(DISTINCT)
+        for sketch in buckets.values():
+            total.merge(sketch)
+        result[name] = {
+            "total": total.count(),
+            "daily": [
                 {
-                    "ip": r.ip,
-                    "count": r.count,
-                    "critical": int(r.critical),
-                    "high": int(r.high),
+                    "date": day.date().isoformat(),
+                    "count": buckets[day].count() if day in buckets else 0,
                 }
-                for r in results
-            ]
+                for day in (first_day + timedelta(days=i) for i in range(days))
+            ],
+        }
+
+    return jsonify(
+        {
+            "days": days,
+            "relative_error": round(total.relative_error, 4),
+            "distinct": result,
         }
     )
 
 
 @dashboard_bp.route("/dashboard/source-details", methods=["GET"])
+@cached_response
 def get_source_details():
     """Per-source live stats: last signal, EPS, 24h count, top event type, active sites."""
+    return jsonify(compute_source_details())
+
+
+def _source_list(sources: list[EventSource]):
+    """
+    ``sources`` as a one-column subquery to outer-join the per-source stats
+    to. The literals are cast: PostgreSQL would otherwise type the union as
+    text, which cannot be compared with the eventsource enum.
+    """
+    return union_all(
+        *[
+            select(cast(literal(src, Event.source.type), Event.source.type).label("source"))
+            for src in sources
+        ]
+    ).subquery("sources")
+
+
+def compute_source_details() -> dict:
+    """
+    Per-source live stats: last signal, EPS, 24h count, top event type, active sites.
+
+    Computed in one statement: the last 24h of security events is grouped
+    once by (source, event_type, site_id) in a CTE, from which the per-source
+    totals, distinct sites and top event type are derived; last event and
+    last keepalive are correlated index probes on (source, timestamp).
+    """
     now = datetime.utcnow()
     last_24h = now - timedelta(hours=24)
     last_60s = now - timedelta(seconds=60)
@@ -371,87 +464,122 @@ def get_source_details():
         EventSource.APPLICATION,
     ]
 
-    # GLPI reachability check — uses 30-second cache to avoid blocking on every request
+    # GLPI reachability from the background health monitor (never probes inline)
     glpi_alive = _glpi_alive()
 
-    result = {}
-    for src in active_sources:
-        # Last security event timestamp (keepalives excluded)
-        last_row = (
-            db.session.query(func.max(Event.timestamp))
-            .filter(Event.source == src, Event.event_type != 'keepalive')
-            .scalar()
+    sources = _source_list(active_sources)
+
+    # One grouped pass over the 24h window (keepalives excluded)
+    recent = (
+        select(
+            Event.source.label("source"),
+            Event.event_type.label("event_type"),
+            Event.site_id.label("site_id"),
+            func.count(Event.id).label("n"),
+            func.count(Event.id).filter(Event.timestamp >= last_60s).label("n_60s"),
         )
-        # Last keepalive timestamp
-        keepalive_row = (
-            db.session.query(func.max(Event.timestamp))
-            .filter(Event.source == src, Event.event_type == 'keepalive')
-            .scalar()
+        .where(
+            Event.timestamp >= last_24h,
+            Event.event_type != "keepalive",
+            Event.source.in_(active_sources),
         )
-        # For GLPI: override keepalive with real-time HTTP check
-        if src == EventSource.APPLICATION:
-            keepalive_row = now if glpi_alive else None
-
-        # Security events in last 60s (keepalives excluded)
-        eps_count = (
-            db.session.query(func.count(Event.id))
-            .filter(Event.source == src, Event.timestamp >= last_60s, Event.event_type != 'keepalive')
-            .scalar()
-            or 0
+        .group_by(Event.source, Event.event_type, Event.site_id)
+        .cte("recent")
+    )
+    totals = (
+        select(
+            recent.c.source,
+            func.sum(recent.c.n).label("events_24h"),
+            func.sum(recent.c.n_60s).label("events_last_60s"),
+            func.count(func.distinct(recent.c.site_id)).label("active_sites"),
         )
-        # Security events in last 24h (keepalives excluded)
-        count_24h = (
-            db.session.query(func.count(Event.id))
-            .filter(Event.source == src, Event.timestamp >= last_24h, Event.event_type != 'keepalive')
-            .scalar()
-            or 0
+        .group_by(recent.c.source)
+        .subquery("totals")
+    )
+    ranked = (
+        select(
+            recent.c.source,
+            recent.c.event_type,
+            func.row_number()
+            .over(
+                partition_by=recent.c.source,
+                order_by=(func.sum(recent.c.n).desc(), recent.c.event_type),
+            )
+            .label("rank"),
         )
-        # Most common security event_type in last 24h (keepalives excluded)
-        top_type_row = (
-            db.session.query(Event.event_type, func.count(Event.id).label("n"))
-            .filter(Event.source == src, Event.timestamp >= last_24h, Event.event_type != 'keepalive')
-            .group_by(Event.event_type)
-            .order_by(func.count(Event.id).desc())
-            .first()
+        .group_by(recent.c.source, recent.c.event_type)
+        .subquery("ranked")
+    )
+    top_type = (
+        select(ranked.c.source, ranked.c.event_type)
+        .where(ranked.c.rank == 1)
+        .subquery("top_type")
+    )
+
+    def last_seen(keepalive: bool):
+        kind = Event.event_type == "keepalive" if keepalive else Event.event_type != "keepalive"
+        return (
+            select(func.max(Event.timestamp))
+            .where(Event.source == sources.c.source, kind)
+            .scalar_subquery()
         )
-        top_event_type = top_type_row[0] if top_type_row else None
-        # Active sites (distinct) in last 24h (keepalives excluded)
-        active_sites = (
-            db.session.query(func.count(func.distinct(Event.site_id)))
-            .filter(Event.source == src, Event.timestamp >= last_24h, Event.event_type != 'keepalive')
-            .scalar()
-            or 0
+
+    rows = db.session.execute(
+        select(
+            sources.c.source,
+            last_seen(keepalive=False).label("last_event_at"),
+            last_seen(keepalive=True).label("last_keepalive_at"),
+            totals.c.events_last_60s,
+            totals.c.events_24h,
+            top_type.c.event_type,
+            totals.c.active_sites,
         )
+        .outerjoin(totals, totals.c.source == sources.c.source)
+        .outerjoin(top_type, top_type.c.source == sources.c.source)
+    ).all()
+
+    result = {}
+    for src, last_event_at, keepalive_at, eps_count, count_24h, top_event_type, sites in rows:
+        # For GLPI: override keepalive with its latest health probe
+        if src == EventSource.APPLICATION:
+            keepalive_at = now if glpi_alive else None
 
         result[src.value] = {
-            "last_event_at": (last_row.isoformat() + 'Z') if last_row else None,
-            "last_keepalive_at": (keepalive_row.isoformat() + 'Z') if keepalive_row else None,
-            "events_last_60s": eps_count,
-            "events_24h": count_24h,
+            "last_event_at": (last_event_at.isoformat() + 'Z') if last_event_at else None,
+            "last_keepalive_at": (keepalive_at.isoformat() + 'Z') if keepalive_at else None,
+            "events_last_60s": int(eps_count or 0),
+            "events_24h": int(count_24h or 0),
             "top_event_type": top_event_type,
-            "active_sites": active_sites,
+            "active_sites": sites or 0,
         }
 
-    return jsonify({"sources": result})
+    return {"sources": result}
 
 
 @dashboard_bp.route("/dashboard/sites", methods=["GET"])
+@cached_response
 def get_sites_summary():
     """Get summary by site (for multi-site audioprothésistes network)."""
+    return jsonify(compute_sites_summary())
+
+
+def compute_sites_summary() -> dict:
+    """Unresolved events of the last 24h per site and severity."""
     last_24h = datetime.utcnow() - timedelta(hours=24)
+    total = func.sum(EventRollup.count)
 
     # Only unresolved events in the last 24h — used to derive endpoint status
     site_stats = (
-        db.session.query(
-            Event.site_id, Event.severity, func.count(Event.id).label("count")
-        )
+        db.session.query(EventRollup.site_id, EventRollup.severity, total.label("count"))
         .filter(
-            Event.site_id.isnot(None),
-            Event.timestamp >= last_24h,
-            Event.event_type != 'keepalive',
-            Event.status.in_([EventStatus.NEW, EventStatus.INVESTIGATING]),
+            EventRollup.site_id != "",
+            EventRollup.bucket >= last_24h.replace(second=0, microsecond=0),
+            EventRollup.status.in_(
+                [EventStatus.NEW.value, EventStatus.INVESTIGATING.value]
+            ),
         )
-        .group_by(Event.site_id, Event.severity)
+        .group_by(EventRollup.site_id, EventRollup.severity)
+        .having(total > 0)
         .all()
     )
 
@@ -467,10 +595,113 @@ def get_sites_summary():
                 "medium": 0,
                 "low": 0,
             }
-        sites[site_id][severity.value] = count
+        sites[site_id][severity] = count
         sites[site_id]["total"] += count
 
     # Sort by total events descending
     sorted_sites = sorted(sites.values(), key=lambda x: x["total"], reverse=True)
 
-    return jsonify({"sites": sorted_sites})
+    return {"sites": sorted_sites}
+
+
+# ── Composite overview ─────────────────────────────────────────────────────────
+# Sections run concurrently on a shared pool, each in its own app context and
+# therefore on its own session and pooled connection.
+_overview_pool: dict = {"executor": None, "workers": 0}
+
+
+def _overview_executor() -> ThreadPoolExecutor:
+    workers = current_app.config["DASHBOARD_OVERVIEW_WORKERS"]
+    if _overview_pool["executor"] is None or _overview_pool["workers"] != workers:
+        _overview_pool["executor"] = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="dashboard-overview"
+        )
+        _overview_pool["workers"] = workers
+    return _overview_pool["executor"]
+
+
+def _run_section(app, key: str, compute, timeout: float, read_replica: bool) -> dict:
+    """Compute one overview section, sharing the standalone endpoint's cache entry."""
+    with app.app_context():
+        g.read_replica = read_replica
+        try:
+            if db.engine.dialect.name == "postgresql":
+                # Give up server-side too instead of leaving the query running
+                db.session.execute(
+                    select(func.set_config("statement_timeout", str(int(timeout * 1000)), True))
+                )
+            if not app.config["DASHBOARD_CACHE_ENABLED"]:
+                return compute()
+
+            entry, _ = response_cache.get_or_compute(
+                key, lambda: (app.json.dumps(compute()), 200)
+            )
+            return app.json.loads(entry["body"])
+        finally:
+            db.session.remove()
+
+
+@dashboard_bp.route("/dashboard/overview", methods=["GET"])
+def get_overview():
+    """
+    Stats, trends, heatmap, sites, top IPs and source details in one response.
+
+    Sections are computed in parallel. A section that fails or takes longer
+    than DASHBOARD_OVERVIEW_TIMEOUT seconds is returned as null and listed in
+    ``errors`` ("timeout" or "error"); the other sections are still returned.
+
+    Query params:
+        timeframe: trends timeframe (default: '24h')
+        max_points: trends downsampling, as for /dashboard/trends
+        days: heatmap days (default: 30)
+        hours: top IPs window in hours (default: 24)
+    """
+    timeframe = request.args.get("timeframe", "24h")
+    max_points = request.args.get("max_points", type=int)
+    days = request.args.get("days", 30, type=int)
+    hours = request.args.get("hours", 24, type=int)
+    # section -> (path and params of the standalone endpoint, computation)
+    sections = {
+        "stats": ("stats", {}, compute_stats),
+        "trends": (
+            "trends",
+            {"timeframe": timeframe, **({"max_points": max_points} if max_points else {})},
+            partial(compute_trends, timeframe, max_points),
+        ),
+        "heatmap": ("heatmap", {"days": days}, partial(compute_heatmap, days)),
+        "sites": ("sites", {}, compute_sites_summary),
+        "top_ips": ("top-ips", {"hours": hours}, partial(compute_top_ips, hours)),
+        "source_details": ("source-details", {}, compute_source_details),
+    }
+
+    app = current_app._get_current_object()
+    timeout = app.config["DASHBOARD_OVERVIEW_TIMEOUT"]
+    executor = _overview_executor()
+    futures = {
+        name: executor.submit(
+            _run_section,
+            app,
+            f"/api/dashboard/{path}?{urlencode(sorted(params.items()))}",
+            compute,
+            timeout,
+            g.get("read_replica", False),
+        )
+        for name, (path, params, compute) in sections.items()
+    }
+    wait(futures.values(), timeout=timeout)
+
+    overview = {"errors": {}}
+    for name, future in futures.items():
+        overview[name] = None
+        if not future.done():
+            # Keeps running in the background and fills the cache for the next poll
+            overview["errors"][name] = "timeout"
+            current_app.logger.warning(f"Dashboard overview section {name} timed out")
+        elif future.exception() is not None:
+            overview["errors"][name] = "error"
+            current_app.logger.error(
+                f"Dashboard overview section {name} failed: {future.exception()}"
+            )
+        else:
+            overview[name] = future.result()
+    return jsonify(overview)
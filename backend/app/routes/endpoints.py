@@ -3,10 +3,11 @@ from datetime import datetime, timedelta
 from sqlalchemy import func, case
 
 from app import db
+from app.db_routing import replica_reads
 from app.models import Event, EventSeverity, EventStatus
 from app.models.user import User
 
-endpoints_bp = Blueprint('endpoints', __name__)
+endpoints_bp = replica_reads(Blueprint('endpoints', __name__))
 
 
 @endpoints_bp.route('/endpoints', methods=['GET'])
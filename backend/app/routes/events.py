@@ -1,22 +1,176 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import desc
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import desc, func, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import load_only
 from app import db
+from app.db_routing import read_from_primary, replica_reads
 from app.models import Event, EventStatus, EventSeverity, EventSource
-
-events_bp = Blueprint('events', __name__)
+from app.models.event import EVENT_FIELDS, EVENT_LIST_FIELDS, event_field_columns
+from app.services import event_search
+from app.services.dashboard_deltas import dashboard_deltas
+from app.services.rollups import rollup_buffer
+
+events_bp = replica_reads(Blueprint('events', __name__))
+
+
+@events_bp.errorhandler(OperationalError)
+def search_timed_out(error):
+    """Searches cancelled by EVENT_SEARCH_TIMEOUT; other database errors propagate."""
+    if not event_search.is_timeout(error):
+        raise error
+    db.session.rollback()
+    return jsonify({'error': 'Search timed out; add filters or a longer search'}), 503
+
+
+def _encode_cursor(timestamp: datetime, event_id, direction: str) -> str:
+    """Opaque cursor for the events before ('prev') or after ('next') a (timestamp, id)."""
+    raw = json.dumps([timestamp.isoformat(), str(event_id), direction])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID, str]:
+    """(timestamp, id, direction) of a cursor; ValueError when malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, event_id, direction = json.loads(raw)
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(timestamp), uuid.UUID(event_id), direction
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+def _count(query, mode: str) -> tuple:
+    """(total, is_estimate) of the filtered query for count=exact|estimate."""
+    if mode == 'estimate':
+        from app.services.rule_cost import explain_query
+
+        plan = explain_query(query.order_by(None))
+        if plan is not None:
+            return plan['rows'], True
+    # COUNT(*) over the filtered table, not over a subquery of every column
+    return query.order_by(None).with_entities(func.count()).scalar(), False
+
+
+def _list_fields() -> list:
+    """
+    Event fields requested with ``fields`` (comma-separated, or ``all``);
+    the list defaults to EVENT_LIST_FIELDS. id and timestamp are always
+    included: cursors and snippets are built from them. ValueError when a
+    field is unknown.
+    """
+    fields = request.args.get('fields')
+    if not fields:
+        return list(EVENT_LIST_FIELDS)
+    if fields == 'all':
+        return list(EVENT_FIELDS)
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in EVENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return [f for f in EVENT_FIELDS if f in ('id', 'timestamp') or f in requested]
+
+
+def _keyset_page(
+    query, per_page: int, fields: list, cursor: Optional[tuple]
+) -> tuple[dict, list]:
+    """
+    One page of ``query`` in (timestamp, id) descending order, seeking past
+    the decoded ``cursor`` (see _decode_cursor): an index range scan of
+    per_page + 1 rows. Returns (response body, the page's events).
+    """
+    direction = 'next'
+    if cursor:
+        timestamp, event_id, direction = cursor
+        key = tuple_(Event.timestamp, Event.id)
+        if direction == 'next':
+            query = query.filter(key < tuple_(timestamp, event_id))
+        else:
+            query = query.filter(key > tuple_(timestamp, event_id))
+
+    if direction == 'next':
+        query = query.order_by(Event.timestamp.desc(), Event.id.desc())
+    else:
+        query = query.order_by(Event.timestamp.asc(), Event.id.asc())
+    rows = query.limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'prev':
+        rows.reverse()
+
+    has_next = more if direction == 'next' else True
+    has_prev = bool(cursor) if direction == 'next' else more
+    body = {'events': [e.to_dict(fields) for e in rows], 'per_page': per_page}
+    body['next_cursor'] = (
+        _encode_cursor(rows[-1].timestamp, rows[-1].id, 'next') if rows and has_next else None
+    )
+    body['prev_cursor'] = (
+        _encode_cursor(rows[0].timestamp, rows[0].id, 'prev') if rows and has_prev else None
+    )
+    if not rows and cursor:
+        # Past either end: the way back starts at the cursor's own position
+        back = 'prev' if direction == 'next' else 'next'
+        body[f'{back}_cursor'] = _encode_cursor(timestamp, event_id, back)
+    return body, rows
+
+
+def _with_snippets(body: dict, events: list, tsquery) -> dict:
+    """Add highlighted snippets to the events of ``body`` when asked for."""
+    if tsquery is None or request.args.get('highlight') != 'true':
+        return body
+    snippets = event_search.snippets(events, tsquery)
+    for event in body['events']:
+        event['snippet'] = snippets.get(event['id'])
+    return body
 
 
 @events_bp.route('/events', methods=['GET'])
 def list_events():
-    """List events with filtering and pagination."""
+    """
+    List events with filtering and pagination.
+
+    Offset pagination (``page``, with ``total`` and ``pages``) by default.
+    With ``paginate=keyset`` or a ``cursor``, pages are cursor-based: pass
+    the ``next_cursor`` or ``prev_cursor`` of a response as ``cursor``, and
+    the total is only computed with ``count=exact`` or ``count=estimate``
+    (planner estimate on PostgreSQL).
+
+    ``search`` is a full-text query (see services/event_search.py), or a
+    plain substring with ``mode=contains``. On PostgreSQL, ``sort=relevance``
+    returns the ``per_page`` best full-text matches instead of the newest,
+    ``highlight=true`` adds a ``snippet`` of the matching text to each event,
+    and searches are cancelled after EVENT_SEARCH_TIMEOUT seconds.
+    """
     # Pagination - support both 'limit' and 'per_page'
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', type=int)
     per_page = limit if limit else request.args.get('per_page', 50, type=int)
     per_page = min(per_page, 500)  # Max 500 per page
 
+    try:
+        fields = _list_fields()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    keyset = 'page' not in request.args and (
+        request.args.get('paginate') == 'keyset' or 'cursor' in request.args
+    )
+    cursor = None
+    if keyset and request.args.get('cursor'):
+        try:
+            cursor = _decode_cursor(request.args['cursor'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
     # Build query — always exclude keepalive heartbeats from event views
-    query = Event.query.filter(Event.event_type != 'keepalive')
+    query = Event.query.options(load_only(*event_field_columns(fields))).filter(
+        Event.event_type != 'keepalive'
+    )
 
     # Filters - support comma-separated values for multiple selection
     if status := request.args.get('status'):
@@ -76,36 +230,72 @@ def list_events():
     if site_id := request.args.get('site_id'):
         query = query.filter(Event.site_id == site_id)
 
+    tsquery = None
     if search := request.args.get('search'):
-        query = query.filter(Event.description.ilike(f'%{search}%'))
+        if request.args.get('mode') == 'contains':
+            min_length = current_app.config['EVENT_SEARCH_MIN_CONTAINS']
+            if len(search) < min_length:
+                return jsonify({
+                    'error': f'Substring search needs at least {min_length} characters'
+                }), 400
+            query = event_search.apply_contains(query, search)
+        else:
+            query, tsquery = event_search.apply_search(query, search)
+        event_search.limit_search_time()
+
+    if tsquery is not None and request.args.get('sort') == 'relevance':
+        # Ranking needs every match: only the best page, without cursors
+        events = (
+            query.order_by(event_search.rank(tsquery).desc(), Event.timestamp.desc())
+            .limit(per_page)
+            .all()
+        )
+        body = {
+            'events': [e.to_dict(fields) for e in events],
+            'per_page': per_page,
+            'next_cursor': None,
+            'prev_cursor': None,
+        }
+        if count := request.args.get('count'):
+            body['total'], body['total_is_estimate'] = _count(query, count)
+        return jsonify(_with_snippets(body, events, tsquery))
+
+    if keyset:
+        body, rows = _keyset_page(query, per_page, fields, cursor)
+        if count := request.args.get('count'):
+            body['total'], body['total_is_estimate'] = _count(query, count)
+        return jsonify(_with_snippets(body, rows, tsquery))
 
     # Sort by timestamp descending (most recent first)
     query = query.order_by(desc(Event.timestamp))
 
     # Paginate
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    pagination.total = _count(query, 'exact')[0]
 
-    return jsonify({
-        'events': [e.to_dict() for e in pagination.items],
+    return jsonify(_with_snippets({
+        'events': [e.to_dict(fields) for e in pagination.items],
         'total': pagination.total,
         'page': page,
         'per_page': per_page,
         'pages': pagination.pages
-    })
+    }, pagination.items, tsquery))
 
 
 @events_bp.route('/events/<uuid:event_id>', methods=['GET'])
+@read_from_primary
 def get_event(event_id):
     """Get a single event by ID."""
-    event = Event.query.get_or_404(event_id)
+    event = Event.query.filter_by(id=event_id).first_or_404()
     return jsonify(event.to_dict())
 
 
 @events_bp.route('/events/<uuid:event_id>/status', methods=['PATCH'])
 def update_event_status(event_id):
     """Update event status and assignment."""
-    event = Event.query.get_or_404(event_id)
+    event = Event.query.filter_by(id=event_id).first_or_404()
     data = request.get_json()
+    old_status = event.status.value
 
     if 'status' in data:
         try:
@@ -117,6 +307,10 @@ def update_event_status(event_id):
         event.assigned_to = data['assigned_to']
 
     db.session.commit()
+    rollup_buffer.move_status(event, old_status)
+    rollup_buffer.after_write()
+    dashboard_deltas.move_status(event, old_status)
+    dashboard_deltas.after_write()
 
     # Emit WebSocket event for real-time update
     from app import socketio
@@ -128,9 +322,13 @@ def update_event_status(event_id):
 @events_bp.route('/events/<uuid:event_id>', methods=['DELETE'])
 def delete_event(event_id):
     """Delete an event (admin only in production)."""
-    event = Event.query.get_or_404(event_id)
+    event = Event.query.filter_by(id=event_id).first_or_404()
     db.session.delete(event)
     db.session.commit()
+    rollup_buffer.remove(event)
+    rollup_buffer.after_write()
+    dashboard_deltas.remove(event)
+    dashboard_deltas.after_write()
     return '', 204
 
 
@@ -140,10 +338,11 @@ _event_comments = {}
 
 
 @events_bp.route('/events/<uuid:event_id>/comments', methods=['GET'])
+@read_from_primary
 def get_event_comments(event_id):
     """Get comments for an event."""
     # Ensure event exists
-    Event.query.get_or_404(event_id)
+    Event.query.filter_by(id=event_id).first_or_404()
 
     comments = _event_comments.get(str(event_id), [])
     return jsonify({'comments': comments})
@@ -156,7 +355,7 @@ def add_event_comment(event_id):
     import uuid as uuid_lib
 
     # Ensure event exists
-    Event.query.get_or_404(event_id)
+    Event.query.filter_by(id=event_id).first_or_404()
 
     data = request.get_json()
     if not data or not data.get('content'):
@@ -1,9 +1,10 @@
 from datetime import datetime
 from flask import Blueprint, request, jsonify
 from app import db
+from app.db_routing import read_from_primary, replica_reads
 from app.models import Incident, IncidentStatus, IncidentSeverity, Event
 
-incidents_bp = Blueprint("incidents", __name__)
+incidents_bp = replica_reads(Blueprint("incidents", __name__))
 
 
 @incidents_bp.route("/incidents", methods=["GET"])
@@ -50,6 +51,7 @@ def list_incidents():
 
 
 @incidents_bp.route("/incidents/<uuid:incident_id>", methods=["GET"])
+@read_from_primary
 def get_incident(incident_id):
     """Get a specific incident and its related events."""
     incident = Incident.query.get_or_404(incident_id)
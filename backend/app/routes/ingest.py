@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app import db, socketio
 from app.models import Event, EventSeverity, EventSource
+from app.services.baselines import baseline_store
+from app.services.dashboard_deltas import dashboard_deltas
+from app.services.rollups import rollup_buffer
+from app.services.sketches import sketch_store
 
 ingest_bp = Blueprint('ingest', __name__)
 
@@ -58,6 +62,7 @@ def ingest_event():
         event = Event.from_dict(data)
         db.session.add(event)
         db.session.commit()
+        record_ingested([event])
 
         event_dict = event.to_dict()
 
@@ -121,6 +126,7 @@ def ingest_batch():
 
     if created:
         db.session.commit()
+        record_ingested(created)
 
         # Broadcast batch to WebSocket
         for event in created:
@@ -132,6 +138,28 @@ def ingest_batch():
     }), 201 if created else 400
 
 
+def record_ingested(events: list) -> None:
+    """
+    Feed committed events to the in-memory ingest aggregates.
+    Failures are logged, never surfaced: the events are already stored.
+    """
+    try:
+        baseline_store.load()
+        for event in events:
+            rollup_buffer.observe(event)
+            sketch_store.observe(event)
+            dashboard_deltas.observe(event)
+            if event.event_type != 'keepalive':
+                baseline_store.observe(event.site_id, event.event_type, event.timestamp)
+        rollup_buffer.after_write()
+        dashboard_deltas.after_write()
+        baseline_store.maybe_flush()
+        sketch_store.maybe_flush()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Failed to update ingest aggregates")
+
+
 def sanitize_log(log: str) -> str:
     """
     Sanitize log entry to prevent injection attacks.
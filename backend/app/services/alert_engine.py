@@ -1,9 +1,14 @@
 import re
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Optional
+from flask import current_app
 from sqlalchemy import func
 from app import db
 from app.models import Event, AlertRule, EventSeverity
+from app.services.baselines import load_baselines
+from app.services.response_cache import response_cache
+from app.services.rule_dsl import compile_expression
 
 
 class AlertEngine:
@@ -34,16 +39,11 @@ class AlertEngine:
             return timedelta(days=value)
         return None
 
-    def evaluate_rule(self, rule: AlertRule) -> list[Event]:
+    def build_query(self, condition: dict):
         """
-        Evaluate a single alert rule.
-        Returns a list of unassigned Events that met the condition.
+        Compile a rule condition into the query used to find its events.
+        Only unassigned events are selected.
         """
-        condition = rule.condition
-        if not condition:
-            return []
-
-        # Build query based on condition, ONLY finding unassigned events
         query = Event.query.filter(Event.incident_id.is_(None))
 
         # Filter by event type
@@ -72,11 +72,7 @@ class AlertEngine:
         # Filter by timeframe.
         # If no timeframe (or "any") is specified, default to 1h to avoid
         # sweeping all historical unassigned events into a single incident.
-        timeframe = condition.get("timeframe")
-        if timeframe and timeframe != "any":
-            delta = self.parse_timeframe(timeframe)
-        else:
-            delta = timedelta(hours=1)
+        delta = self.condition_timeframe(condition)
         if delta:
             since = datetime.utcnow() - delta
             query = query.filter(Event.timestamp >= since)
@@ -86,6 +82,33 @@ class AlertEngine:
             if site_id != "any":
                 query = query.filter(Event.site_id == site_id)
 
+        # Boolean match expression (compiled once, cached by text)
+        if expression := condition.get("match"):
+            query = query.filter(compile_expression(expression).clause)
+
+        return query
+
+    def condition_timeframe(self, condition: dict) -> Optional[timedelta]:
+        """Return the look-back window of a condition (1h when unspecified)."""
+        timeframe = condition.get("timeframe")
+        if timeframe and timeframe != "any":
+            return self.parse_timeframe(timeframe)
+        return timedelta(hours=1)
+
+    def evaluate_rule(self, rule: AlertRule) -> list[Event]:
+        """
+        Evaluate a single alert rule.
+        Returns a list of unassigned Events that met the condition.
+        """
+        condition = rule.condition
+        if not condition:
+            return []
+
+        if condition.get("type") == "anomaly":
+            return self.evaluate_anomaly_rule(rule)
+
+        query = self.build_query(condition)
+
         # Check threshold
         threshold = condition.get("count", 1)
         unassigned_events = query.all()
@@ -94,40 +117,173 @@ class AlertEngine:
             return unassigned_events
         return []
 
+    def evaluate_anomaly_rule(self, rule: AlertRule) -> list[Event]:
+        """
+        Evaluate a volume anomaly rule against the ingest-maintained baselines.
+
+        Condition example:
+        {"type": "anomaly", "event_type": "auth_failure", "site_id": "any",
+         "sigma": 6, "min_count": 10}
+
+        A site triggers when its event count over the last hour is at least
+        ``sigma`` standard deviations above the baseline for the current
+        hour-of-week. Returns the unassigned events of the anomalous sites.
+        """
+        condition = rule.condition
+        event_type = condition.get("event_type")
+        if not event_type or event_type == "any":
+            return []
+
+        sigma = float(condition.get("sigma", 3))
+        min_count = condition.get("min_count", 1)
+        site_id = condition.get("site_id")
+        if site_id == "any":
+            site_id = None
+
+        now = datetime.utcnow()
+        counts_query = db.session.query(Event.site_id, func.count(Event.id)).filter(
+            Event.event_type == event_type,
+            Event.timestamp >= now - timedelta(hours=1),
+            Event.site_id.isnot(None),
+        )
+        if site_id:
+            counts_query = counts_query.filter(Event.site_id == site_id)
+        counts = counts_query.group_by(Event.site_id).all()
+        if not counts:
+            return []
+
+        baselines = load_baselines(event_type, site_id)
+        min_samples = current_app.config["BASELINE_MIN_SAMPLES"]
+        anomalous_sites = []
+        for site, observed in counts:
+            if observed < min_count:
+                continue
+            baseline = baselines.baseline(site, event_type, now)
+            if not baseline or baseline[2] < min_samples:
+                continue  # not enough history to judge
+            mean, std, _ = baseline
+            # Floor the deviation so a perfectly flat baseline is not infinitely sensitive
+            if (observed - mean) / max(std, 1.0) >= sigma:
+                anomalous_sites.append(site)
+
+        if not anomalous_sites:
+            return []
+        return (
+            self.build_query(condition)
+            .filter(Event.site_id.in_(anomalous_sites))
+            .all()
+        )
+
     def evaluate_all_rules(self) -> list:
         """
         Evaluate all enabled alert rules.
         Returns list of triggered rules with event details.
+
+        Matching events are always correlated into the rule's incident, but a
+        notification (and the downstream process_alert fan-out) is only
+        returned for groups that are outside their cooldown window.
         """
         triggered = []
         rules = AlertRule.query.filter_by(enabled=True).all()
+        now = datetime.utcnow()
 
+        matched = False
         for rule in rules:
             matching_events = self.evaluate_rule(rule)
             if matching_events:
+                matched = True
                 # Group these events into an incident
                 incident_title = f"{rule.name} Triggered"
                 incident = self._create_or_update_incident(
                     rule, matching_events, incident_title
                 )
+                rule.last_triggered = now
+
+                notify_groups, suppressed = self._apply_cooldown(
+                    rule, matching_events, now
+                )
+                if not notify_groups:
+                    continue
 
                 triggered.append(
                     {
                         "rule": rule.to_dict(),
                         "incident": incident.to_dict(),
-                        "triggered_at": datetime.utcnow().isoformat(),
+                        "triggered_at": now.isoformat(),
+                        "group_keys": notify_groups,
+                        "suppressed_occurrences": suppressed,
                     }
                 )
 
                 # Update rule trigger stats
-                rule.last_triggered = datetime.utcnow()
                 rule.trigger_count = (rule.trigger_count or 0) + 1
 
-        if triggered:
-            db.session.commit()
+        # Suppressed matches still assign events and update suppression state
+        db.session.commit()
+        if matched:
+            # Incidents and rule trigger stats feed the dashboard
+            response_cache.bump_version()
 
         return triggered
 
+    def _group_key(self, event: Event, group_by: Optional[str]) -> str:
+        if not group_by:
+            return "*"
+        value = getattr(event, group_by, None)
+        value = getattr(value, "value", value)
+        return str(value) if value is not None else "-"
+
+    def _apply_cooldown(
+        self, rule: AlertRule, events: list[Event], now: datetime
+    ) -> tuple[list[str], int]:
+        """
+        Decide which group keys of a trigger may notify.
+
+        Condition keys:
+            cooldown: minimum time between notifications per group
+                      (default ALERT_DEFAULT_COOLDOWN, "0s": every
+                      trigger notifies)
+            group_by: event column to key cooldowns by
+                      (site_id, source, event_type or severity)
+
+        Returns (group keys to notify, events suppressed since their
+        previous notification). Suppressed groups only add their events to
+        the counter; events are matched once, as they join the incident.
+        """
+        condition = rule.condition or {}
+        cooldown = self.parse_timeframe(
+            condition.get("cooldown") or current_app.config["ALERT_DEFAULT_COOLDOWN"]
+        ) or timedelta(0)
+        group_by = condition.get("group_by")
+        if group_by not in ("site_id", "source", "event_type", "severity"):
+            group_by = None
+
+        groups = Counter(self._group_key(e, group_by) for e in events)
+
+        state = dict(rule.suppression_state or {})
+        notify = []
+        suppressed_total = 0
+        for key in sorted(groups):
+            entry = state.get(key)
+            last = (
+                datetime.fromisoformat(entry["last_notified"]) if entry else None
+            )
+            if last and now - last < cooldown:
+                state[key] = {**entry, "suppressed": entry.get("suppressed", 0) + groups[key]}
+                continue
+            suppressed_total += entry.get("suppressed", 0) if entry else 0
+            state[key] = {"last_notified": now.isoformat(), "suppressed": 0}
+            notify.append(key)
+
+        # Forget groups that have been quiet for a full cooldown
+        rule.suppression_state = {
+            key: entry
+            for key, entry in state.items()
+            if entry.get("suppressed")
+            or now - datetime.fromisoformat(entry["last_notified"]) < cooldown
+        }
+        return notify, suppressed_total
+
     def _create_or_update_incident(
         self, rule: AlertRule, events: list[Event], title: str
     ):
@@ -214,6 +370,10 @@ class AlertEngine:
                 if site_id != "any" and event.site_id != site_id:
                     continue
 
+            if expression := condition.get("match"):
+                if not compile_expression(expression).matches(event):
+                    continue
+
             # If we get here, event matches rule criteria
             # Now check if threshold is met
             if self.evaluate_rule(rule):
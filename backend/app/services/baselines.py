@@ -0,0 +1,308 @@
+"""
+Incremental per-site volume baselines for anomaly rules.
+
+Every ingested event increments the count of the hour it falls in for its
+(site_id, event_type) pair. When that hour closes, the count is folded into
+an exponentially weighted mean and variance for the matching hour-of-week
+(0 = Monday 00:00 UTC ... 167 = Sunday 23:00 UTC). Nothing is ever
+recomputed from the events table.
+
+State lives in flat ``array`` buffers (168 slots per key) and is persisted
+to ``event_baselines`` every BASELINE_FLUSH_INTERVAL seconds. Every ingesting
+process keeps its own store, so a flush does not write its arrays back as
+they are: it locks the persisted rows, replays the event counts this process
+observed since its previous flush onto them, and adopts the merged result.
+"""
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Optional
+from flask import current_app
+from sqlalchemy import tuple_
+from app import db
+from app.models.baseline import EventBaseline
+from app.services.upsert import insert_stmt
+
+HOURS_PER_WEEK = 168
+_EPOCH = datetime(1970, 1, 1)
+# 1970-01-01 was a Thursday: shift so that slot 0 is Monday 00:00
+_WEEK_OFFSET_HOURS = 3 * 24
+
+
+def absolute_hour(ts: datetime) -> int:
+    """Whole hours since the epoch for a naive UTC datetime."""
+    return int((ts - _EPOCH).total_seconds() // 3600)
+
+
+def hour_of_week(ts: datetime) -> int:
+    """Hour-of-week slot (Monday 00:00 UTC = 0) for a naive UTC datetime."""
+    return (absolute_hour(ts) + _WEEK_OFFSET_HOURS) % HOURS_PER_WEEK
+
+
+def _slot(abs_hour: int) -> int:
+    return (abs_hour + _WEEK_OFFSET_HOURS) % HOURS_PER_WEEK
+
+
+class BaselineStore:
+    """Array-backed EWMA baselines keyed by (site_id, event_type)."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._index: dict[tuple[str, str], int] = {}
+        self._means = array("d")
+        self._variances = array("d")
+        self._samples = array("H")
+        self._open_hour = array("q")
+        self._open_count = array("d")
+        self._dirty: set[int] = set()
+        # Events observed since the last flush: key index -> {hour: count}
+        self._pending: dict[int, dict[int, float]] = {}
+        self._loaded = False
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    # ── key management ─────────────────────────────────────────────────────
+    def _key_index(self, site_id: str, event_type: str) -> int:
+        key = (site_id or "", event_type)
+        i = self._index.get(key)
+        if i is None:
+            i = len(self._index)
+            self._index[key] = i
+            self._means.extend([0.0] * HOURS_PER_WEEK)
+            self._variances.extend([0.0] * HOURS_PER_WEEK)
+            self._samples.extend([0] * HOURS_PER_WEEK)
+            self._open_hour.append(-1)
+            self._open_count.append(0.0)
+        return i
+
+    # ── EWMA folding ───────────────────────────────────────────────────────
+    def _fold(self, i: int, abs_hour: int, value: float):
+        """Fold one closed hour's count into its hour-of-week slot."""
+        pos = i * HOURS_PER_WEEK + _slot(abs_hour)
+        n = self._samples[pos]
+        if n == 0:
+            self._means[pos] = value
+            self._variances[pos] = 0.0
+        else:
+            diff = value - self._means[pos]
+            incr = self.alpha * diff
+            self._means[pos] += incr
+            self._variances[pos] = (1 - self.alpha) * (
+                self._variances[pos] + diff * incr
+            )
+        if n < 0xFFFF:
+            self._samples[pos] = n + 1
+
+    def _advance(self, i: int, abs_hour: int):
+        """Close the open hour of key ``i`` and every empty hour up to ``abs_hour``."""
+        open_hour = self._open_hour[i]
+        if open_hour < 0:
+            self._open_hour[i] = abs_hour
+            self._open_count[i] = 0.0
+            return
+        if abs_hour <= open_hour:
+            return
+        self._fold(i, open_hour, self._open_count[i])
+        # Quiet hours are real zero observations, but one week of them is enough
+        for h in range(open_hour + 1, min(abs_hour, open_hour + HOURS_PER_WEEK + 1)):
+            self._fold(i, h, 0.0)
+        self._open_hour[i] = abs_hour
+        self._open_count[i] = 0.0
+        self._dirty.add(i)
+
+    def _count(self, i: int, abs_hour: int, count: float):
+        self._advance(i, abs_hour)
+        if abs_hour == self._open_hour[i]:
+            self._open_count[i] += count
+            self._dirty.add(i)
+        # Late events for an already folded hour are ignored
+
+    def _replay(self, i: int, hours: dict[int, float]):
+        for abs_hour in sorted(hours):
+            self._count(i, abs_hour, hours[abs_hour])
+
+    # ── public API ─────────────────────────────────────────────────────────
+    def observe(self, site_id: Optional[str], event_type: str, ts: datetime):
+        """Count one event towards its site's current hour."""
+        with self._lock:
+            i = self._key_index(site_id, event_type)
+            abs_hour = absolute_hour(ts)
+            self._count(i, abs_hour, 1)
+            hours = self._pending.setdefault(i, {})
+            hours[abs_hour] = hours.get(abs_hour, 0) + 1
+
+    def roll(self, now: datetime):
+        """Close every key's open hour up to ``now`` so quiet hours count as zero."""
+        with self._lock:
+            current = absolute_hour(now)
+            for i in range(len(self._index)):
+                self._advance(i, current)
+
+    def baseline(
+        self, site_id: Optional[str], event_type: str, when: datetime
+    ) -> Optional[tuple[float, float, int]]:
+        """Return (mean, std, samples) for the hour-of-week of ``when``."""
+        i = self._index.get((site_id or "", event_type))
+        if i is None:
+            return None
+        pos = i * HOURS_PER_WEEK + hour_of_week(when)
+        return (
+            self._means[pos],
+            self._variances[pos] ** 0.5,
+            self._samples[pos],
+        )
+
+    # ── persistence ────────────────────────────────────────────────────────
+    def _rows(self, indexes) -> list[dict]:
+        keys = {i: key for key, i in self._index.items()}
+        rows = []
+        for i in indexes:
+            site_id, event_type = keys[i]
+            lo, hi = i * HOURS_PER_WEEK, (i + 1) * HOURS_PER_WEEK
+            rows.append(
+                {
+                    "site_id": site_id,
+                    "event_type": event_type,
+                    "means": self._means[lo:hi].tobytes(),
+                    "variances": self._variances[lo:hi].tobytes(),
+                    "samples": self._samples[lo:hi].tobytes(),
+                    "open_hour": self._open_hour[i],
+                    "open_count": self._open_count[i],
+                    "updated_at": datetime.utcnow(),
+                }
+            )
+        return rows
+
+    def _set_state(self, i: int, means, variances, samples, open_hour, open_count):
+        lo, hi = i * HOURS_PER_WEEK, (i + 1) * HOURS_PER_WEEK
+        self._means[lo:hi] = array("d", means)
+        self._variances[lo:hi] = array("d", variances)
+        self._samples[lo:hi] = array("H", samples)
+        self._open_hour[i] = open_hour
+        self._open_count[i] = open_count
+
+    def _load_row(self, row: EventBaseline):
+        self._set_state(
+            self._key_index(row.site_id, row.event_type),
+            row.means,
+            row.variances,
+            row.samples,
+            row.open_hour,
+            row.open_count,
+        )
+
+    def load(self):
+        """Load persisted baselines (once per process)."""
+        with self._lock:
+            if self._loaded:
+                return
+            self.alpha = current_app.config["BASELINE_EWMA_ALPHA"]
+            for row in EventBaseline.query.all():
+                self._load_row(row)
+            self._loaded = True
+
+    def flush(self):
+        """
+        Merge every key changed since the last flush into ``event_baselines``:
+        under a row lock, the persisted state plus this process's pending
+        counts, so concurrent ingest processes do not overwrite each other.
+        """
+        now = datetime.utcnow()
+        self.roll(now)
+        with self._lock:
+            keys = {i: key for key, i in self._index.items()}
+            dirty = sorted(self._dirty | set(self._pending))
+            pending, self._pending = self._pending, {}
+            self._dirty.clear()
+            self._last_flush = time.monotonic()
+        if not dirty:
+            return 0
+
+        try:
+            merged = self._merge([keys[i] for i in dirty], pending, dirty, now)
+        except Exception:
+            db.session.rollback()
+            # Keep the counts for the next flush
+            with self._lock:
+                for i, hours in pending.items():
+                    current = self._pending.setdefault(i, {})
+                    for abs_hour, count in hours.items():
+                        current[abs_hour] = current.get(abs_hour, 0) + count
+                self._dirty.update(dirty)
+            raise
+
+        # Adopt the merged state, plus what was observed during the merge
+        with self._lock:
+            for row in merged:
+                i = self._index[(row["site_id"], row["event_type"])]
+                self._set_state(
+                    i,
+                    row["means"],
+                    row["variances"],
+                    row["samples"],
+                    row["open_hour"],
+                    row["open_count"],
+                )
+                self._replay(i, self._pending.get(i, {}))
+        return len(merged)
+
+    def _merge(self, keys: list, pending: dict, dirty: list, now: datetime) -> list[dict]:
+        """Persisted state of ``keys`` with ``pending`` replayed on it, written back."""
+        merged = BaselineStore(alpha=self.alpha)
+        for key in keys:
+            merged._key_index(*key)
+        columns = ("means", "variances", "samples", "open_hour", "open_count", "updated_at")
+
+        # Create missing rows first so that every key has a row to lock
+        stmt = insert_stmt(EventBaseline).on_conflict_do_nothing(
+            index_elements=["site_id", "event_type"]
+        )
+        db.session.execute(stmt, merged._rows(range(len(keys))))
+        rows = (
+            EventBaseline.query.filter(
+                tuple_(EventBaseline.site_id, EventBaseline.event_type).in_(keys)
+            )
+            .with_for_update()
+            .all()
+        )
+        for row in rows:
+            merged._load_row(row)
+        current = absolute_hour(now)
+        for j, i in enumerate(dirty):
+            merged._replay(j, pending.get(i, {}))
+            merged._advance(j, current)
+
+        result = merged._rows(range(len(keys)))
+        stmt = insert_stmt(EventBaseline)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["site_id", "event_type"],
+            set_={col: getattr(stmt.excluded, col) for col in columns},
+        )
+        db.session.execute(stmt, result)
+        db.session.commit()
+        return result
+
+    def maybe_flush(self):
+        """Flush when BASELINE_FLUSH_INTERVAL has elapsed since the last flush."""
+        interval = current_app.config["BASELINE_FLUSH_INTERVAL"]
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+
+def load_baselines(event_type: str, site_id: Optional[str] = None) -> BaselineStore:
+    """
+    Read persisted baselines for one event type into a throwaway store.
+    Used by the alert engine, which runs outside the ingesting process.
+    """
+    store = BaselineStore(alpha=current_app.config["BASELINE_EWMA_ALPHA"])
+    query = EventBaseline.query.filter(EventBaseline.event_type == event_type)
+    if site_id:
+        query = query.filter(EventBaseline.site_id == site_id)
+    for row in query.all():
+        store._load_row(row)
+    return store
+
+
+# Process-wide store fed by the ingest routes
+baseline_store = BaselineStore()
@@ -0,0 +1,137 @@
+"""
+KPI deltas pushed to dashboard viewers over Socket.IO.
+
+Dashboards join the ``dashboard`` room (``subscribe_dashboard``), load one
+snapshot from /dashboard/overview and apply the ``dashboard_delta`` messages
+published here. Ingest, status changes and deletions add to an in-memory
+delta; it is emitted every DASHBOARD_DELTA_INTERVAL seconds (0 = on every
+write) and only when something changed, so the database load no longer grows
+with the number of open dashboards. Every process publishes its own deltas: clients sum them.
+"""
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from flask import current_app
+from app import socketio
+from app.models import Event, EventSeverity, EventStatus
+
+ROOM = "dashboard"
+_OPEN = {EventStatus.NEW.value, EventStatus.INVESTIGATING.value}
+
+
+class DashboardDeltas:
+    """Thread-safe KPI deltas accumulated between publications."""
+
+    def __init__(self):
+        # (breakdown, value) -> delta, plus ("kpi", name) for scalar KPIs
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self._last_publish = time.monotonic()
+        self._idle = True
+        self._publisher: Optional[threading.Thread] = None
+
+    def _count_status(self, event: Event, status: str, delta: int):
+        self._pending[("by_status", status)] += delta
+        if status in _OPEN:
+            self._pending[("kpi", "active_alerts")] += delta
+            if event.severity == EventSeverity.CRITICAL:
+                self._pending[("kpi", "critical_open")] += delta
+
+    def _count_event(self, event: Event, delta: int):
+        self._pending[("kpi", "events")] += delta
+        self._pending[("by_severity", event.severity.value)] += delta
+        self._pending[("by_source", event.source.value)] += delta
+        if event.site_id:
+            self._pending[("by_site", event.site_id)] += delta
+        self._count_status(event, event.status.value, delta)
+
+    def observe(self, event: Event):
+        """Count a newly ingested event."""
+        if event.event_type == "keepalive":
+            return
+        with self._lock:
+            self._pending[("kpi", "ingested")] += 1
+            self._count_event(event, 1)
+
+    def remove(self, event: Event):
+        """Uncount a deleted event."""
+        if event.event_type == "keepalive":
+            return
+        with self._lock:
+            self._count_event(event, -1)
+
+    def move_status(self, event: Event, old_status: str):
+        """Move one count from ``old_status`` to the event's current status."""
+        if event.event_type == "keepalive" or old_status == event.status.value:
+            return
+        with self._lock:
+            self._count_status(event, old_status, -1)
+            self._count_status(event, event.status.value, 1)
+
+    def take(self) -> Optional[dict]:
+        """
+        The delta accumulated since the last call, or None when there is
+        nothing to report (one empty delta is still returned after activity
+        stops so clients see the event rate drop to zero).
+        """
+        now = time.monotonic()
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            interval, self._last_publish = now - self._last_publish, now
+            changes = {key: delta for key, delta in pending.items() if delta}
+            if not changes and self._idle:
+                return None
+            self._idle = not changes
+
+        # "events" is the net change of the event count, the rate only
+        # counts ingested events
+        events = changes.pop(("kpi", "events"), 0)
+        ingested = changes.pop(("kpi", "ingested"), 0)
+        delta = {
+            "interval": round(interval, 3),
+            "events": events,
+            "eps": round(ingested / interval, 2) if interval > 0 else 0,
+            "by_severity": {},
+            "by_source": {},
+            "by_site": {},
+            "by_status": {},
+            "active_alerts": 0,
+            "critical_open": 0,
+        }
+        for (breakdown, value), count in changes.items():
+            if breakdown == "kpi":
+                delta[value] = count
+            else:
+                delta[breakdown][value] = count
+        return delta
+
+    def publish(self):
+        delta = self.take()
+        if delta is not None:
+            socketio.emit("dashboard_delta", delta, room=ROOM)
+
+    def after_write(self):
+        """Publish now, or make sure the background publisher is running."""
+        interval = current_app.config["DASHBOARD_DELTA_INTERVAL"]
+        if interval <= 0:
+            self.publish()
+            return
+        if self._publisher is None or not self._publisher.is_alive():
+            app = current_app._get_current_object()
+            self._publisher = threading.Thread(
+                target=self._publish_loop, args=(app, interval), daemon=True
+            )
+            self._publisher.start()
+
+    def _publish_loop(self, app, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.publish()
+            except Exception:
+                app.logger.exception("Dashboard delta publication failed")
+
+
+# Process-wide deltas fed by the ingest and event routes
+dashboard_deltas = DashboardDeltas()
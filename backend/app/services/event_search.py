@@ -0,0 +1,208 @@
+"""
+Full-text search over events.
+
+On PostgreSQL, ``events.search_vector`` is a stored generated tsvector of the
+description (weight A), key metadata values (weight B) and the raw log
+(weight C), indexed by the GIN index ix_events_search (migrations 0015 and
+0016): PostgreSQL maintains it on every insert, and a search is a single
+index lookup instead of an ILIKE over every row. It uses the 'simple'
+configuration, without stemming or stop words, so IP addresses, user names
+and host names are indexed as they appear in the logs.
+
+Search syntax (terms are ANDed):
+
+    word        contains the word
+    pre*        contains a word starting with "pre"
+    "a b c"     contains the phrase
+    -term       does not match the term (word, prefix or phrase)
+    x OR y      matches either side
+
+Other backends fall back to ILIKE on the description and raw log, without
+ranking or snippets.
+
+Fragments the text parser splits or never produces as a token (partial host
+names, paths, ``SRC=10.0.``) use ``apply_contains`` instead: a
+case-insensitive substring match served by the pg_trgm GIN indexes on both
+columns (migrations 0017 to 0019). A trigram index needs 3 characters to
+narrow anything down, hence EVENT_SEARCH_MIN_CONTAINS.
+"""
+import html
+import re
+from typing import Optional
+from flask import current_app
+from sqlalchemy import and_, func, literal_column, not_, or_, select, tuple_
+from app import db
+from app.models import Event
+
+SEARCH_CONFIG = "simple"
+
+# Metadata values indexed with the text (what analysts search events for)
+SEARCH_METADATA_KEYS = (
+    "source_ip",
+    "src_ip",
+    "dest_ip",
+    "username",
+    "user",
+    "hostname",
+    "agent_name",
+)
+
+# Control characters never survive ingest sanitisation, so they can mark the
+# matches in ts_headline output until the snippet is HTML-escaped
+_START, _STOP = "\x02", "\x03"
+_HEADLINE_OPTIONS = (
+    f"StartSel={_START}, StopSel={_STOP}, MaxWords=20, MinWords=5, "
+    "MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+_TOKEN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+
+def search_vector_sql() -> str:
+    """Expression of the ``events.search_vector`` generated column."""
+    metadata = " || ' ' || ".join(
+        f"coalesce(metadata->>'{key}', '')" for key in SEARCH_METADATA_KEYS
+    )
+    return (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', {metadata}), 'B') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(raw_log, '')), 'C')"
+    )
+
+
+def parse_search(text: str) -> list[list[tuple[str, str, bool]]]:
+    """
+    OR-alternatives of ANDed ``(kind, value, negated)`` terms, kind being
+    'word', 'prefix' or 'phrase'.
+    """
+    groups: list[list[tuple[str, str, bool]]] = [[]]
+    for match in _TOKEN.finditer(text):
+        minus, phrase, bare = match.groups()
+        if phrase is not None:
+            if phrase.strip():
+                groups[-1].append(("phrase", phrase.strip(), bool(minus)))
+            continue
+        if bare == "OR":
+            groups.append([])
+            continue
+        negated = bare.startswith("-") and len(bare) > 1
+        if negated:
+            bare = bare[1:]
+        if bare.endswith("*") and bare.strip("*"):
+            groups[-1].append(("prefix", bare.rstrip("*"), negated))
+        else:
+            groups[-1].append(("word", bare, negated))
+    return [group for group in groups if group]
+
+
+def _is_postgresql() -> bool:
+    return db.engine.dialect.name == "postgresql"
+
+
+def search_vector():
+    """The generated column, which the Event model does not map."""
+    return literal_column("events.search_vector")
+
+
+def _config():
+    return literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+
+
+def _term_tsquery(kind: str, value: str):
+    if kind == "phrase":
+        return func.phraseto_tsquery(_config(), value)
+    if kind == "prefix":
+        # Quoted lexeme with the :* prefix flag; quotes are doubled inside it
+        lexeme = value.replace("\\", "\\\\").replace("'", "''")
+        return func.to_tsquery(_config(), f"'{lexeme}':*")
+    return func.plainto_tsquery(_config(), value)
+
+
+def _tsquery(groups):
+    alternatives = []
+    for group in groups:
+        combined = None
+        for kind, value, negated in group:
+            term = _term_tsquery(kind, value)
+            if negated:
+                term = func.tsquery_not(term)
+            combined = term if combined is None else func.tsquery_and(combined, term)
+        alternatives.append(combined)
+    tsquery = alternatives[0]
+    for alternative in alternatives[1:]:
+        tsquery = func.tsquery_or(tsquery, alternative)
+    return tsquery
+
+
+def _ilike(groups):
+    def term(kind, value, negated):
+        pattern = f"%{value}%"
+        found = or_(Event.description.ilike(pattern), Event.raw_log.ilike(pattern))
+        return not_(found) if negated else found
+
+    return or_(*(and_(*(term(*t) for t in group)) for group in groups))
+
+
+def apply_search(query, text: str):
+    """
+    ``query`` filtered on the search ``text``, and the tsquery to rank and
+    highlight with (None when the backend has no full-text search).
+    """
+    groups = parse_search(text)
+    if not groups:
+        return query, None
+    if not _is_postgresql():
+        return query.filter(_ilike(groups)), None
+    tsquery = _tsquery(groups)
+    return query.filter(search_vector().op("@@")(tsquery)), tsquery
+
+
+def apply_contains(query, fragment: str):
+    """``query`` filtered on events whose description or raw log contains ``fragment``."""
+    return query.filter(
+        or_(
+            Event.description.icontains(fragment, autoescape=True),
+            Event.raw_log.icontains(fragment, autoescape=True),
+        )
+    )
+
+
+def limit_search_time():
+    """Cancel the rest of the transaction's queries after EVENT_SEARCH_TIMEOUT seconds."""
+    if _is_postgresql():
+        timeout_ms = int(current_app.config["EVENT_SEARCH_TIMEOUT"] * 1000)
+        db.session.execute(select(func.set_config("statement_timeout", str(timeout_ms), True)))
+
+
+def is_timeout(error: Exception) -> bool:
+    """Whether a database error is a query cancelled by statement_timeout."""
+    return getattr(getattr(error, "orig", None), "pgcode", None) == "57014"
+
+
+def rank(tsquery):
+    """Relevance of an event: cover density, description matches weigh most."""
+    return func.ts_rank_cd(search_vector(), tsquery)
+
+
+def snippets(events: list[Event], tsquery) -> dict[str, Optional[str]]:
+    """
+    HTML snippets of ``events`` (event id -> text around the matches, with
+    the matches in <mark>). Only the given events are highlighted: ts_headline
+    re-parses the whole text, too costly to run on every match.
+    """
+    if not events:
+        return {}
+    text = func.concat_ws(" … ", Event.description, Event.raw_log)
+    rows = db.session.execute(
+        select(Event.id, func.ts_headline(_config(), text, tsquery, _HEADLINE_OPTIONS)).where(
+            tuple_(Event.timestamp, Event.id).in_([(e.timestamp, e.id) for e in events])
+        )
+    ).all()
+    return {
+        str(event_id): html.escape(headline)
+        .replace(_START, "<mark>")
+        .replace(_STOP, "</mark>")
+        if headline
+        else None
+        for event_id, headline in rows
+    }
@@ -0,0 +1,196 @@
+"""
+Background health monitor for the SOC's dependencies.
+
+A daemon thread probes GLPI, the Wazuh API, Redis and the database every
+HEALTH_CHECK_INTERVAL seconds and keeps the last HEALTH_HISTORY_SIZE results
+of each with their latency. Request handlers only read the latest snapshot,
+so no request ever waits on a probe and a slow dependency is probed once per
+interval whatever the traffic.
+
+Probes run in parallel, each on its own thread, and one that has not answered
+within twice HEALTH_CHECK_TIMEOUT is recorded as failed: a hung dependency
+cannot hold back the others' results. A result older than
+HEALTH_STALE_INTERVALS intervals is reported as stale (``ok`` None).
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+import requests
+from flask import current_app
+from sqlalchemy import func, select, text
+from app import db
+from app.services.glpi_service import GLPI_APP_TOKEN, GLPI_URL
+
+
+def _probe_glpi(timeout: float):
+    resp = requests.get(
+        f"{GLPI_URL}/initSession", headers={"App-Token": GLPI_APP_TOKEN}, timeout=timeout
+    )
+    if resp.status_code >= 500:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+
+
+def _probe_wazuh(timeout: float):
+    # Any answer below 500 (401 without a token) means the API is up; the lab
+    # manager uses a self-signed certificate, as in services/wazuh_api.py
+    resp = requests.get(current_app.config["WAZUH_API_URL"], verify=False, timeout=timeout)
+    if resp.status_code >= 500:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+
+
+def _probe_redis(timeout: float):
+    import redis
+
+    client = redis.Redis.from_url(
+        current_app.config["REDIS_URL"], socket_timeout=timeout, socket_connect_timeout=timeout
+    )
+    try:
+        client.ping()
+    finally:
+        client.close()
+
+
+def _probe_database(timeout: float):
+    try:
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute(
+                select(func.set_config("statement_timeout", str(int(timeout * 1000)), True))
+            )
+        db.session.execute(text("SELECT 1"))
+    finally:
+        db.session.remove()
+
+
+# Dependency -> probe raising on failure
+PROBES: dict[str, Callable[[float], None]] = {
+    "glpi": _probe_glpi,
+    "wazuh": _probe_wazuh,
+    "redis": _probe_redis,
+    "database": _probe_database,
+}
+
+
+class HealthMonitor:
+    """Probes every dependency periodically and keeps their recent results."""
+
+    def __init__(self):
+        self._history: dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _timed_probe(app, name: str, timeout: float) -> dict:
+        started = time.perf_counter()
+        result = {"ok": True, "error": None}
+        with app.app_context():
+            try:
+                PROBES[name](timeout)
+            except Exception as e:
+                result = {"ok": False, "error": str(e)[:200]}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def check_all(self, names: Optional[list] = None) -> dict:
+        """Run the probes of ``names`` (default all) in parallel and record their results."""
+        config = current_app.config
+        app = current_app._get_current_object()
+        names = list(names or PROBES)
+        timeout = config["HEALTH_CHECK_TIMEOUT"]
+        executor = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="health-probe")
+        futures = {name: executor.submit(self._timed_probe, app, name, timeout) for name in names}
+        # A hung probe keeps its thread, but no longer holds back the others
+        executor.shutdown(wait=False)
+
+        deadline = time.monotonic() + 2 * timeout
+        results = {}
+        for name, future in futures.items():
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                result = {
+                    "ok": False,
+                    "error": f"no answer within {2 * timeout:g}s",
+                    "latency_ms": round(2 * timeout * 1000, 1),
+                }
+            result["checked_at"] = datetime.utcnow().isoformat() + "Z"
+            results[name] = result
+
+        with self._lock:
+            for name, result in results.items():
+                history = self._history.get(name)
+                if history is None:
+                    history = self._history[name] = deque(maxlen=config["HEALTH_HISTORY_SIZE"])
+                history.append(result)
+        return results
+
+    def check(self, name: str) -> dict:
+        """Run one probe now and record its result."""
+        return self.check_all([name])[name]
+
+    @staticmethod
+    def _with_staleness(result: dict) -> dict:
+        """``result`` flagged stale (and unknown) once the probes stopped refreshing it."""
+        config = current_app.config
+        interval = config["HEALTH_CHECK_INTERVAL"]
+        checked_at = datetime.fromisoformat(result["checked_at"].rstrip("Z"))
+        age = datetime.utcnow() - checked_at
+        stale = interval > 0 and age > timedelta(
+            seconds=interval * config["HEALTH_STALE_INTERVALS"]
+        )
+        if stale:
+            return {**result, "ok": None, "stale": True}
+        return {**result, "stale": False}
+
+    def latest(self, name: str) -> Optional[dict]:
+        """Latest result of ``name``, or None before its first probe."""
+        with self._lock:
+            history = self._history.get(name)
+            latest = dict(history[-1]) if history else None
+        return self._with_staleness(latest) if latest else None
+
+    def snapshot(self) -> dict:
+        """Latest result and history of every dependency."""
+        with self._lock:
+            history = {name: list(results) for name, results in self._history.items()}
+        checks = {}
+        for name in PROBES:
+            results = history.get(name, [])
+            checks[name] = {
+                **(
+                    self._with_staleness(results[-1])
+                    if results
+                    else {"ok": None, "error": "not checked yet"}
+                ),
+                "history": [
+                    {k: r[k] for k in ("ok", "latency_ms", "checked_at")} for r in results
+                ],
+            }
+        return checks
+
+    def ensure_started(self):
+        """Start the background probes (no-op when HEALTH_CHECK_INTERVAL is 0)."""
+        interval = current_app.config["HEALTH_CHECK_INTERVAL"]
+        if interval <= 0:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            app = current_app._get_current_object()
+            self._thread = threading.Thread(
+                target=self._probe_loop, args=(app, interval), daemon=True
+            )
+            self._thread.start()
+
+    def _probe_loop(self, app, interval: float):
+        while True:
+            with app.app_context():
+                try:
+                    self.check_all()
+                except Exception:
+                    app.logger.exception("Health probes failed")
+            time.sleep(interval)
+
+
+# Process-wide monitor read by the dashboard and /health/deep
+health_monitor = HealthMonitor()
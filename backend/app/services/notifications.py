@@ -54,13 +54,21 @@ def send_webhook_alert(url: str, payload: dict) -> bool:
         return False
 
 
-def format_alert_message(rule: dict, events: list = None) -> str:
+def format_alert_message(
+    rule: dict, events: list = None, suppressed: int = 0, group_keys: list = None
+) -> str:
     """Format alert message for notifications."""
     lines = [
         f"Alert Rule Triggered: {rule['name']}",
         f"Severity: {rule['severity'].upper()}",
         f"Description: {rule.get('description', 'N/A')}",
         f"Condition: {rule['condition']}",
+    ]
+    if group_keys and group_keys != ["*"]:
+        lines.append(f"Groups: {', '.join(group_keys)}")
+    if suppressed:
+        lines.append(f"+ {suppressed} more events suppressed during cooldown")
+    lines += [
         "",
         "---",
         "SOC Dashboard - Audioprothésistes Network"
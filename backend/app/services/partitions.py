@@ -0,0 +1,187 @@
+"""
+Range partitions of the events table (PostgreSQL).
+
+``events`` is partitioned by RANGE (timestamp), one partition per day (or
+per ISO week with EVENTS_PARTITION_INTERVAL = "week") named
+``events_pYYYYMMDD`` after its first day. Partitions are created
+EVENTS_PARTITION_PREMAKE days ahead by a periodic task, and a DEFAULT
+partition catches timestamps outside every range. Queries filtering on
+timestamp only visit the partitions they need; retention detaches and drops
+whole partitions instead of deleting rows.
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+from flask import current_app
+from sqlalchemy import text
+from app import db
+
+DEFAULT_PARTITION = "events_default"
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def is_partitioned() -> bool:
+    """True when the events table is a partitioned table."""
+    if db.engine.dialect.name != "postgresql":
+        return False
+    relkind = db.session.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass('events')")
+    ).scalar()
+    return relkind == "p"
+
+
+def _period(day: date) -> tuple[date, date]:
+    """First day and end (exclusive) of the partition holding ``day``."""
+    if current_app.config["EVENTS_PARTITION_INTERVAL"] == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    return day, day + timedelta(days=1)
+
+
+def partition_name(start: date) -> str:
+    return f"events_p{start:%Y%m%d}"
+
+
+def list_partitions() -> dict[str, tuple[datetime, datetime]]:
+    """Ranged partitions of events as {name: (start, end)}; DEFAULT excluded."""
+    rows = db.session.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'events'::regclass"
+        )
+    ).all()
+    partitions = {}
+    for name, bound in rows:
+        match = _BOUNDS.search(bound or "")
+        if match:
+            partitions[name] = (
+                datetime.fromisoformat(match.group(1)),
+                datetime.fromisoformat(match.group(2)),
+            )
+    return partitions
+
+
+def _create_partitions(first_day: date, last_day: date) -> list[str]:
+    existing = {start.date() for start, _ in list_partitions().values()}
+    created = []
+    day = first_day
+    while day <= last_day:
+        start, end = _period(day)
+        day = end
+        if start in existing:
+            continue
+        name = partition_name(start)
+        try:
+            # Savepoint: a failure (e.g. DEFAULT already holds rows of this
+            # range) must not abort the other partitions
+            with db.session.begin_nested():
+                db.session.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF events "
+                        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}') "
+                        "WITH (fillfactor = 90)"
+                    )
+                )
+            created.append(name)
+        except Exception as e:
+            current_app.logger.warning(f"Could not create partition {name}: {e}")
+    return created
+
+
+def ensure_partitions(first_day: Optional[date] = None) -> list[str]:
+    """
+    Create the DEFAULT partition and every missing partition from
+    ``first_day`` (default: today) to EVENTS_PARTITION_PREMAKE days ahead.
+    Returns the names of the partitions created.
+    """
+    if not is_partitioned():
+        return []
+    today = datetime.utcnow().date()
+    last_day = today + timedelta(days=current_app.config["EVENTS_PARTITION_PREMAKE"])
+    db.session.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF events DEFAULT "
+            "WITH (fillfactor = 90)"
+        )
+    )
+    created = _create_partitions(first_day or today, last_day)
+    db.session.commit()
+    return created
+
+
+def drop_expired_partitions(retention_days: int) -> list[str]:
+    """
+    Detach and drop every partition whose whole range is older than
+    ``retention_days``. Returns the names of the partitions dropped.
+    """
+    if not is_partitioned() or retention_days <= 0:
+        return []
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    dropped = []
+    for name, (_, end) in sorted(list_partitions().items(), key=lambda p: p[1]):
+        if end <= cutoff:
+            db.session.execute(text(f"ALTER TABLE events DETACH PARTITION {name}"))
+            db.session.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    db.session.commit()
+    return dropped
+
+
+def convert_events_table() -> bool:
+    """
+    Turn a plain events table into a partitioned one, in one transaction.
+
+    Rows are copied into daily partitions covering the oldest event to the
+    premake horizon, then the old table is dropped and its indexes are
+    recreated on the partitioned table. The copy holds an ACCESS EXCLUSIVE
+    lock on events, so run it in a maintenance window on large tables.
+    Returns False when events is already partitioned.
+    """
+    if db.engine.dialect.name != "postgresql" or is_partitioned():
+        return False
+
+    indexes = db.session.execute(
+        text(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = 'events' "
+            "AND indexname <> 'events_pkey'"
+        )
+    ).scalars().all()
+    first = db.session.execute(text("SELECT min(timestamp) FROM events")).scalar()
+
+    db.session.execute(text("ALTER TABLE events RENAME TO events_unpartitioned"))
+    db.session.execute(
+        text("ALTER INDEX events_pkey RENAME TO events_unpartitioned_pkey")
+    )
+    db.session.execute(
+        text(
+            "CREATE TABLE events (LIKE events_unpartitioned "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (timestamp)"
+        )
+    )
+    # The partition key must be part of the primary key
+    db.session.execute(
+        text("ALTER TABLE events ADD CONSTRAINT events_pkey PRIMARY KEY (id, timestamp)")
+    )
+    db.session.execute(
+        text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF events DEFAULT WITH (fillfactor = 90)")
+    )
+    today = datetime.utcnow().date()
+    _create_partitions(
+        first.date() if first else today,
+        today + timedelta(days=current_app.config["EVENTS_PARTITION_PREMAKE"]),
+    )
+    db.session.execute(text("INSERT INTO events SELECT * FROM events_unpartitioned"))
+    db.session.execute(text("DROP TABLE events_unpartitioned"))
+
+    db.session.execute(
+        text(
+            "ALTER TABLE events ADD FOREIGN KEY (incident_id) "
+            "REFERENCES incidents(id) ON DELETE SET NULL"
+        )
+    )
+    for indexdef in indexes:
+        db.session.execute(text(indexdef))
+    db.session.commit()
+    return True
@@ -106,14 +106,14 @@ class PlaybookRunner:
             if target_var == "event.src_ip" and execution.triggered_by_event_id:
                 from app.models import Event
 
-                event = Event.query.get(execution.triggered_by_event_id)
+                event = Event.query.filter_by(id=execution.triggered_by_event_id).first()
                 if event and "src_ip" in event.event_metadata:
                     target = event.event_metadata["src_ip"]
             elif target_var == "alert.src_ip" and execution.triggered_by_alert_id:
                 # If triggered by alert, find the corresponding event representing the alert
                 from app.models import Event
 
-                alert_event = Event.query.get(execution.triggered_by_alert_id)
+                alert_event = Event.query.filter_by(id=execution.triggered_by_alert_id).first()
                 if alert_event and "src_ip" in alert_event.event_metadata:
                     target = alert_event.event_metadata["src_ip"]
                 else:
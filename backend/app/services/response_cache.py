@@ -0,0 +1,208 @@
+"""
+Response cache for the dashboard endpoints.
+
+Entries are keyed by path + normalized query string and tagged with the
+ingest version, a counter bumped once written data reaches what the
+dashboard reads: after each rollup or sketch flush and after alert rule
+evaluations that opened or updated incidents. An entry is served while it is
+younger than DASHBOARD_CACHE_MIN_TTL, or while it is younger than
+DASHBOARD_CACHE_TTL and the version did not change since it was computed.
+Entries computed on a read replica expire after REPLICA_MAX_LAG seconds at
+most, since the replica may still lag the version they are tagged with.
+Concurrent misses on the same key are coalesced (singleflight): one request
+computes, the others wait for its result.
+
+Entries live in process memory (L1). The ingest version lives in Redis with
+DASHBOARD_CACHE_SHARED_VERSION (the default), so a bump made by a Celery
+worker evaluating alert rules invalidates the web processes' entries too.
+With DASHBOARD_CACHE_REDIS enabled, entries are shared through Redis as well
+(L2) so every worker benefits from a computation done by any of them.
+"""
+import json
+import threading
+import time
+from functools import wraps
+from typing import Callable, Optional
+from urllib.parse import urlencode
+from flask import current_app, g, has_app_context, request
+
+_VERSION_KEY = "soc:dashboard:ingest_version"
+_ENTRY_PREFIX = "soc:dashboard:response:"
+_MAX_ENTRIES = 256
+
+
+class ResponseCache:
+    """Two-level, version-aware cache with singleflight on misses."""
+
+    def __init__(self):
+        self._entries: dict[str, dict] = {}
+        self._inflight: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self._redis = None
+        self._redis_url: Optional[str] = None
+
+    # ── Redis (L2) ─────────────────────────────────────────────────────────
+    def _redis_client(self, for_version: bool = False):
+        """Redis client for entries, or for the ingest version; None when not shared."""
+        config = current_app.config
+        shared = config["DASHBOARD_CACHE_REDIS"] or (
+            for_version and config["DASHBOARD_CACHE_SHARED_VERSION"]
+        )
+        if not shared:
+            return None
+        if self._redis is None or self._redis_url != config["REDIS_URL"]:
+            import redis
+
+            self._redis_url = config["REDIS_URL"]
+            self._redis = redis.Redis.from_url(
+                self._redis_url, socket_timeout=0.2, socket_connect_timeout=0.2
+            )
+        return self._redis
+
+    def _l2_get(self, key: str) -> Optional[dict]:
+        client = self._redis_client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(_ENTRY_PREFIX + key)
+        except Exception as e:
+            current_app.logger.warning(f"Dashboard cache L2 read failed: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    def _l2_set(self, key: str, entry: dict):
+        client = self._redis_client()
+        if client is None:
+            return
+        try:
+            client.setex(
+                _ENTRY_PREFIX + key,
+                max(1, int(current_app.config["DASHBOARD_CACHE_TTL"])),
+                json.dumps(entry),
+            )
+        except Exception as e:
+            current_app.logger.warning(f"Dashboard cache L2 write failed: {e}")
+
+    # ── ingest version ─────────────────────────────────────────────────────
+    def bump_version(self):
+        """Record that events were written; cached entries become stale."""
+        with self._lock:
+            self._version += 1
+        client = self._redis_client(for_version=True)
+        if client is not None:
+            try:
+                client.incr(_VERSION_KEY)
+            except Exception as e:
+                current_app.logger.warning(f"Dashboard cache version bump failed: {e}")
+
+    def current_version(self) -> int:
+        client = self._redis_client(for_version=True)
+        if client is not None:
+            try:
+                return int(client.get(_VERSION_KEY) or 0)
+            except Exception:
+                pass
+        return self._version
+
+    # ── lookups ────────────────────────────────────────────────────────────
+    def _is_fresh(self, entry: Optional[dict], version: int) -> bool:
+        if entry is None:
+            return False
+        config = current_app.config
+        age = time.time() - entry["created"]
+        if age < config["DASHBOARD_CACHE_MIN_TTL"]:
+            return True
+        ttl = min(config["DASHBOARD_CACHE_TTL"], entry.get("max_age") or float("inf"))
+        return entry["version"] == version and age < ttl
+
+    def _store(self, key: str, entry: dict):
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= _MAX_ENTRIES:
+                oldest = min(self._entries, key=lambda k: self._entries[k]["created"])
+                del self._entries[oldest]
+            self._entries[key] = entry
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], tuple[str, int]]
+    ) -> tuple[dict, str]:
+        """
+        Return (entry, "HIT" | "MISS") for ``key``; ``compute`` returns
+        (body, status) and runs at most once per key across concurrent callers.
+        Only 200 responses are cached.
+        """
+        version = self.current_version()
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if self._is_fresh(entry, version):
+                    return entry, "HIT"
+                waiter = self._inflight.get(key)
+                leader = waiter is None
+                if leader:
+                    self._inflight[key] = threading.Event()
+
+            if not leader:
+                # Another request is computing this key: wait, then re-check
+                waiter.wait(timeout=30)
+                continue
+
+            try:
+                entry = self._l2_get(key)
+                if self._is_fresh(entry, version):
+                    self._store(key, entry)
+                    return entry, "HIT"
+
+                body, status = compute()
+                entry = {
+                    "body": body,
+                    "status": status,
+                    "version": version,
+                    "created": time.time(),
+                }
+                if has_app_context() and g.get("replica_key") is not None:
+                    # The replica may not have replayed the writes behind
+                    # ``version`` yet: keep the entry no longer than it can lag
+                    entry["max_age"] = current_app.config["REPLICA_MAX_LAG"]
+                if status == 200:
+                    self._store(key, entry)
+                    self._l2_set(key, entry)
+                return entry, "MISS"
+            finally:
+                with self._lock:
+                    self._inflight.pop(key).set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def cache_key() -> str:
+    """Path plus query parameters in a canonical order."""
+    args = sorted(request.args.items(multi=True))
+    return f"{request.path}?{urlencode(args)}"
+
+
+def cached_response(view):
+    """Serve a JSON view through the dashboard response cache."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config["DASHBOARD_CACHE_ENABLED"]:
+            return view(*args, **kwargs)
+
+        def compute():
+            response = current_app.make_response(view(*args, **kwargs))
+            return response.get_data(as_text=True), response.status_code
+
+        entry, state = response_cache.get_or_compute(cache_key(), compute)
+        response = current_app.response_class(
+            entry["body"], status=entry["status"], mimetype="application/json"
+        )
+        response.headers["X-Cache"] = state
+        return response
+
+    return wrapper
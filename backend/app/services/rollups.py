@@ -0,0 +1,236 @@
+"""
+Per-minute event rollups maintained at ingest.
+
+Ingest routes add +1 deltas to an in-memory buffer keyed by
+(minute, source, severity, status, event_type, site_id); status changes move
+one count between two status keys and deletions add -1. The buffer is merged into
+``event_rollups`` with a single additive INSERT ... ON CONFLICT statement,
+either on every ingest (ROLLUP_FLUSH_INTERVAL = 0) or from a background
+merger thread every ROLLUP_FLUSH_INTERVAL seconds. Several processes can
+flush concurrently since every flush only adds deltas. Each flush bumps the
+dashboard response cache version once committed.
+
+The table is multi-resolution: ``compact_rollups`` (an hourly Celery task)
+folds minute buckets older than ROLLUP_MINUTE_RETENTION_DAYS into hour
+buckets, and hour buckets older than ROLLUP_HOURLY_RETENTION_DAYS into day
+buckets. Counts stay additive, so every query summing rows by bucket range
+reads the coarser buckets unchanged, and history outlives raw events.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+from flask import current_app
+from sqlalchemy import delete, extract, func, or_, text
+from app import db
+from app.models import Event
+from app.models.rollup import EventRollup
+from app.services.response_cache import response_cache
+from app.services.upsert import insert_stmt
+
+
+KEY_COLUMNS = ["bucket", "source", "severity", "status", "event_type", "site_id"]
+
+
+def _minute(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def _hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _key(event: Event, status: Optional[str] = None) -> tuple:
+    return (
+        _minute(event.timestamp),
+        event.source.value,
+        event.severity.value,
+        status or event.status.value,
+        event.event_type,
+        event.site_id or "",
+    )
+
+
+class RollupBuffer:
+    """Thread-safe buffer of pending rollup deltas."""
+
+    def __init__(self):
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self._merger: Optional[threading.Thread] = None
+
+    def observe(self, event: Event):
+        """Count a newly ingested event."""
+        if event.event_type == "keepalive":
+            return
+        with self._lock:
+            self._pending[_key(event)] += 1
+
+    def move_status(self, event: Event, old_status: str):
+        """Move one count from ``old_status`` to the event's current status."""
+        if event.event_type == "keepalive" or old_status == event.status.value:
+            return
+        with self._lock:
+            self._pending[_key(event, old_status)] -= 1
+            self._pending[_key(event)] += 1
+
+    def remove(self, event: Event):
+        """Uncount a deleted event (its bucket may since have been compacted: counts add up)."""
+        if event.event_type == "keepalive":
+            return
+        with self._lock:
+            self._pending[_key(event)] -= 1
+
+    def flush(self) -> int:
+        """
+        Merge pending deltas into event_rollups. Returns the number of rows
+        touched. Cached dashboard responses become stale once the deltas are
+        committed, not when the events are written: a response computed in
+        between would otherwise be cached from the old rollups under the new
+        version.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        rows = [
+            {
+                "bucket": bucket,
+                "source": source,
+                "severity": severity,
+                "status": status,
+                "event_type": event_type,
+                "site_id": site_id,
+                "count": delta,
+            }
+            for (bucket, source, severity, status, event_type, site_id), delta in pending.items()
+            if delta
+        ]
+        if not rows:
+            return 0
+
+        try:
+            add_counts(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                self._pending.update(pending)
+            raise
+        response_cache.bump_version()
+        return len(rows)
+
+    def after_write(self):
+        """Flush now, or make sure the background merger is running."""
+        interval = current_app.config["ROLLUP_FLUSH_INTERVAL"]
+        if interval <= 0:
+            try:
+                self.flush()
+            except Exception:
+                current_app.logger.exception("Rollup flush failed")
+            return
+        if self._merger is None or not self._merger.is_alive():
+            app = current_app._get_current_object()
+            self._merger = threading.Thread(
+                target=self._merge_loop, args=(app, interval), daemon=True
+            )
+            self._merger.start()
+
+    def _merge_loop(self, app, interval: float):
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    app.logger.exception("Rollup flush failed")
+                finally:
+                    db.session.remove()
+
+
+def add_counts(rows: list[dict]):
+    """Add each row's count to its rollup row, creating it when missing."""
+    stmt = insert_stmt(EventRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={"count": EventRollup.__table__.c.count + stmt.excluded.count},
+    )
+    db.session.execute(stmt, rows)
+
+
+def _compact(before: datetime, unaligned, truncate) -> int:
+    """Fold buckets older than ``before`` matching ``unaligned`` into ``truncate``d buckets."""
+    # DELETE ... RETURNING: rows flushed concurrently are either folded or left alone
+    removed = db.session.execute(
+        delete(EventRollup)
+        .where(EventRollup.bucket < before, unaligned)
+        .returning(*(getattr(EventRollup, c) for c in KEY_COLUMNS), EventRollup.count)
+    ).all()
+    folded: Counter = Counter()
+    for bucket, *key, count in removed:
+        folded[(truncate(bucket), *key)] += count
+    rows = [
+        dict(zip(KEY_COLUMNS, key), count=count) for key, count in folded.items() if count
+    ]
+    if rows:
+        add_counts(rows)
+    return len(removed)
+
+
+def compact_rollups(now: Optional[datetime] = None) -> dict:
+    """
+    Fold minute buckets past ROLLUP_MINUTE_RETENTION_DAYS into hours and
+    hour buckets past ROLLUP_HOURLY_RETENTION_DAYS into days.
+    Returns the number of rows folded per resolution.
+    """
+    config = current_app.config
+    now = now or datetime.utcnow()
+    bucket = EventRollup.bucket
+    try:
+        minutes = _compact(
+            _hour(now - timedelta(days=config["ROLLUP_MINUTE_RETENTION_DAYS"])),
+            extract("minute", bucket) != 0,
+            _hour,
+        )
+        hours = _compact(
+            _day(now - timedelta(days=config["ROLLUP_HOURLY_RETENTION_DAYS"])),
+            or_(extract("hour", bucket) != 0, extract("minute", bucket) != 0),
+            _day,
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"minute": minutes, "hour": hours}
+
+
+def rebuild_rollups() -> int:
+    """
+    Recompute event_rollups from the events table (PostgreSQL).
+    Used once to backfill history that predates the rollup table.
+    """
+    db.session.execute(text("DELETE FROM event_rollups"))
+    db.session.execute(
+        text(
+            """
+            INSERT INTO event_rollups
+                (bucket, source, severity, status, event_type, site_id, count)
+            SELECT date_trunc('minute', timestamp), lower(source::text),
+                   lower(severity::text), lower(status::text), event_type,
+                   coalesce(site_id, ''), count(*)
+            FROM events
+            WHERE event_type <> 'keepalive'
+            GROUP BY 1, 2, 3, 4, 5, 6
+            """
+        )
+    )
+    db.session.commit()
+    return db.session.query(func.count()).select_from(EventRollup).scalar()
+
+
+# Process-wide buffer fed by the ingest and event routes
+rollup_buffer = RollupBuffer()
@@ -0,0 +1,145 @@
+"""Save-time cost estimation and guardrails for alert rule conditions."""
+from datetime import timedelta
+from typing import Optional
+from flask import current_app
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app import db
+from app.services.alert_engine import AlertEngine
+
+
+class explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper around a SELECT statement."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def _pg_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _walk_plan(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk_plan(child)
+
+
+def explain_query(query) -> Optional[dict]:
+    """
+    Run the planner on a query without executing it.
+    Returns {"rows", "cost", "seq_scan"} or None when EXPLAIN is unavailable
+    (non-PostgreSQL backends).
+    """
+    if db.engine.dialect.name != "postgresql":
+        return None
+    try:
+        plan = db.session.execute(explain(query.statement)).scalar()
+    except Exception as e:
+        current_app.logger.warning(f"Rule cost EXPLAIN failed: {e}")
+        db.session.rollback()
+        return None
+
+    if isinstance(plan, list):
+        plan = plan[0]
+    root = plan["Plan"]
+    return {
+        "rows": int(root.get("Plan Rows", 0)),
+        "cost": float(root.get("Total Cost", 0.0)),
+        "seq_scan": any(
+            n.get("Node Type") == "Seq Scan" and n.get("Relation Name") == "events"
+            for n in _walk_plan(root)
+        ),
+    }
+
+
+def plan_index_names(statement) -> Optional[set[str]]:
+    """
+    Names of the indexes the planner would use for ``statement``, or None
+    when EXPLAIN is unavailable (non-PostgreSQL backends).
+    """
+    if db.engine.dialect.name != "postgresql":
+        return None
+    plan = db.session.execute(explain(statement)).scalar()
+    if isinstance(plan, list):
+        plan = plan[0]
+    return {n["Index Name"] for n in _walk_plan(plan["Plan"]) if "Index Name" in n}
+
+
+def _suggested_index(condition: dict) -> str:
+    columns = [
+        col
+        for col in ("event_type", "source", "severity", "site_id")
+        if condition.get(col) and condition.get(col) != "any"
+    ]
+    columns.append("timestamp")
+    return f"CREATE INDEX ON events ({', '.join(columns)})"
+
+
+def estimate_rule_cost(condition: dict) -> dict:
+    """
+    Estimate what evaluating a rule condition costs on every beat tick.
+
+    Returns a report:
+    {
+        "estimate": {"rows": ..., "cost": ..., "seq_scan": ...} or None,
+        "over_budget": bool,
+        "reasons": [...],
+        "suggestions": [...]
+    }
+    """
+    engine = AlertEngine()
+    config = current_app.config
+    reasons = []
+    suggestions = []
+
+    # Static guardrails: these hold on every backend, EXPLAIN or not
+    delta = engine.condition_timeframe(condition)
+    max_timeframe = engine.parse_timeframe(config["RULE_MAX_TIMEFRAME"])
+    if delta is None:
+        reasons.append("timeframe is not a valid duration, rule would scan all history")
+        suggestions.append("Use a timeframe such as '10m', '1h' or '24h'")
+    elif max_timeframe and delta > max_timeframe:
+        reasons.append(
+            f"timeframe exceeds the maximum of {config['RULE_MAX_TIMEFRAME']}"
+        )
+        suggestions.append(
+            f"Narrow the timeframe to {config['RULE_MAX_TIMEFRAME']} or less"
+        )
+
+    # A match expression is a filter of its own
+    unfiltered = not condition.get("match") and all(
+        condition.get(col) in (None, "any")
+        for col in ("event_type", "source", "severity", "site_id")
+    )
+    if unfiltered and (delta is None or delta > timedelta(hours=1)):
+        reasons.append("condition matches every event type, source and site")
+        suggestions.append(
+            "Restrict the rule with an event_type, source, site_id or match expression"
+        )
+
+    # Planner estimate
+    estimate = explain_query(engine.build_query(condition))
+    if estimate:
+        if estimate["rows"] > config["RULE_COST_MAX_ROWS"]:
+            reasons.append(
+                f"estimated {estimate['rows']} rows per evaluation "
+                f"(budget {config['RULE_COST_MAX_ROWS']})"
+            )
+        if estimate["cost"] > config["RULE_COST_MAX_COST"]:
+            reasons.append(
+                f"estimated cost {estimate['cost']:.0f} per evaluation "
+                f"(budget {config['RULE_COST_MAX_COST']:.0f})"
+            )
+        if estimate["seq_scan"]:
+            suggestions.append(_suggested_index(condition))
+
+    return {
+        "estimate": estimate,
+        "over_budget": bool(reasons),
+        "reasons": reasons,
+        "suggestions": suggestions,
+    }
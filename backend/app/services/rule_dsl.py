@@ -0,0 +1,461 @@
+"""
+Boolean condition language for alert rules.
+
+A rule's ``condition.match`` holds an expression such as::
+
+    event_type IN ("auth_failure", "port_scan")
+        AND severity >= "high"
+        AND NOT site_id = "lab"
+        AND (metadata.dest_port < 1024 OR raw_log ~ "sshd\\[\\d+\\]")
+
+Supported syntax:
+    AND / OR / NOT and parentheses
+    field = | != | < | <= | > | >= value
+    field [NOT] IN (value, ...)
+    field ~ "regex"
+    fields: event_type, source, severity, status, site_id, description,
+            raw_log, assigned_to, metadata.<key>[.<key>...]
+    values: "strings", 'strings', numbers, true, false, null
+            (\\" \\' and \\\\ are the only escapes in strings; any other
+            backslash is kept, so regexes are written as-is)
+
+Each expression is compiled once (and cached) into a SQLAlchemy clause for
+batch evaluation and a Python predicate for matching a single event.
+Severity comparisons follow severity order (low < medium < high < critical).
+Metadata values are compared as the JSON type of the value they are compared
+with: ``metadata.port < 1024`` only matches JSON numbers, ``= true`` only
+booleans, and a string comparison sees numbers and booleans as their JSON
+text. Values of an IN list must all have the same type.
+"""
+import json
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Optional
+from sqlalchemy import Boolean, and_, case, or_, not_, false
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from app.models import Event, EventSeverity, EventSource, EventStatus
+
+
+class RuleSyntaxError(ValueError):
+    """Raised when a match expression cannot be parsed or compiled."""
+
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op>!=|<=|>=|=|<|>|~|\(|\)|,)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+    )""",
+    re.VERBOSE,
+)
+_KEYWORDS = {"AND", "OR", "NOT", "IN", "TRUE", "FALSE", "NULL"}
+
+_COLUMNS = {
+    "event_type": Event.event_type,
+    "source": Event.source,
+    "severity": Event.severity,
+    "status": Event.status,
+    "site_id": Event.site_id,
+    "description": Event.description,
+    "raw_log": Event.raw_log,
+    "assigned_to": Event.assigned_to,
+}
+_ENUMS = {"source": EventSource, "severity": EventSeverity, "status": EventStatus}
+_SEVERITY_ORDER = ["low", "medium", "high", "critical"]
+
+_COMPARATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _json_kind(value) -> str:
+    """JSON type of a literal or metadata value: string, number, boolean or null."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    return "string"
+
+
+def _tokenize(text: str) -> list[tuple[str, Any]]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise RuleSyntaxError(f"Unexpected character at position {pos}: {text[pos:pos + 10]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "number":
+            tokens.append(("value", float(value) if "." in value else int(value)))
+        elif kind == "string":
+            # Only quotes and backslashes are escapes: regex escapes such as
+            # \d or \[ keep their backslash
+            tokens.append(("value", re.sub(r"\\([\"'\\])", r"\1", value[1:-1])))
+        elif kind == "name" and value.upper() in _KEYWORDS:
+            word = value.upper()
+            if word in ("TRUE", "FALSE", "NULL"):
+                tokens.append(("value", {"TRUE": True, "FALSE": False, "NULL": None}[word]))
+            else:
+                tokens.append((word, word))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing a small tuple AST."""
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self, *kinds) -> bool:
+        if self.pos >= len(self.tokens):
+            return False
+        kind, value = self.tokens[self.pos]
+        return kind in kinds or (kind == "op" and value in kinds)
+
+    def take(self, *kinds):
+        if not self.peek(*kinds):
+            found = self.tokens[self.pos][1] if self.pos < len(self.tokens) else "end of expression"
+            raise RuleSyntaxError(f"Expected {' or '.join(kinds)}, found {found!r}")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token[1]
+
+    def parse(self):
+        node = self.or_expr()
+        if self.pos != len(self.tokens):
+            raise RuleSyntaxError(f"Unexpected {self.tokens[self.pos][1]!r}")
+        return node
+
+    def or_expr(self):
+        nodes = [self.and_expr()]
+        while self.peek("OR"):
+            self.take("OR")
+            nodes.append(self.and_expr())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def and_expr(self):
+        nodes = [self.not_expr()]
+        while self.peek("AND"):
+            self.take("AND")
+            nodes.append(self.not_expr())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def not_expr(self):
+        if self.peek("NOT"):
+            self.take("NOT")
+            return ("not", self.not_expr())
+        if self.peek("("):
+            self.take("(")
+            node = self.or_expr()
+            self.take(")")
+            return node
+        return self.comparison()
+
+    def comparison(self):
+        field = self.take("name")
+        if field not in _COLUMNS and not field.startswith("metadata."):
+            raise RuleSyntaxError(f"Unknown field: {field}")
+
+        negated = False
+        if self.peek("NOT"):
+            self.take("NOT")
+            negated = True
+            if not self.peek("IN"):
+                raise RuleSyntaxError("Expected IN after NOT")
+        if self.peek("IN"):
+            self.take("IN")
+            self.take("(")
+            values = [self.take("value")]
+            while self.peek(","):
+                self.take(",")
+                values.append(self.take("value"))
+            self.take(")")
+            if len({_json_kind(v) for v in values}) > 1:
+                raise RuleSyntaxError(f"IN values of {field} must all have the same type")
+            node = ("in", field, values)
+            return ("not", node) if negated else node
+
+        op = self.take(*_COMPARATORS, "~")
+        value = self.take("value")
+        if op == "~":
+            if not isinstance(value, str):
+                raise RuleSyntaxError("Regex pattern must be a string")
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise RuleSyntaxError(f"Invalid regex {value!r}: {e}")
+            return ("regex", field, value)
+        return ("cmp", field, op, value)
+
+
+# ── SQL compilation ────────────────────────────────────────────────────────────
+
+
+def _enum_member(field: str, value):
+    try:
+        return _ENUMS[field](value)
+    except ValueError:
+        raise RuleSyntaxError(
+            f"Invalid {field}: {value!r}. Must be one of: {[m.value for m in _ENUMS[field]]}"
+        )
+
+
+class json_type_is(FunctionElement):
+    """Whether a JSON element has the given JSON type ('number' or 'boolean')."""
+
+    type = Boolean()
+    inherit_cache = True
+    name = "json_type_is"
+
+
+@compiles(json_type_is)
+def _pg_json_type_is(element, compiler, **kw):
+    value, kind = list(element.clauses)
+    return f"jsonb_typeof({compiler.process(value, **kw)}) = {compiler.process(kind, **kw)}"
+
+
+@compiles(json_type_is, "sqlite")
+def _sqlite_json_type_is(element, compiler, **kw):
+    value, kind = list(element.clauses)
+    # json_type() on the document and path: JSON_EXTRACT turns true into 1
+    document = compiler.process(value.left, **kw)
+    path = compiler.process(value.right, **kw)
+    return (
+        f"CASE json_type({document}, {path}) "
+        "WHEN 'integer' THEN 'number' WHEN 'real' THEN 'number' "
+        "WHEN 'true' THEN 'boolean' WHEN 'false' THEN 'boolean' END "
+        f"= {compiler.process(kind, **kw)}"
+    )
+
+
+def _metadata_expr(field: str, value):
+    """
+    The metadata element as the SQL type of ``value``. Numbers and booleans
+    are only cast from JSON values of that type (NULL otherwise), so a
+    non-numeric value in one row cannot fail the whole query.
+    """
+    path = tuple(field.split(".")[1:])
+    element = Event.event_metadata[path if len(path) > 1 else path[0]]
+    kind = _json_kind(value)
+    if kind == "boolean":
+        return case((json_type_is(element, "boolean"), element.as_boolean()))
+    if kind == "number":
+        return case((json_type_is(element, "number"), element.as_float()))
+    return element.as_string()
+
+
+def _severities(op: str, value: str) -> list:
+    rank = _SEVERITY_ORDER.index(_enum_member("severity", value).value)
+    compare = _COMPARATORS[op]
+    return [
+        EventSeverity(name)
+        for i, name in enumerate(_SEVERITY_ORDER)
+        if compare(i, rank)
+    ]
+
+
+def _to_sql(node):
+    kind = node[0]
+    if kind == "and":
+        return and_(*[_to_sql(n) for n in node[1]])
+    if kind == "or":
+        return or_(*[_to_sql(n) for n in node[1]])
+    if kind == "not":
+        return not_(_to_sql(node[1]))
+
+    field = node[1]
+    if kind == "regex":
+        column = _COLUMNS.get(field)
+        if field in _ENUMS:
+            raise RuleSyntaxError(f"Regex is not supported on {field}")
+        if column is None:
+            column = _metadata_expr(field, "")
+        return column.regexp_match(node[2])
+
+    if kind == "in":
+        values = node[2]
+        if field in _ENUMS:
+            return _COLUMNS[field].in_([_enum_member(field, v) for v in values])
+        if field in _COLUMNS:
+            return _COLUMNS[field].in_(values)
+        return _metadata_expr(field, values[0]).in_(values)
+
+    # Comparison
+    op, value = node[2], node[3]
+    if field in _COLUMNS:
+        column = _COLUMNS[field]
+        if value is None:
+            if op not in ("=", "!="):
+                raise RuleSyntaxError("null can only be compared with = or !=")
+            return column.is_(None) if op == "=" else column.isnot(None)
+        if field == "severity" and op not in ("=", "!="):
+            members = _severities(op, value)
+            return column.in_(members) if members else false()
+        if field in _ENUMS:
+            value = _enum_member(field, value)
+        return _COMPARATORS[op](column, value)
+
+    element = _metadata_expr(field, value)
+    if value is None:
+        if op not in ("=", "!="):
+            raise RuleSyntaxError("null can only be compared with = or !=")
+        return element.is_(None) if op == "=" else element.isnot(None)
+    return _COMPARATORS[op](element, value)
+
+
+# ── Python compilation ─────────────────────────────────────────────────────────
+# Predicates follow SQL three-valued logic: comparisons against a missing
+# value return None (unknown), so NOT does not turn a missing field into a match.
+
+
+def _getter(field: str, kind: str = "string") -> Callable[[Event], Any]:
+    """Reads ``field``; metadata values are coerced for comparing with a ``kind`` value."""
+    if field in _ENUMS:
+        return lambda e: getattr(getattr(e, field), "value", getattr(e, field))
+    if field in _COLUMNS:
+        return lambda e: getattr(e, field)
+
+    path = field.split(".")[1:]
+
+    def get(event):
+        value = event.event_metadata or {}
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return _coerce(value, kind)
+
+    return get
+
+
+def _coerce(actual, kind: str):
+    """
+    A metadata value as the SQL side sees it when compared with a ``kind``
+    value: numbers and booleans only from JSON values of that type (None
+    otherwise), strings as the JSON text ->> returns.
+    """
+    if actual is None or kind == "null":
+        return actual
+    if kind == "string":
+        return actual if isinstance(actual, str) else json.dumps(actual)
+    if _json_kind(actual) != kind:
+        return None
+    return float(actual) if kind == "number" else actual
+
+
+def _to_predicate(node) -> Callable[[Event], Optional[bool]]:
+    kind = node[0]
+    if kind == "and":
+        parts = [_to_predicate(n) for n in node[1]]
+
+        def and_pred(e):
+            result = True
+            for part in parts:
+                value = part(e)
+                if value is False:
+                    return False
+                if value is None:
+                    result = None
+            return result
+
+        return and_pred
+    if kind == "or":
+        parts = [_to_predicate(n) for n in node[1]]
+
+        def or_pred(e):
+            result = False
+            for part in parts:
+                value = part(e)
+                if value is True:
+                    return True
+                if value is None:
+                    result = None
+            return result
+
+        return or_pred
+    if kind == "not":
+        inner = _to_predicate(node[1])
+
+        def not_pred(e):
+            value = inner(e)
+            return None if value is None else not value
+
+        return not_pred
+
+    field = node[1]
+
+    if kind == "regex":
+        get = _getter(field)
+        pattern = re.compile(node[2])
+        return lambda e: None if get(e) is None else bool(pattern.search(str(get(e))))
+
+    if kind == "in":
+        value_kind = _json_kind(node[2][0])
+        get = _getter(field, value_kind)
+        values = {_coerce(v, value_kind) for v in node[2]}
+        return lambda e: None if get(e) is None else get(e) in values
+
+    op, value = node[2], node[3]
+    get = _getter(field, _json_kind(value))
+    if value is None:
+        return (lambda e: get(e) is None) if op == "=" else (lambda e: get(e) is not None)
+
+    if field == "severity" and op not in ("=", "!="):
+        allowed = {m.value for m in _severities(op, value)}
+        return lambda e: None if get(e) is None else get(e) in allowed
+
+    compare = _COMPARATORS[op]
+
+    def cmp_pred(e):
+        actual = get(e)
+        if actual is None:
+            return None
+        try:
+            return compare(actual, value)
+        except TypeError:
+            return None
+
+    return cmp_pred
+
+
+class CompiledExpression:
+    """A parsed match expression with its SQL clause and Python predicate."""
+
+    def __init__(self, text: str):
+        self.text = text
+        ast = _Parser(text).parse()
+        self.clause = _to_sql(ast)
+        self._predicate = _to_predicate(ast)
+
+    def matches(self, event: Event) -> bool:
+        """True when the event satisfies the expression."""
+        return self._predicate(event) is True
+
+
+def compile_expression(text: str) -> CompiledExpression:
+    """Parse and compile an expression, caching the result by its text."""
+    # Checked before the cache lookup: lists and dicts are unhashable
+    if not isinstance(text, str) or not text.strip():
+        raise RuleSyntaxError("Match expression must be a non-empty string")
+    return _compile_cached(text)
+
+
+@lru_cache(maxsize=512)
+def _compile_cached(text: str) -> CompiledExpression:
+    return CompiledExpression(text)
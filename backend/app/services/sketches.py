@@ -0,0 +1,372 @@
+"""
+Streaming sketches for the dashboard top-K and distinct-count panels.
+
+Every ingested event is offered to two kinds of mergeable sketches, one per
+time bucket and dimension:
+
+* ``topk``: a Space-Saving summary per hour for source IP, user and host.
+  It monitors at most SKETCH_TOPK_CAPACITY items. The count reported for an
+  item over-estimates its true count by at most that item's ``error``, and
+  an item that is not monitored occurred at most ``bound()`` times.
+* ``distinct``: a HyperLogLog per day for site, source IP, user and host.
+  It uses 2**SKETCH_HLL_PRECISION one-byte registers and has a relative
+  standard error of 1.04 / sqrt(2**precision).
+
+Merging the sketches of consecutive buckets summarizes any window of whole
+buckets. HyperLogLogs of different precisions merge at the lower one, so
+buckets written before a SKETCH_HLL_PRECISION change stay readable. Pending sketches are merged into ``sketch_buckets`` every
+SKETCH_FLUSH_INTERVAL seconds (0 = on every ingest); readers also merge the
+sketches still pending in their own process.
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional, Union
+from flask import current_app
+from app import db
+from app.models import Event, EventSeverity
+from app.models.sketch import SketchBucket
+from app.services.response_cache import response_cache
+from app.services.upsert import insert_stmt
+
+TOPK = "topk"
+DISTINCT = "distinct"
+
+# Dimension -> event metadata keys, tried in order
+DIMENSIONS = {
+    "ip": ("source_ip", "src_ip"),
+    "user": ("username", "user"),
+    "host": ("hostname", "agent_name"),
+}
+# Dimensions counted by the distinct sketches ("site" is Event.site_id)
+DISTINCT_DIMENSIONS = ("site", "ip", "user", "host")
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# Top-K sketches are hourly, distinct sketches daily
+BUCKETS = {TOPK: hour_bucket, DISTINCT: day_bucket}
+
+
+def dimension_value(event: Event, dimension: str) -> Optional[str]:
+    """The event's value for ``dimension``, or None when it has none."""
+    if dimension == "site":
+        return event.site_id or None
+    metadata = event.event_metadata or {}
+    for key in DIMENSIONS[dimension]:
+        value = metadata.get(key)
+        if value not in (None, "", "null"):
+            return str(value)
+    return None
+
+
+class SpaceSaving:
+    """Space-Saving summary with per-item error and critical/high tallies."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # item -> [count, error, critical, high]
+        self.counters: dict[str, list[int]] = {}
+        # Upper bound for items dropped by merges
+        self.floor = 0
+
+    def bound(self) -> int:
+        """Upper bound on the count of any item this summary does not monitor."""
+        if len(self.counters) < self.capacity:
+            return self.floor
+        return max(self.floor, min(c[0] for c in self.counters.values()))
+
+    def offer(self, item: str, weight: int = 1, critical: int = 0, high: int = 0):
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+            counter[2] += critical
+            counter[3] += high
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[item] = [weight, 0, critical, high]
+            return
+        # Replace the smallest counter; the newcomer inherits its count as error
+        victim = min(self.counters, key=lambda k: self.counters[k][0])
+        low = self.counters.pop(victim)[0]
+        self.counters[item] = [low + weight, low, critical, high]
+
+    def merge(self, other: "SpaceSaving"):
+        """Fold ``other`` into this summary (mergeable Space-Saving)."""
+        own_bound, other_bound = self.bound(), other.bound()
+        merged = {}
+        for item in self.counters.keys() | other.counters.keys():
+            mine = self.counters.get(item)
+            theirs = other.counters.get(item)
+            merged[item] = [
+                (mine[0] if mine else own_bound) + (theirs[0] if theirs else other_bound),
+                (mine[1] if mine else own_bound) + (theirs[1] if theirs else other_bound),
+                (mine[2] if mine else 0) + (theirs[2] if theirs else 0),
+                (mine[3] if mine else 0) + (theirs[3] if theirs else 0),
+            ]
+        self.capacity = max(self.capacity, other.capacity)
+        self.floor = own_bound + other_bound
+        if len(merged) > self.capacity:
+            ranked = sorted(merged.items(), key=lambda kv: kv[1][0], reverse=True)
+            self.floor = max(self.floor, ranked[self.capacity][1][0])
+            merged = dict(ranked[: self.capacity])
+        self.counters = merged
+
+    def top(self, k: int) -> list[dict]:
+        ranked = sorted(self.counters.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return [
+            {
+                "value": item,
+                "count": count,
+                "error": error,
+                "critical": critical,
+                "high": high,
+            }
+            for item, (count, error, critical, high) in ranked[:k]
+        ]
+
+    def to_bytes(self) -> bytes:
+        payload = {
+            "capacity": self.capacity,
+            "floor": self.floor,
+            "counters": [[item, *counter] for item, counter in self.counters.items()],
+        }
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SpaceSaving":
+        payload = json.loads(zlib.decompress(data))
+        sketch = cls(payload["capacity"])
+        sketch.floor = payload["floor"]
+        sketch.counters = {item: counter for item, *counter in payload["counters"]}
+        return sketch
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with one-byte registers."""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+        h = int.from_bytes(digest, "big")
+        width = 64 - self.precision
+        index = h >> width
+        rank = width - (h & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def downsample(self, precision: int) -> "HyperLogLog":
+        """
+        This sketch at a lower ``precision``, as if built at it: the index
+        bits dropped become the leading bits of the rank.
+        """
+        dropped = self.precision - precision
+        if dropped < 0:
+            raise ValueError(f"Cannot raise HyperLogLog precision {self.precision} to {precision}")
+        sketch = HyperLogLog(precision)
+        low_mask = (1 << dropped) - 1
+        for index, rank in enumerate(self.registers):
+            if not rank:
+                continue
+            low = index & low_mask
+            rank = dropped - low.bit_length() + 1 if low else rank + dropped
+            target = index >> dropped
+            if rank > sketch.registers[target]:
+                sketch.registers[target] = rank
+        return sketch
+
+    def merge(self, other: "HyperLogLog"):
+        """
+        Union with ``other``; sketches of different precision (after a
+        SKETCH_HLL_PRECISION change) merge at the lower of the two.
+        """
+        if other.precision > self.precision:
+            other = other.downsample(self.precision)
+        elif other.precision < self.precision:
+            downsampled = self.downsample(other.precision)
+            self.precision, self.registers = downsampled.precision, downsampled.registers
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range: linear counting is more accurate
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(bytes([self.precision]) + bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        raw = zlib.decompress(data)
+        sketch = cls(raw[0])
+        sketch.registers = bytearray(raw[1:])
+        return sketch
+
+
+Sketch = Union[SpaceSaving, HyperLogLog]
+SKETCH_TYPES = {TOPK: SpaceSaving, DISTINCT: HyperLogLog}
+
+
+class SketchStore:
+    """Bucketed sketches per kind and dimension, buffered between flushes."""
+
+    def __init__(self):
+        self._pending: dict[tuple[datetime, str, str], Sketch] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def new_sketch(kind: str) -> Sketch:
+        config = current_app.config
+        if kind == TOPK:
+            return SpaceSaving(config["SKETCH_TOPK_CAPACITY"])
+        return HyperLogLog(config["SKETCH_HLL_PRECISION"])
+
+    def _pending_sketch(self, kind: str, dimension: str, ts: datetime) -> Sketch:
+        key = (BUCKETS[kind](ts), kind, dimension)
+        sketch = self._pending.get(key)
+        if sketch is None:
+            sketch = self._pending[key] = self.new_sketch(kind)
+        return sketch
+
+    def observe(self, event: Event):
+        """Offer a newly ingested event to its buckets' sketches."""
+        if event.event_type == "keepalive":
+            return
+        critical = int(event.severity == EventSeverity.CRITICAL)
+        high = int(event.severity == EventSeverity.HIGH)
+        values = {d: dimension_value(event, d) for d in DISTINCT_DIMENSIONS}
+        with self._lock:
+            for dimension in DIMENSIONS:
+                if values[dimension] is not None:
+                    self._pending_sketch(TOPK, dimension, event.timestamp).offer(
+                        values[dimension], critical=critical, high=high
+                    )
+            for dimension in DISTINCT_DIMENSIONS:
+                if values[dimension] is not None:
+                    self._pending_sketch(DISTINCT, dimension, event.timestamp).add(
+                        values[dimension]
+                    )
+
+    def _merge_into_bucket(self, bucket: datetime, kind: str, dimension: str, sketch: Sketch):
+        # Make sure the row exists, then lock it so concurrent flushes serialize
+        db.session.execute(
+            insert_stmt(SketchBucket)
+            .values(
+                bucket=bucket,
+                kind=kind,
+                dimension=dimension,
+                data=self.new_sketch(kind).to_bytes(),
+                updated_at=datetime.utcnow(),
+            )
+            .on_conflict_do_nothing()
+        )
+        row = (
+            SketchBucket.query.filter_by(bucket=bucket, kind=kind, dimension=dimension)
+            .populate_existing()
+            .with_for_update()
+            .one()
+        )
+        stored = SKETCH_TYPES[kind].from_bytes(row.data)
+        stored.merge(sketch)
+        row.data = stored.to_bytes()
+
+    def flush(self) -> int:
+        """Merge pending sketches into sketch_buckets. Returns the number of buckets touched."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            for key, sketch in sorted(pending.items(), key=lambda kv: kv[0]):
+                self._merge_into_bucket(*key, sketch)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the sketches back so the next flush retries them
+            with self._lock:
+                for key, sketch in pending.items():
+                    newer = self._pending.get(key)
+                    if newer is not None:
+                        sketch.merge(newer)
+                    self._pending[key] = sketch
+            raise
+        response_cache.bump_version()
+        return len(pending)
+
+    def maybe_flush(self):
+        """Flush when SKETCH_FLUSH_INTERVAL has elapsed since the last flush."""
+        interval = current_app.config["SKETCH_FLUSH_INTERVAL"]
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def buckets(self, kind: str, dimension: str, since: datetime) -> dict[datetime, Sketch]:
+        """Sketch of every bucket from the one containing ``since`` onwards."""
+        start = BUCKETS[kind](since)
+        result = {
+            row.bucket: SKETCH_TYPES[kind].from_bytes(row.data)
+            for row in SketchBucket.query.filter(
+                SketchBucket.kind == kind,
+                SketchBucket.dimension == dimension,
+                SketchBucket.bucket >= start,
+            )
+        }
+        with self._lock:
+            for (bucket, pending_kind, pending_dimension), sketch in self._pending.items():
+                if (pending_kind, pending_dimension) == (kind, dimension) and bucket >= start:
+                    if bucket not in result:
+                        result[bucket] = self.new_sketch(kind)
+                    result[bucket].merge(sketch)
+        return result
+
+    def window(self, kind: str, dimension: str, since: datetime) -> Sketch:
+        """One sketch merging every bucket from the one containing ``since`` onwards."""
+        merged = self.new_sketch(kind)
+        for sketch in self.buckets(kind, dimension, since).values():
+            merged.merge(sketch)
+        return merged
+
+
+def rebuild_sketches(days: int = 7) -> int:
+    """
+    Recompute the sketches of the last ``days`` from the events table.
+    Used once to backfill history that predates the sketch table.
+    """
+    since = day_bucket(datetime.utcnow()) - timedelta(days=days)
+    SketchBucket.query.filter(SketchBucket.bucket >= since).delete()
+    store = SketchStore()
+    events = (
+        Event.query.filter(Event.timestamp >= since, Event.event_type != "keepalive")
+        .order_by(Event.timestamp)
+        .yield_per(1000)
+    )
+    for event in events:
+        store.observe(event)
+    return store.flush()
+
+
+# Process-wide store fed by the ingest routes
+sketch_store = SketchStore()
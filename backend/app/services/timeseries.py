@@ -0,0 +1,80 @@
+"""
+Time-series helpers for the dashboard charts.
+
+``floor_bucket`` and ``fill_gaps`` turn the sparse buckets returned by a
+GROUP BY into a dense series with explicit zeros, so a missing point always
+means "no events". ``lttb`` downsamples a series to a fixed number of points
+with Largest-Triangle-Three-Buckets, which keeps the peaks and troughs a
+plain stride or average would flatten.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Sequence, TypeVar
+
+T = TypeVar("T")
+_EPOCH = datetime(1970, 1, 1)
+
+
+def naive_utc(ts: datetime) -> datetime:
+    """``ts`` as a naive UTC datetime (to_timestamp() returns aware ones)."""
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def floor_bucket(ts: datetime, step: timedelta) -> datetime:
+    """Start of the ``step``-sized bucket (aligned on the Unix epoch) holding ``ts``."""
+    seconds = int(step.total_seconds())
+    epoch = int((naive_utc(ts) - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=epoch - epoch % seconds)
+
+
+def fill_gaps(
+    counts: dict[datetime, int], start: datetime, end: datetime, step: timedelta
+) -> list[tuple[datetime, int]]:
+    """Every bucket from the one holding ``start`` to the one holding ``end``, 0 when absent."""
+    counts = {floor_bucket(ts, step): count for ts, count in counts.items()}
+    series = []
+    bucket = floor_bucket(start, step)
+    last = floor_bucket(end, step)
+    while bucket <= last:
+        series.append((bucket, counts.get(bucket, 0)))
+        bucket += step
+    return series
+
+
+def lttb(
+    points: Sequence[T],
+    threshold: int,
+    x: Callable[[T], float],
+    y: Callable[[T], float],
+) -> list[T]:
+    """
+    Keep ``threshold`` of ``points`` (sorted by ``x``) with
+    Largest-Triangle-Three-Buckets. The first and last points are always
+    kept; a threshold below 3 or not below len(points) returns every point.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    every = (n - 2) / (threshold - 2)
+    sampled = [points[0]]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # Average of the next bucket: the third vertex of the triangle
+        following = points[end : min(int((i + 2) * every) + 1, n)]
+        avg_x = sum(x(p) for p in following) / len(following)
+        avg_y = sum(y(p) for p in following) / len(following)
+
+        ax, ay = x(points[a]), y(points[a])
+        a = max(
+            range(start, end),
+            key=lambda j: abs(
+                (ax - avg_x) * (y(points[j]) - ay) - (ax - x(points[j])) * (avg_y - ay)
+            ),
+        )
+        sampled.append(points[a])
+    sampled.append(points[-1])
+    return sampled
@@ -0,0 +1,16 @@
+"""Dialect-aware INSERT ... ON CONFLICT helper."""
+from app import db
+
+
+def insert_stmt(model):
+    """
+    Return an INSERT construct for the bound dialect that supports
+    on_conflict_do_update / on_conflict_do_nothing.
+    PostgreSQL in production, SQLite in the test suite.
+    """
+    table = model.__table__ if hasattr(model, "__table__") else model
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
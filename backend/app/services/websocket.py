@@ -47,6 +47,20 @@ def handle_unsubscribe_site(data):
         emit('unsubscribed', {'site_id': site_id})
 
 
+@socketio.on('subscribe_dashboard')
+def handle_subscribe_dashboard(data=None):
+    """Receive the dashboard KPI deltas (see services/dashboard_deltas.py)."""
+    join_room('dashboard')
+    emit('subscribed', {'room': 'dashboard'})
+
+
+@socketio.on('unsubscribe_dashboard')
+def handle_unsubscribe_dashboard(data=None):
+    """Stop receiving the dashboard KPI deltas."""
+    leave_room('dashboard')
+    emit('unsubscribed', {'room': 'dashboard'})
+
+
 @socketio.on('subscribe_severity')
 def handle_subscribe_severity(data):
     """Subscribe to events of a specific severity or higher."""
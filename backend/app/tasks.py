@@ -46,15 +46,22 @@ def evaluate_alerts():
         triggered = engine.evaluate_all_rules()
 
         for alert in triggered:
-            rule = alert["rule"]
-            process_alert.delay(rule)
+            process_alert.delay(
+                alert["rule"],
+                suppressed=alert["suppressed_occurrences"],
+                group_keys=alert["group_keys"],
+            )
 
         return {"triggered_count": len(triggered)}
 
 
 @celery.task
-def process_alert(rule_dict: dict):
-    """Process a triggered alert - send notifications."""
+def process_alert(rule_dict: dict, suppressed: int = 0, group_keys: list = None):
+    """
+    Process a triggered alert - send notifications.
+    ``suppressed`` is the number of matching events swallowed by the rule's
+    cooldown since its previous notification.
+    """
     with app.app_context():
         rule_id = rule_dict["id"]
         rule = AlertRule.query.get(rule_id)
@@ -62,11 +69,20 @@ def process_alert(rule_dict: dict):
         if not rule:
             return {"error": "Rule not found"}
 
-        message = format_alert_message(rule_dict)
+        message = format_alert_message(
+            rule_dict, suppressed=suppressed, group_keys=group_keys
+        )
 
         # Emit WebSocket alert
         socketio.emit(
-            "alert", {"type": "rule_triggered", "rule": rule_dict, "message": message}
+            "alert",
+            {
+                "type": "rule_triggered",
+                "rule": rule_dict,
+                "message": message,
+                "suppressed_occurrences": suppressed,
+                "group_keys": group_keys or [],
+            },
         )
 
         # Send notification based on action type
@@ -122,11 +138,42 @@ def process_alert(rule_dict: dict):
         }
 
 
+@celery.task
+def maintain_event_partitions():
+    """
+    Periodic task creating upcoming events partitions and, when
+    EVENTS_RETENTION_DAYS is set, dropping partitions past retention.
+    """
+    from app.services.partitions import drop_expired_partitions, ensure_partitions
+
+    with app.app_context():
+        created = ensure_partitions()
+        dropped = drop_expired_partitions(app.config["EVENTS_RETENTION_DAYS"])
+        return {"created": created, "dropped": dropped}
+
+
+@celery.task
+def compact_event_rollups():
+    """
+    Periodic task folding old minute rollups into hours and old hour rollups
+    into days, so long-range dashboard history stays small and outlives
+    raw events.
+    """
+    from app.services.rollups import compact_rollups
+
+    with app.app_context():
+        return compact_rollups()
+
+
 @celery.task
 def cleanup_old_events(days: int = 90):
     """
-    Cleanup task to remove old resolved events.
-    Keeps events for specified number of days.
+    Cleanup task to remove old events.
+    Deletes resolved events not updated for the specified number of days.
+
+    Open events and events of any other status are kept, partitioned table
+    or not: dropping whole partitions is the separate, opt-in
+    EVENTS_RETENTION_DAYS retention of maintain_event_partitions.
     """
     from datetime import datetime, timedelta
     from app.models import Event, EventStatus
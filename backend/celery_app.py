@@ -19,6 +19,14 @@ celery.conf.update(
             'task': 'app.tasks.evaluate_alerts',
             'schedule': Config.ALERT_CHECK_INTERVAL,
         },
+        'maintain-event-partitions': {
+            'task': 'app.tasks.maintain_event_partitions',
+            'schedule': 3600,
+        },
+        'compact-event-rollups': {
+            'task': 'app.tasks.compact_event_rollups',
+            'schedule': 3600,
+        },
     }
 )
 
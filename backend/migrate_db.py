@@ -1,13 +1,277 @@
 import os
 import sys
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, literal_column, or_, select, text, tuple_
 
 from app import create_app, db
 
+# ── Migration steps ────────────────────────────────────────────────────────────
+# Every step is idempotent (IF NOT EXISTS / guarded backfills) so databases
+# migrated before schema_migrations existed can be brought under versioning.
+
+
+def _execute(*statements):
+    """Migration step running raw SQL statements in one transaction."""
+
+    def run():
+        with db.engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+
+    return run
+
+
+def _create_index_concurrently(name: str, definition: str):
+    """
+    Migration step building an index without blocking writes to its table.
+
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so it uses an
+    autocommit connection. An interrupted build leaves an INVALID index
+    behind, which IF NOT EXISTS would skip: it is dropped and rebuilt.
+    Partitioned tables cannot be indexed concurrently: the index is created
+    on the parent only, built concurrently on each partition, then attached.
+    ``definition`` starts with "ON <table>".
+    """
+    table = definition.split()[1]
+
+    def build(conn, index: str, index_definition: str):
+        invalid = conn.execute(
+            text(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": index},
+        ).first()
+        if invalid:
+            print(f"  Dropping invalid index '{index}' left by an interrupted build...")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index}"))
+        conn.execute(
+            text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} {index_definition}")
+        )
+
+    def run():
+        with db.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as conn:
+            relkind = conn.execute(
+                text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": table},
+            ).scalar()
+            if relkind != "p":
+                build(conn, name, definition)
+                return
+
+            only = definition.replace(f"ON {table}", f"ON ONLY {table}", 1)
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} {only}"))
+            partitions = conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = to_regclass(:table)"
+                ),
+                {"table": table},
+            ).scalars().all()
+            for partition in partitions:
+                child = f"{partition}_{name}"[:63]
+                build(conn, child, definition.replace(f"ON {table}", f"ON {partition}", 1))
+                conn.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+    return run
+
+
+def _add_events_search_vector():
+    """Add the generated tsvector column behind event full-text search."""
+    from app.services.event_search import search_vector_sql
+
+    # Rewrites events (and each partition) once to compute the column
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({search_vector_sql()}) STORED"
+            )
+        )
+
+
+def _set_events_fillfactor():
+    """Leave room on each page for in-place (HOT) updates of events."""
+    from app.services.partitions import is_partitioned, list_partitions
+
+    # Partitioned tables carry no storage; partitions are created WITH
+    # (fillfactor = 90) and existing ones are altered here
+    tables = list(list_partitions()) if is_partitioned() else ["events"]
+    with db.engine.begin() as conn:
+        for table in tables:
+            conn.execute(text(f"ALTER TABLE {table} SET (fillfactor = 90)"))
+
+
+def _partition_events():
+    """Convert events into a table range-partitioned on timestamp."""
+    from app.services.partitions import convert_events_table
+
+    if convert_events_table():
+        print("  Copied events into daily partitions.")
+
+
+def _backfill_rollups():
+    """Backfill dashboard rollups for events ingested before they existed."""
+    from app.models import Event, EventRollup
+    from app.services.rollups import rebuild_rollups
+
+    if EventRollup.query.first() is None and Event.query.first() is not None:
+        rows = rebuild_rollups()
+        print(f"  Created {rows} rollup rows.")
+
+
+def _backfill_sketches():
+    """Backfill the top-K and distinct-count sketches for the last 30 days."""
+    from app.models import Event, SketchBucket
+    from app.services.sketches import rebuild_sketches
+
+    if SketchBucket.query.first() is None and Event.query.first() is not None:
+        buckets = rebuild_sketches(days=30)
+        print(f"  Created {buckets} sketch buckets.")
+
+
+# (version, description, step) — applied in order, each at most once
+MIGRATIONS = [
+    (
+        "0001_events_incident_id",
+        "Link events to incidents",
+        _execute(
+            "ALTER TABLE events ADD COLUMN IF NOT EXISTS incident_id UUID "
+            "REFERENCES incidents(id) ON DELETE SET NULL",
+            "CREATE INDEX IF NOT EXISTS ix_events_incident_id ON events (incident_id)",
+        ),
+    ),
+    (
+        "0002_alert_rules_suppression_state",
+        "Cooldown bookkeeping on alert rules",
+        _execute(
+            "ALTER TABLE alert_rules ADD COLUMN IF NOT EXISTS suppression_state "
+            "JSONB DEFAULT '{}'::jsonb"
+        ),
+    ),
+    ("0003_backfill_event_rollups", "Backfill event_rollups", _backfill_rollups),
+    ("0004_backfill_sketch_buckets", "Backfill sketch_buckets", _backfill_sketches),
+    # Hot-path indexes, checked by --check-indexes
+    (
+        "0005_ix_events_recent",
+        "Recent security events (event list, rule windows, source details)",
+        _create_index_concurrently(
+            "ix_events_recent",
+            "ON events (timestamp) WHERE event_type <> 'keepalive'",
+        ),
+    ),
+    (
+        "0006_ix_events_site_timestamp",
+        "Events of one site by time",
+        _create_index_concurrently(
+            "ix_events_site_timestamp", "ON events (site_id, timestamp)"
+        ),
+    ),
+    (
+        "0007_ix_events_open_status_severity",
+        "Open events by status and severity",
+        _create_index_concurrently(
+            "ix_events_open_status_severity",
+            "ON events (status, severity) WHERE status IN ('NEW', 'INVESTIGATING')",
+        ),
+    ),
+    (
+        "0008_ix_events_source_timestamp",
+        "Events of one source by time",
+        _create_index_concurrently(
+            "ix_events_source_timestamp", "ON events (source, timestamp)"
+        ),
+    ),
+    (
+        "0009_ix_events_source_ip",
+        "Events by metadata source IP",
+        _create_index_concurrently(
+            "ix_events_source_ip", "ON events ((metadata->>'source_ip'))"
+        ),
+    ),
+    # Time-ordered layout: events are appended in time order, so block ranges
+    # map to time ranges and BRIN indexes replace B-trees for range scans
+    (
+        "0010_brin_events_timestamp",
+        "BRIN index for event time-range scans",
+        _create_index_concurrently(
+            "brin_events_timestamp",
+            "ON events USING brin (timestamp) "
+            "WITH (pages_per_range = 32, autosummarize = on)",
+        ),
+    ),
+    (
+        "0011_brin_events_created_at",
+        "BRIN index on insertion time",
+        _create_index_concurrently(
+            "brin_events_created_at",
+            "ON events USING brin (created_at) "
+            "WITH (pages_per_range = 32, autosummarize = on)",
+        ),
+    ),
+    (
+        "0012_events_fillfactor",
+        "Leave room for in-place (HOT) status updates",
+        # Status/assignment updates then stay on the row's page instead of
+        # moving it to the end of the table and out of its time range
+        _set_events_fillfactor,
+    ),
+    (
+        "0013_partition_events",
+        "Range-partition events by day (locks events while rows are copied)",
+        _partition_events,
+    ),
+    (
+        "0014_ix_events_recent_keyset",
+        "Cursor pagination of the event list",
+        _create_index_concurrently(
+            "ix_events_recent_keyset",
+            "ON events (timestamp, id) WHERE event_type <> 'keepalive'",
+        ),
+    ),
+    (
+        "0015_events_search_vector",
+        "Full-text search column (rewrites events while it is computed)",
+        _add_events_search_vector,
+    ),
+    (
+        "0016_ix_events_search",
+        "Full-text search of events",
+        _create_index_concurrently(
+            "ix_events_search", "ON events USING gin (search_vector)"
+        ),
+    ),
+    (
+        "0017_pg_trgm",
+        "Trigram extension for substring search",
+        _execute("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    ),
+    (
+        "0018_ix_events_raw_log_trgm",
+        "Substring search of raw logs",
+        _create_index_concurrently(
+            "ix_events_raw_log_trgm", "ON events USING gin (raw_log gin_trgm_ops)"
+        ),
+    ),
+    (
+        "0019_ix_events_description_trgm",
+        "Substring search of descriptions",
+        _create_index_concurrently(
+            "ix_events_description_trgm", "ON events USING gin (description gin_trgm_ops)"
+        ),
+    ),
+]
+
 
 def apply_migrations():
     """
-    Manually create new tables and run ALTER TABLE statements.
-    This avoids needing Alembic for the prototype phase.
+    Create new tables, then apply every migration not yet recorded in
+    schema_migrations. This avoids needing Alembic for the prototype phase.
     """
     app = create_app()
     with app.app_context():
@@ -15,35 +279,166 @@ def apply_migrations():
         print("Creating any missing database tables...")
         db.create_all()
 
-        # 2. Safely add incident_id to the events table
-        from sqlalchemy import text
-        from sqlalchemy.exc import ProgrammingError
+        # 2. Versioned migrations
+        with db.engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                    "version VARCHAR(100) PRIMARY KEY, "
+                    "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+                )
+            )
+            applied = set(
+                conn.execute(text("SELECT version FROM schema_migrations")).scalars()
+            )
 
-        print("Checking if 'events' table needs 'incident_id' column...")
-        with db.engine.connect() as conn:
-            try:
-                # Add the column and the foreign key relationship
+        pending = [m for m in MIGRATIONS if m[0] not in applied]
+        for version, description, step in pending:
+            print(f"Applying {version}: {description}...")
+            step()
+            with db.engine.begin() as conn:
                 conn.execute(
-                    text(
-                        "ALTER TABLE events ADD COLUMN incident_id UUID REFERENCES incidents(id) ON DELETE SET NULL;"
-                    )
+                    text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+                    {"version": version},
                 )
-                # Add an index on the new column
-                conn.execute(
-                    text("CREATE INDEX ix_events_incident_id ON events (incident_id);")
+        print(f"Applied {len(pending)} migration(s); schema is up to date.")
+
+        # 3. Upcoming event partitions (also maintained by a periodic task)
+        from app.services.partitions import ensure_partitions
+
+        created = ensure_partitions()
+        if created:
+            print(f"Created event partitions: {', '.join(created)}")
+
+
+def _index_checks():
+    """
+    (description, statement, expected indexes) for the hot event queries;
+    the check passes when the plan uses any of the expected indexes.
+    """
+    from app.models import Event, EventSeverity, EventSource, EventStatus
+
+    now = datetime.utcnow()
+    return [
+        (
+            "Event list, newest first",
+            select(Event)
+            .where(Event.event_type != "keepalive")
+            .order_by(Event.timestamp.desc())
+            .limit(50),
+            ("ix_events_recent", "ix_events_recent_keyset"),
+        ),
+        (
+            "Event list page after a cursor",
+            select(Event)
+            .where(
+                Event.event_type != "keepalive",
+                tuple_(Event.timestamp, Event.id)
+                < tuple_(now - timedelta(days=3), uuid.UUID(int=0)),
+            )
+            .order_by(Event.timestamp.desc(), Event.id.desc())
+            .limit(51),
+            ("ix_events_recent_keyset",),
+        ),
+        (
+            "Full-text event search",
+            select(Event.id).where(
+                literal_column("events.search_vector").op("@@")(
+                    func.plainto_tsquery(literal_column("'simple'::regconfig"), "admin")
+                )
+            ),
+            ("ix_events_search",),
+        ),
+        (
+            "Substring event search",
+            select(Event.id).where(
+                or_(
+                    Event.description.icontains("SRC=10.0.", autoescape=True),
+                    Event.raw_log.icontains("SRC=10.0.", autoescape=True),
                 )
-                conn.commit()
-                print("Successfully added 'incident_id' column to 'events' table.")
-            except ProgrammingError as e:
-                # If column already exists, this throws an error.
-                if "already exists" in str(e) or "DuplicateColumn" in str(e):
-                    print(
-                        "'incident_id' column already exists on 'events' table. Skipping."
-                    )
-                else:
-                    print(f"Error checking/adding column: {e}")
-                conn.rollback()
+            ),
+            ("ix_events_raw_log_trgm", "ix_events_description_trgm"),
+        ),
+        (
+            "Source details 24h window",
+            select(Event.source, Event.event_type, func.count(Event.id))
+            .where(
+                Event.timestamp >= now - timedelta(hours=24),
+                Event.event_type != "keepalive",
+            )
+            .group_by(Event.source, Event.event_type),
+            ("ix_events_recent", "brin_events_timestamp"),
+        ),
+        (
+            "Events of one site (event filter, site-scoped rules)",
+            select(Event).where(
+                Event.site_id == "site_001", Event.timestamp >= now - timedelta(hours=1)
+            ),
+            ("ix_events_site_timestamp",),
+        ),
+        (
+            "Open critical events",
+            select(func.count(Event.id)).where(
+                Event.status.in_([EventStatus.NEW, EventStatus.INVESTIGATING]),
+                Event.severity == EventSeverity.CRITICAL,
+            ),
+            ("ix_events_open_status_severity",),
+        ),
+        (
+            "Last event of a source (source details)",
+            select(func.max(Event.timestamp)).where(Event.source == EventSource.FIREWALL),
+            ("ix_events_source_timestamp",),
+        ),
+        (
+            "Events by source IP",
+            select(Event).where(Event.event_metadata["source_ip"].astext == "203.0.113.7"),
+            ("ix_events_source_ip",),
+        ),
+        (
+            "Rule evaluation window",
+            select(Event.id).where(
+                Event.incident_id.is_(None),
+                Event.timestamp >= now - timedelta(hours=1),
+            ),
+            ("brin_events_timestamp",),
+        ),
+        (
+            "Recently inserted events",
+            select(func.count(Event.id)).where(
+                Event.created_at >= now - timedelta(minutes=5)
+            ),
+            ("brin_events_created_at",),
+        ),
+    ]
+
+
+def check_indexes() -> bool:
+    """EXPLAIN each hot query and report whether it uses its intended index."""
+    from app.services.rule_cost import plan_index_names
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            print("Index checks require PostgreSQL.")
+            return False
+
+        # Small tables are cheapest to scan sequentially whatever the indexes:
+        # disable seq scans so the plan shows which index each query can use.
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        ok = True
+        for description, statement, expected in _index_checks():
+            used = plan_index_names(statement)
+            found = bool(used.intersection(expected))
+            ok = ok and found
+            print(
+                f"[{'ok' if found else 'MISSING'}] {description}: expects {' or '.join(expected)}, "
+                f"plan uses {', '.join(sorted(used)) or 'no index'}"
+            )
+        db.session.rollback()
+        return ok
 
 
 if __name__ == "__main__":
+    if "--check-indexes" in sys.argv[1:]:
+        sys.exit(0 if check_indexes() else 1)
     apply_migrations()
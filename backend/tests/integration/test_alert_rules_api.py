@@ -0,0 +1,108 @@
+import pytest
+
+
+def test_create_rule_within_budget(client, init_database):
+    """A narrow rule is saved and returns its cost report."""
+    response = client.post(
+        "/api/alerts/rules",
+        json={
+            "name": "Multiple Failed Logins",
+            "condition": {"event_type": "auth_failure", "count": 5, "timeframe": "10m"},
+        },
+    )
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["cost"]["over_budget"] is False
+
+
+def test_create_rule_over_budget_is_rejected(client, init_database):
+    """A rule scanning every event over 30 days is rejected with suggestions."""
+    response = client.post(
+        "/api/alerts/rules",
+        json={
+            "name": "Everything",
+            "condition": {"event_type": "any", "count": 1, "timeframe": "30d"},
+        },
+    )
+
+    assert response.status_code == 400
+    cost = response.get_json()["cost"]
+    assert cost["over_budget"] is True
+    assert cost["suggestions"]
+
+
+def test_update_rule_over_budget_is_flagged(app, client, init_database):
+    """In "flag" mode an expensive rule is saved but reported as over budget."""
+    app.config["RULE_COST_ENFORCEMENT"] = "flag"
+    created = client.post(
+        "/api/alerts/rules",
+        json={"name": "Port scans", "condition": {"event_type": "port_scan"}},
+    ).get_json()
+
+    response = client.patch(
+        f"/api/alerts/rules/{created['id']}",
+        json={"condition": {"event_type": "any", "timeframe": "30d"}},
+    )
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["condition"]["timeframe"] == "30d"
+    assert body["cost"]["over_budget"] is True
+
+
+def test_create_rule_with_invalid_match_expression(client, init_database):
+    response = client.post(
+        "/api/alerts/rules",
+        json={
+            "name": "Broken",
+            "condition": {"event_type": "auth_failure", "match": 'severity = "urgent"'},
+        },
+    )
+
+    assert response.status_code == 400
+    assert "Invalid match expression" in response.get_json()["error"]
+
+
+def test_create_rule_with_non_string_match_expression(client, init_database):
+    response = client.post(
+        "/api/alerts/rules",
+        json={"name": "Broken", "condition": {"event_type": "auth_failure", "match": ["severity"]}},
+    )
+
+    assert response.status_code == 400
+    assert "Invalid match expression" in response.get_json()["error"]
+
+
+def test_create_rule_with_non_string_timeframe(client, init_database):
+    response = client.post(
+        "/api/alerts/rules",
+        json={"name": "Broken", "condition": {"event_type": "auth_failure", "timeframe": 10}},
+    )
+
+    assert response.status_code == 400
+    assert "timeframe must be a string" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("key, value", [("sigma", "abc"), ("min_count", 0), ("count", True)])
+def test_create_rule_with_invalid_numeric_setting(client, init_database, key, value):
+    response = client.post(
+        "/api/alerts/rules",
+        json={"name": "Broken", "condition": {"event_type": "auth_failure", key: value}},
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == f"{key} must be a positive number"
+
+
+def test_match_expression_counts_as_a_filter(client, init_database):
+    response = client.post(
+        "/api/alerts/rules",
+        json={
+            "name": "Root logins",
+            "condition": {"match": 'metadata.username = "root"', "timeframe": "24h"},
+        },
+    )
+
+    assert response.status_code == 201
+    assert response.get_json()["cost"]["reasons"] == []
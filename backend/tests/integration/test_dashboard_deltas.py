@@ -0,0 +1,81 @@
+from app import socketio
+from app.services.dashboard_deltas import dashboard_deltas
+
+
+def deltas(socket_client):
+    return [m["args"][0] for m in socket_client.get_received() if m["name"] == "dashboard_delta"]
+
+
+def test_ingest_pushes_kpi_deltas_to_subscribers(app, client, init_database):
+    dashboard_deltas.take()
+    viewer = socketio.test_client(app)
+    bystander = socketio.test_client(app)
+    viewer.emit("subscribe_dashboard")
+    viewer.get_received()
+    bystander.get_received()
+
+    response = client.post(
+        "/api/ingest",
+        json={
+            "source": "firewall",
+            "event_type": "auth_failure",
+            "severity": "critical",
+            "description": "Failed login",
+            "site_id": "site_001",
+        },
+    )
+    event_id = response.get_json()["id"]
+
+    [delta] = deltas(viewer)
+    assert delta["events"] == 1
+    assert delta["by_severity"] == {"critical": 1}
+    assert delta["by_source"] == {"firewall": 1}
+    assert delta["by_site"] == {"site_001": 1}
+    assert delta["by_status"] == {"new": 1}
+    assert delta["critical_open"] == 1 and delta["active_alerts"] == 1
+    assert deltas(bystander) == []
+
+    client.patch(f"/api/events/{event_id}/status", json={"status": "resolved"})
+    [delta] = deltas(viewer)
+    assert delta["events"] == 0
+    assert delta["by_status"] == {"new": -1, "resolved": 1}
+    assert delta["critical_open"] == -1
+
+    # Keepalives change nothing; one empty delta reports the rate dropping to zero
+    client.post(
+        "/api/ingest",
+        json={"source": "firewall", "event_type": "keepalive", "severity": "low", "description": "ping"},
+    )
+    [delta] = deltas(viewer)
+    assert delta["events"] == 0 and delta["eps"] == 0 and delta["by_status"] == {}
+    dashboard_deltas.publish()
+    assert deltas(viewer) == []
+
+
+def test_delete_uncounts_the_event(app, client, init_database):
+    dashboard_deltas.take()
+    viewer = socketio.test_client(app)
+    viewer.emit("subscribe_dashboard")
+    event_id = client.post(
+        "/api/ingest",
+        json={
+            "source": "ids",
+            "event_type": "port_scan",
+            "severity": "high",
+            "description": "Scan",
+            "site_id": "site_002",
+        },
+    ).get_json()["id"]
+    assert client.get("/api/dashboard/stats").get_json()["total_events"] == 1
+    viewer.get_received()
+
+    assert client.delete(f"/api/events/{event_id}").status_code == 204
+
+    [delta] = deltas(viewer)
+    assert delta["events"] == -1 and delta["eps"] == 0
+    assert delta["by_severity"] == {"high": -1}
+    assert delta["by_site"] == {"site_002": -1}
+    assert delta["by_status"] == {"new": -1}
+    assert delta["active_alerts"] == -1
+    stats = client.get("/api/dashboard/stats").get_json()
+    assert stats["total_events"] == 0 and stats["by_severity"] == {}
@@ -0,0 +1,157 @@
+import time
+from datetime import datetime
+import pytest
+from app import db
+from app.models import EventRollup
+from app.services.rollups import add_counts, compact_rollups
+
+
+def ingest(client, **fields):
+    payload = {
+        "source": "firewall",
+        "event_type": "auth_failure",
+        "severity": "critical",
+        "description": "Failed login",
+        "site_id": "site_001",
+    }
+    payload.update(fields)
+    response = client.post("/api/ingest", json=payload)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_ingest_maintains_rollups(client, init_database):
+    ingest(client)
+    ingest(client)
+    ingest(client, severity="low", site_id="site_002")
+    ingest(client, event_type="keepalive", severity="low")
+
+    rows = EventRollup.query.all()
+    assert sum(r.count for r in rows) == 3
+    assert {r.site_id for r in rows} == {"site_001", "site_002"}
+
+
+def test_stats_and_sites_read_from_rollups(client, init_database):
+    first = ingest(client)
+    ingest(client)
+    ingest(client, severity="low", source="endpoint", site_id="site_002")
+
+    # Resolving an event moves its count out of the open statuses
+    client.patch(f"/api/events/{first['id']}/status", json={"status": "resolved"})
+
+    stats = client.get("/api/dashboard/stats").get_json()
+    assert stats["total_events"] == 3
+    assert stats["events_last_24h"] == 3
+    assert stats["critical_open"] == 1
+    assert stats["active_alerts"] == 2
+    assert stats["total_sites"] == 2
+    assert stats["by_status"] == {"new": 2, "resolved": 1}
+    assert stats["by_source"] == {"firewall": 2, "endpoint": 1}
+
+    sites = client.get("/api/dashboard/sites").get_json()["sites"]
+    assert sites[0]["site_id"] in ("site_001", "site_002")
+    assert {s["site_id"]: s["total"] for s in sites} == {"site_001": 1, "site_002": 1}
+
+
+def test_top_ips_and_users_from_sketches(client, init_database):
+    for _ in range(3):
+        ingest(client, metadata={"source_ip": "203.0.113.7", "username": "root"})
+    ingest(client, severity="high", metadata={"src_ip": "198.51.100.2", "username": "admin"})
+    ingest(client, metadata={"hostname": "web-01"})
+
+    body = client.get("/api/dashboard/top-ips").get_json()
+    assert body["max_error"] == 0
+    assert body["top_ips"] == [
+        {"ip": "203.0.113.7", "count": 3, "error": 0, "critical": 3, "high": 0},
+        {"ip": "198.51.100.2", "count": 1, "error": 0, "critical": 0, "high": 1},
+    ]
+
+    users = client.get("/api/dashboard/top/user?limit=1").get_json()
+    assert [(i["value"], i["count"]) for i in users["items"]] == [("root", 3)]
+    hosts = client.get("/api/dashboard/top/host").get_json()
+    assert [i["value"] for i in hosts["items"]] == ["web-01"]
+
+    assert client.get("/api/dashboard/top/country").status_code == 400
+
+
+def test_distinct_counts_from_sketches(client, init_database):
+    for i in range(5):
+        ingest(client, site_id=f"site_{i % 2:03d}", metadata={"source_ip": f"203.0.113.{i}"})
+    ingest(client, event_type="keepalive", site_id="site_009")
+
+    body = client.get("/api/dashboard/distinct?days=3").get_json()
+    assert body["days"] == 3
+    assert body["distinct"]["site"]["total"] == 2
+    assert body["distinct"]["ip"]["total"] == 5
+    assert [d["count"] for d in body["distinct"]["ip"]["daily"]] == [0, 0, 5]
+    assert body["distinct"]["user"]["total"] == 0
+
+    only_ips = client.get("/api/dashboard/distinct?dimension=ip").get_json()
+    assert list(only_ips["distinct"]) == ["ip"]
+    assert client.get("/api/dashboard/distinct?dimension=country").status_code == 400
+
+
+def test_overview_returns_every_section(client, init_database, monkeypatch):
+    monkeypatch.setattr("app.routes.dashboard._glpi_alive", lambda: True)
+    ingest(client, metadata={"source_ip": "203.0.113.7"})
+    ingest(client, severity="low", site_id="site_002")
+
+    overview = client.get("/api/dashboard/overview").get_json()
+    assert overview["stats"] == client.get("/api/dashboard/stats").get_json()
+    assert overview["sites"] == client.get("/api/dashboard/sites").get_json()
+    assert overview["top_ips"]["top_ips"][0]["ip"] == "203.0.113.7"
+    assert overview["source_details"]["sources"]["firewall"]["events_24h"] == 2
+
+
+def test_overview_returns_partial_results(app, client, init_database, monkeypatch):
+    def slow():
+        time.sleep(1)
+        return {"sources": []}
+
+    def broken(days=30):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("app.routes.dashboard.compute_source_details", slow)
+    monkeypatch.setattr("app.routes.dashboard.compute_heatmap", broken)
+    monkeypatch.setitem(app.config, "DASHBOARD_OVERVIEW_TIMEOUT", 0.3)
+    ingest(client)
+
+    overview = client.get("/api/dashboard/overview").get_json()
+    assert overview["source_details"] is None
+    assert overview["heatmap"] is None
+    assert overview["errors"]["source_details"] == "timeout"
+    assert overview["errors"]["heatmap"] == "error"
+    assert overview["stats"]["total_events"] == 1
+
+
+def test_compaction_folds_old_rollups_into_coarser_buckets(app, init_database):
+    now = datetime(2024, 6, 1, 12, 30)
+    key = {"source": "firewall", "severity": "high", "event_type": "port_scan", "site_id": ""}
+    add_counts(
+        [
+            # Recent minutes are kept
+            {**key, "bucket": datetime(2024, 5, 30, 9, 15), "status": "new", "count": 2},
+            # Older than 7 days: folded into their hour
+            {**key, "bucket": datetime(2024, 5, 20, 9, 15), "status": "new", "count": 2},
+            {**key, "bucket": datetime(2024, 5, 20, 9, 47), "status": "new", "count": 3},
+            {**key, "bucket": datetime(2024, 5, 20, 9, 50), "status": "resolved", "count": 1},
+            # A status move that cancels out leaves no row behind
+            {**key, "bucket": datetime(2024, 5, 20, 10, 5), "status": "new", "count": -1},
+            {**key, "bucket": datetime(2024, 5, 20, 10, 6), "status": "new", "count": 1},
+            # Older than 90 days: folded into their day
+            {**key, "bucket": datetime(2024, 1, 10, 3, 0), "status": "new", "count": 4},
+            {**key, "bucket": datetime(2024, 1, 10, 22, 41), "status": "new", "count": 1},
+        ]
+    )
+    db.session.commit()
+
+    assert compact_rollups(now) == {"minute": 6, "hour": 2}
+    rows = {(r.bucket, r.status): r.count for r in EventRollup.query.all()}
+    assert rows == {
+        (datetime(2024, 5, 30, 9, 15), "new"): 2,
+        (datetime(2024, 5, 20, 9, 0), "new"): 5,
+        (datetime(2024, 5, 20, 9, 0), "resolved"): 1,
+        (datetime(2024, 1, 10), "new"): 5,
+    }
+    # Idempotent
+    assert compact_rollups(now) == {"minute": 0, "hour": 0}
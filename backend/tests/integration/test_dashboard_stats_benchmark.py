@@ -0,0 +1,114 @@
+"""Regression benchmark: /dashboard/stats query count and latency."""
+import time
+import pytest
+from sqlalchemy import event
+from app import db
+
+REQUESTS = 20
+
+
+@pytest.fixture
+def statement_counter(app):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", count)
+
+
+def test_stats_is_a_single_statement(client, init_database, statement_counter, record_property):
+    events = [
+        {
+            "source": source,
+            "event_type": "auth_failure",
+            "severity": severity,
+            "description": "Failed login",
+            "site_id": f"site_{i % 5:03d}",
+        }
+        for i, (source, severity) in enumerate(
+            [("firewall", "critical"), ("endpoint", "high"), ("application", "low")] * 100
+        )
+    ]
+    assert client.post("/api/ingest/batch", json={"events": events}).status_code == 201
+
+    statement_counter.clear()
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = client.get("/api/dashboard/stats")
+    elapsed_ms = (time.perf_counter() - started) * 1000 / REQUESTS
+
+    assert response.status_code == 200
+    stats = response.get_json()
+    assert stats["total_events"] == 300
+    assert stats["by_severity"] == {"critical": 100, "high": 100, "low": 100}
+    assert stats["total_sites"] == 5
+
+    queries_per_request = len(statement_counter) / REQUESTS
+    record_property("statements_per_request", queries_per_request)
+    record_property("ms_per_request", round(elapsed_ms, 2))
+    assert queries_per_request == 1
+
+
+def test_source_details_is_a_single_statement(client, init_database, statement_counter, monkeypatch):
+    monkeypatch.setattr("app.routes.dashboard._glpi_alive", lambda: True)
+    events = [
+        {
+            "source": "firewall",
+            "event_type": event_type,
+            "severity": "medium",
+            "description": "Firewall event",
+            "site_id": f"site_{i % 3:03d}",
+        }
+        for i, event_type in enumerate(["port_scan"] * 6 + ["blocked_connection"] * 4)
+    ]
+    events.append({"source": "ids", "event_type": "keepalive", "severity": "low", "description": "Heartbeat"})
+    assert client.post("/api/ingest/batch", json={"events": events}).status_code == 201
+
+    statement_counter.clear()
+    response = client.get("/api/dashboard/source-details")
+
+    assert response.status_code == 200
+    assert len(statement_counter) == 1
+    sources = response.get_json()["sources"]
+    assert set(sources) == {"firewall", "ids", "endpoint", "application"}
+    firewall = sources["firewall"]
+    assert firewall["events_24h"] == 10
+    assert firewall["events_last_60s"] == 10
+    assert firewall["top_event_type"] == "port_scan"
+    assert firewall["active_sites"] == 3
+    assert firewall["last_event_at"].endswith("Z")
+    assert sources["ids"]["events_24h"] == 0
+    assert sources["ids"]["last_event_at"] is None
+    assert sources["ids"]["last_keepalive_at"] is not None
+    assert sources["application"]["last_keepalive_at"] is not None
+    assert sources["endpoint"] == {
+        "last_event_at": None,
+        "last_keepalive_at": None,
+        "events_last_60s": 0,
+        "events_24h": 0,
+        "top_event_type": None,
+        "active_sites": 0,
+    }
+
+
+def test_source_details_types_the_source_list_on_postgresql(client, init_database, monkeypatch):
+    from sqlalchemy.dialects import postgresql
+
+    monkeypatch.setattr("app.routes.dashboard._glpi_alive", lambda: True)
+    statements = []
+
+    def capture(conn, clauseelement, multiparams, params, execution_options):
+        statements.append(clauseelement)
+
+    event.listen(db.engine, "before_execute", capture)
+    try:
+        assert client.get("/api/dashboard/source-details").status_code == 200
+    finally:
+        event.remove(db.engine, "before_execute", capture)
+
+    # Untyped literals would make the union text, and "eventsource = text" fails
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.count("AS eventsource) AS source") == 4
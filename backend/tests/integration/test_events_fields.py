@@ -0,0 +1,66 @@
+from datetime import datetime
+from sqlalchemy import event as sa_event
+from app import db
+from app.models import Event, EventSeverity, EventSource
+
+
+def add_event():
+    db.session.add(
+        Event(
+            timestamp=datetime(2024, 5, 1, 12, 0),
+            source=EventSource.FIREWALL,
+            event_type="auth_failure",
+            severity=EventSeverity.LOW,
+            description="Blocked connection",
+            raw_log="x" * 5000,
+            event_metadata={"source_ip": "10.0.0.5"},
+        )
+    )
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def list_events(client, **params):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa_event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        resp = client.get("/api/events", query_string=params)
+    finally:
+        sa_event.remove(db.engine, "before_cursor_execute", record)
+    return resp, " ".join(statements)
+
+
+def test_list_is_slim_by_default_and_never_reads_heavy_columns(client, init_database):
+    add_event()
+
+    resp, sql = list_events(client)
+    event = resp.get_json()["events"][0]
+    assert "raw_log" not in event and "metadata" not in event
+    assert event["description"] == "Blocked connection"
+    assert "raw_log" not in sql and "metadata" not in sql
+
+
+def test_list_projects_requested_fields(client, init_database):
+    add_event()
+
+    resp, sql = list_events(client, fields="severity,metadata")
+    assert resp.get_json()["events"][0] == {
+        "id": resp.get_json()["events"][0]["id"],
+        "timestamp": "2024-05-01T12:00:00",
+        "severity": "low",
+        "metadata": {"source_ip": "10.0.0.5"},
+    }
+    assert "description" not in sql
+
+    resp, _ = list_events(client, fields="all")
+    assert resp.get_json()["events"][0]["raw_log"] == "x" * 5000
+
+
+def test_list_rejects_unknown_fields(client, init_database):
+    resp, _ = list_events(client, fields="severity,password")
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "Unknown fields: password"
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import Event, EventSeverity, EventSource
+
+
+def add_events(n, start=datetime(2024, 5, 1, 12, 0)):
+    events = [
+        Event(
+            timestamp=start + timedelta(seconds=i // 2),  # pairs share a timestamp
+            source=EventSource.FIREWALL,
+            event_type="auth_failure",
+            severity=EventSeverity.LOW,
+            description=f"Event {i}",
+        )
+        for i in range(n)
+    ]
+    db.session.add_all(events)
+    db.session.commit()
+    return events
+
+
+def test_cursor_pages_walk_every_event_once(client, init_database):
+    add_events(25)
+
+    seen, pages, params = [], [], {"per_page": 10, "paginate": "keyset"}
+    while True:
+        body = client.get("/api/events", query_string=params).get_json()
+        pages.append(body)
+        seen += [e["description"] for e in body["events"]]
+        if body["next_cursor"] is None:
+            break
+        params["cursor"] = body["next_cursor"]
+
+    assert [len(p["events"]) for p in pages] == [10, 10, 5]
+    assert seen == [f"Event {i}" for i in range(24, -1, -1)]  # newest first, id breaks ties
+    assert pages[0]["prev_cursor"] is None
+    assert "total" not in pages[0]
+
+    # Walking back from the last page returns the middle page
+    params["cursor"] = pages[2]["prev_cursor"]
+    back = client.get("/api/events", query_string=params).get_json()
+    assert back["events"] == pages[1]["events"]
+    params["cursor"] = back["prev_cursor"]
+    first = client.get("/api/events", query_string=params).get_json()
+    assert first["events"] == pages[0]["events"]
+    assert first["prev_cursor"] is None
+
+
+def test_cursor_pagination_counts_on_request(client, init_database):
+    add_events(3)
+    body = client.get("/api/events?paginate=keyset&count=exact").get_json()
+    assert body["total"] == 3 and body["total_is_estimate"] is False
+    # No planner estimate outside PostgreSQL: falls back to the exact count
+    assert client.get("/api/events?paginate=keyset&count=estimate").get_json()["total"] == 3
+
+    assert client.get("/api/events?cursor=garbage").status_code == 400
+
+
+def test_offset_pagination_is_the_default(client, init_database):
+    add_events(3)
+    body = client.get("/api/events?per_page=2").get_json()
+    assert body["total"] == 3 and body["pages"] == 2 and body["page"] == 1
+    assert "next_cursor" not in body
+
+
+def test_page_parameter_keeps_offset_pagination(client, init_database):
+    add_events(5)
+    body = client.get("/api/events?page=2&per_page=2").get_json()
+    assert body["total"] == 5 and body["pages"] == 3
+    assert len(body["events"]) == 2
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import Event, EventSeverity, EventSource
+
+
+def add_event(description, raw_log=None, minutes=0):
+    db.session.add(
+        Event(
+            timestamp=datetime(2024, 5, 1, 12, 0) + timedelta(minutes=minutes),
+            source=EventSource.FIREWALL,
+            event_type="auth_failure",
+            severity=EventSeverity.MEDIUM,
+            description=description,
+            raw_log=raw_log,
+        )
+    )
+    db.session.commit()
+
+
+def search(client, query, **params):
+    body = client.get("/api/events", query_string={"search": query, **params}).get_json()
+    return [e["description"] for e in body["events"]]
+
+
+def test_search_matches_description_and_raw_log(client, init_database):
+    add_event("SSH login failed", "sshd: Failed password for root from 10.0.0.5", 0)
+    add_event("Port scan detected", "nmap probe from 10.0.0.9", 1)
+    add_event("SSH login succeeded", "sshd: Accepted password for admin", 2)
+
+    assert search(client, "ssh") == ["SSH login succeeded", "SSH login failed"]
+    assert search(client, '"failed password"') == ["SSH login failed"]
+    assert search(client, "ssh -root") == ["SSH login succeeded"]
+    assert search(client, "nmap OR accepted") == ["SSH login succeeded", "Port scan detected"]
+
+
+def test_search_without_full_text_ignores_highlight_and_relevance(client, init_database):
+    add_event("SSH login failed", minutes=0)
+    add_event("SSH login succeeded", minutes=1)
+
+    body = client.get(
+        "/api/events", query_string={"search": "ssh", "highlight": "true", "sort": "relevance"}
+    ).get_json()
+    assert [e["description"] for e in body["events"]] == ["SSH login succeeded", "SSH login failed"]
+    assert "snippet" not in body["events"][0]
+    assert "rows" not in body
+
+
+def test_contains_search_matches_fragments_literally(client, init_database):
+    add_event("Firewall drop", "kernel: DROP IN=eth0 SRC=10.0.3.7 DST=192.168.1.2", 0)
+    add_event("Firewall drop", "kernel: DROP IN=eth0 SRC=172.16.0.9 DST=10.0.3.1", 1)
+    add_event("Disk usage 100%", "/var/log_archive is full", 2)
+
+    assert len(search(client, "SRC=10.0.", mode="contains")) == 1
+    assert len(search(client, "src=10.0", mode="contains")) == 1  # case-insensitive
+    assert search(client, "100%", mode="contains") == ["Disk usage 100%"]
+    assert search(client, "log_a", mode="contains") == ["Disk usage 100%"]
+    assert search(client, "log%a", mode="contains") == []  # wildcards are literal
+
+
+def test_contains_search_needs_a_minimum_length(client, init_database):
+    resp = client.get("/api/events", query_string={"search": "10", "mode": "contains"})
+    assert resp.status_code == 400
+    assert "3 characters" in resp.get_json()["error"]
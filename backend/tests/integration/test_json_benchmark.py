@@ -0,0 +1,123 @@
+"""Benchmark: JSON encoding of a 500-event page and decoding of a 500-event ingest batch."""
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from app import create_app, socketio
+from app.json_provider import OrjsonProvider, SocketIOJSON
+from config import config
+from app.models import Event, EventSeverity, EventSource, EventStatus
+
+pytest.importorskip("orjson")
+
+EVENTS = 500
+ROUNDS = 20
+
+
+def best_ms(fn) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def event_page() -> dict:
+    start = datetime(2024, 5, 1, 12, 0)
+    events = [
+        Event(
+            id=uuid.UUID(int=i),
+            timestamp=start + timedelta(seconds=i, microseconds=i),
+            source=EventSource.FIREWALL,
+            event_type="connection_blocked",
+            severity=EventSeverity.MEDIUM,
+            status=EventStatus.NEW,
+            description=f"Blocked inbound connection #{i}",
+            raw_log=f"kernel: DROP IN=eth0 SRC=10.0.{i % 256}.7 DST=192.168.1.2 " * 20,
+            event_metadata={"source_ip": f"10.0.{i % 256}.7", "port": 22, "tags": ["ssh"]},
+            site_id=f"site_{i % 5:03d}",
+            created_at=start,
+        )
+        for i in range(EVENTS)
+    ]
+    return {"events": [e.to_dict() for e in events], "per_page": EVENTS, "next_cursor": None}
+
+
+def ingest_batch() -> bytes:
+    return json.dumps(
+        {
+            "events": [
+                {
+                    "source": "firewall",
+                    "event_type": "connection_blocked",
+                    "severity": "medium",
+                    "description": f"Blocked inbound connection #{i}",
+                    "raw_log": f"kernel: DROP IN=eth0 SRC=10.0.{i % 256}.7 DST=192.168.1.2",
+                    "metadata": {"source_ip": f"10.0.{i % 256}.7", "port": 22},
+                    "site_id": f"site_{i % 5:03d}",
+                }
+                for i in range(EVENTS)
+            ]
+        }
+    ).encode()
+
+
+def test_event_page_encoding(app, record_property):
+    page = event_page()
+    stdlib, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+
+    with app.test_request_context():
+        assert json.loads(fast.response(page).get_data()) == json.loads(
+            stdlib.response(page).get_data()
+        )
+        stdlib_ms = best_ms(lambda: stdlib.response(page))
+        fast_ms = best_ms(lambda: fast.response(page))
+
+    record_property("page_kb", round(len(fast.dumps_bytes(page)) / 1024))
+    record_property("stdlib_ms", round(stdlib_ms, 2))
+    record_property("orjson_ms", round(fast_ms, 2))
+
+
+def test_ingest_batch_decoding(app, record_property):
+    body = ingest_batch()
+    stdlib, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+
+    assert fast.loads(body) == stdlib.loads(body)
+    stdlib_ms = best_ms(lambda: stdlib.loads(body))
+    fast_ms = best_ms(lambda: fast.loads(body))
+    record_property("batch_kb", round(len(body) / 1024))
+    record_property("stdlib_ms", round(stdlib_ms, 2))
+    record_property("orjson_ms", round(fast_ms, 2))
+
+
+def test_app_round_trips_through_orjson(app, client, init_database):
+    assert isinstance(app.json, OrjsonProvider)
+
+    resp = client.post(
+        "/api/ingest/batch", data=ingest_batch(), content_type="application/json"
+    )
+    assert resp.status_code == 201
+
+    page = client.get("/api/events", query_string={"per_page": EVENTS, "fields": "all"})
+    events = page.get_json()["events"]
+    assert len(events) == EVENTS
+    assert events[0]["metadata"]["port"] == 22
+    datetime.fromisoformat(events[0]["timestamp"])
+
+
+def test_stdlib_provider_resets_socketio(app, monkeypatch):
+    """Switching JSON_PROVIDER back also switches the Socket.IO singleton."""
+    assert socketio.server.packet_class.json is SocketIOJSON
+
+    monkeypatch.setattr(config["testing"], "JSON_PROVIDER", "default")
+    stdlib_app = create_app("testing")
+    assert isinstance(stdlib_app.json, DefaultJSONProvider)
+    assert socketio.server_options["json"] is json
+    assert socketio.server.packet_class.json is json
+
+    monkeypatch.undo()
+    create_app("testing")
+    assert socketio.server.packet_class.json is SocketIOJSON
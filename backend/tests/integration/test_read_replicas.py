@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from app import db
+from app.db_routing import ReplicaRouter, _probe_engine, replica_router
+
+
+@pytest.fixture
+def replica(app, monkeypatch):
+    """An empty database registered as a replica bind, reported fresh."""
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    db.metadata.create_all(engine)
+    monkeypatch.setitem(db.engines, "replica_0", engine)
+    monkeypatch.setitem(app.config, "REPLICA_LAG_CHECK_INTERVAL", 0)
+    lag = {"seconds": 0.0}
+    monkeypatch.setattr(replica_router, "measure_lag", lambda e: lag["seconds"])
+    yield lag
+    engine.dispose()
+
+
+def ingest(client):
+    response = client.post(
+        "/api/ingest",
+        json={
+            "source": "firewall",
+            "event_type": "auth_failure",
+            "severity": "critical",
+            "description": "Failed login",
+        },
+    )
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+
+def test_reads_go_to_a_fresh_replica(client, init_database, replica):
+    event_id = ingest(client)
+
+    # The replica has not received the event: list and dashboard read from it
+    assert client.get("/api/events?count=exact").get_json()["total"] == 0
+    assert client.get("/api/dashboard/stats").get_json()["total_events"] == 0
+
+    # Read-your-writes paths and writes stay on the primary
+    assert client.get(f"/api/events/{event_id}").status_code == 200
+    response = client.patch(f"/api/events/{event_id}/status", json={"status": "resolved"})
+    assert response.status_code == 200
+
+
+def test_lagging_replica_falls_back_to_primary(client, init_database, replica):
+    ingest(client)
+    replica["seconds"] = 60.0
+
+    assert client.get("/api/events?count=exact").get_json()["total"] == 1
+    assert client.get("/api/dashboard/stats").get_json()["total_events"] == 1
+
+
+def test_without_replicas_everything_uses_the_primary(client, init_database):
+    ingest(client)
+    assert client.get("/api/events?count=exact").get_json()["total"] == 1
+
+
+def test_lag_check_connects_with_short_timeouts(app, monkeypatch):
+    """An unreachable replica is reported unknown once the probe times out."""
+    monkeypatch.setitem(app.config, "REPLICA_LAG_CHECK_TIMEOUT", 1)
+    engine = create_engine("postgresql://soc_user@127.0.0.1:1/soc_dashboard")
+    attempts = []
+    event.listen(
+        _probe_engine(engine, 1),
+        "do_connect",
+        lambda dialect, record, cargs, cparams: attempts.append(cparams),
+    )
+
+    with app.app_context():
+        assert ReplicaRouter.measure_lag(engine) is None
+    assert attempts[0]["connect_timeout"] == 1
+    assert attempts[0]["options"] == "-c statement_timeout=1000"
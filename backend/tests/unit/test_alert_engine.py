@@ -98,3 +98,90 @@ def test_evaluate_rule_timeframe(app, init_database):
         init_database.session.commit()
 
         assert engine.evaluate_rule(rule) is True
+
+
+def test_cooldown_suppresses_repeat_triggers(app, init_database):
+    """A rule re-triggering inside its cooldown is correlated but not notified."""
+    with app.app_context():
+        engine = AlertEngine()
+
+        rule = AlertRule(
+            name="Port Scan",
+            condition={
+                "event_type": "port_scan",
+                "count": 1,
+                "timeframe": "10m",
+                "cooldown": "15m",
+                "group_by": "site_id",
+            },
+        )
+        init_database.session.add(rule)
+
+        def add_scan(site_id):
+            init_database.session.add(
+                Event(
+                    source=EventSource.FIREWALL,
+                    event_type="port_scan",
+                    severity=EventSeverity.MEDIUM,
+                    description="Port scan",
+                    site_id=site_id,
+                )
+            )
+            init_database.session.commit()
+
+        add_scan("site_001")
+        first = engine.evaluate_all_rules()
+        assert len(first) == 1
+        assert first[0]["group_keys"] == ["site_001"]
+
+        # Same site inside the cooldown: suppressed, counted per event
+        add_scan("site_001")
+        add_scan("site_001")
+        assert engine.evaluate_all_rules() == []
+        assert rule.suppression_state["site_001"]["suppressed"] == 2
+        assert rule.trigger_count == 1
+
+        # Another site has its own cooldown window
+        add_scan("site_002")
+        second = engine.evaluate_all_rules()
+        assert second[0]["group_keys"] == ["site_002"]
+
+        # Once the window has elapsed the next notification carries the backlog
+        rule.suppression_state = {
+            **rule.suppression_state,
+            "site_001": {
+                "last_notified": (datetime.utcnow() - timedelta(minutes=20)).isoformat(),
+                "suppressed": 1,
+            },
+        }
+        add_scan("site_001")
+        third = engine.evaluate_all_rules()
+        assert third[0]["group_keys"] == ["site_001"]
+        assert third[0]["suppressed_occurrences"] == 1
+
+
+def test_rules_without_cooldown_notify_every_trigger(app, init_database):
+    """Cooldowns are opt-in: by default every trigger notifies."""
+    with app.app_context():
+        engine = AlertEngine()
+
+        rule = AlertRule(
+            name="Port Scan",
+            condition={"event_type": "port_scan", "count": 1, "timeframe": "10m"},
+        )
+        init_database.session.add(rule)
+
+        for _ in range(2):
+            init_database.session.add(
+                Event(
+                    source=EventSource.FIREWALL,
+                    event_type="port_scan",
+                    severity=EventSeverity.MEDIUM,
+                    description="Port scan",
+                )
+            )
+            init_database.session.commit()
+            assert len(engine.evaluate_all_rules()) == 1
+
+        assert rule.trigger_count == 2
+        assert rule.to_dict()["suppressed_count"] == 0
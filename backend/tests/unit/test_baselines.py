@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models import Event, EventSeverity, EventSource, AlertRule
+from app.services.alert_engine import AlertEngine
+from app.models.baseline import EventBaseline
+from app.services.baselines import BaselineStore, hour_of_week
+
+
+def test_hour_of_week():
+    # 2025-01-13 was a Monday
+    assert hour_of_week(datetime(2025, 1, 13, 0, 30)) == 0
+    assert hour_of_week(datetime(2025, 1, 14, 3, 0)) == 27
+    assert hour_of_week(datetime(2025, 1, 19, 23, 59)) == 167
+
+
+def test_baseline_folds_closed_hours():
+    store = BaselineStore(alpha=0.5)
+    monday = datetime(2025, 1, 13, 10, 0)
+
+    # Two weeks: 4 then 8 events in the Monday 10:00 hour
+    for week, count in enumerate([4, 8]):
+        start = monday + timedelta(weeks=week)
+        for i in range(count):
+            store.observe("site_001", "auth_failure", start + timedelta(minutes=i))
+        store.roll(start + timedelta(hours=1))
+
+    mean, std, samples = store.baseline("site_001", "auth_failure", monday)
+    assert samples == 2
+    assert mean == pytest.approx(6.0)
+    assert std > 0
+
+    # Quiet hours in between were folded as zeros
+    quiet = store.baseline("site_001", "auth_failure", monday + timedelta(hours=1))
+    assert quiet[0] == 0.0
+    assert quiet[2] >= 1
+
+
+def test_anomaly_rule_triggers_above_baseline(app, init_database):
+    with app.app_context():
+        now = datetime.utcnow()
+        store = BaselineStore(alpha=0.2)
+        # Three weeks of ~2 events in the current hour-of-week
+        for week in (3, 2, 1):
+            start = now - timedelta(weeks=week)
+            for i in range(2):
+                store.observe("site_001", "auth_failure", start)
+            store.roll(start + timedelta(hours=1))
+        store._dirty = set(range(len(store._index)))
+        store.flush()
+
+        rule = AlertRule(
+            name="Auth failure spike",
+            condition={
+                "type": "anomaly",
+                "event_type": "auth_failure",
+                "sigma": 6,
+                "min_count": 5,
+            },
+        )
+        engine = AlertEngine()
+        assert engine.evaluate_rule(rule) == []
+
+        init_database.session.add_all(
+            Event(
+                source=EventSource.ENDPOINT,
+                event_type="auth_failure",
+                severity=EventSeverity.MEDIUM,
+                description=f"Failed login {i}",
+                site_id="site_001",
+                timestamp=now - timedelta(minutes=i),
+            )
+            for i in range(20)
+        )
+        init_database.session.commit()
+
+        assert len(engine.evaluate_rule(rule)) == 20
+
+
+def test_flushes_from_several_processes_merge(app, init_database):
+    """Two ingest processes counting the same hour both reach the baseline."""
+    with app.app_context():
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        first, second = BaselineStore(alpha=0.5), BaselineStore(alpha=0.5)
+        first.load()
+        second.load()
+
+        for i in range(3):
+            first.observe("site_001", "auth_failure", now)
+        for i in range(4):
+            second.observe("site_001", "auth_failure", now)
+        first.flush()
+        second.flush()
+
+        row = EventBaseline.query.one()
+        assert row.open_count == 7
+        # The second process adopted the merged state
+        assert second._open_count[0] == 7
+
+        first.observe("site_001", "auth_failure", now)
+        first.flush()
+        init_database.session.refresh(row)
+        assert row.open_count == 8
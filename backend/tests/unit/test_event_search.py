@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+from app.services.event_search import (
+    SEARCH_METADATA_KEYS,
+    is_timeout,
+    parse_search,
+    search_vector_sql,
+)
+
+
+def test_parse_search_terms():
+    assert parse_search('ssh "failed password" admin* -root') == [
+        [
+            ("word", "ssh", False),
+            ("phrase", "failed password", False),
+            ("prefix", "admin", False),
+            ("word", "root", True),
+        ]
+    ]
+
+
+def test_parse_search_or_and_negated_phrase():
+    assert parse_search('brute OR -"port scan" OR') == [
+        [("word", "brute", False)],
+        [("phrase", "port scan", True)],
+    ]
+
+
+def test_parse_search_ignores_empty_input():
+    assert parse_search('  "" * ') == [[("word", "*", False)]]
+    assert parse_search("") == []
+
+
+def test_search_vector_weights_description_first():
+    sql = search_vector_sql()
+    assert sql.startswith("setweight(to_tsvector('simple', coalesce(description, '')), 'A')")
+    assert "coalesce(raw_log, '')), 'C')" in sql
+    assert all(f"metadata->>'{key}'" in sql for key in SEARCH_METADATA_KEYS)
+
+
+def test_is_timeout_recognises_cancelled_queries():
+    assert is_timeout(SimpleNamespace(orig=SimpleNamespace(pgcode="57014")))
+    assert not is_timeout(SimpleNamespace(orig=SimpleNamespace(pgcode="40001")))
+    assert not is_timeout(RuntimeError("boom"))
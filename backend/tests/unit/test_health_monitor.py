@@ -0,0 +1,83 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from app.routes.dashboard import _glpi_alive
+from app.services import health_monitor as monitor_module
+from app.services.health_monitor import HealthMonitor, health_monitor
+
+
+def failing(timeout):
+    raise ConnectionError("connection refused")
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    fakes = {"glpi": lambda t: None, "wazuh": failing, "redis": lambda t: None}
+    monkeypatch.setattr(monitor_module, "PROBES", {**monitor_module.PROBES, **fakes})
+    return fakes
+
+
+def test_results_and_bounded_history(app, probes, monkeypatch):
+    monkeypatch.setitem(app.config, "HEALTH_HISTORY_SIZE", 3)
+    monitor = HealthMonitor()
+    for _ in range(5):
+        monitor.check_all()
+
+    checks = monitor.snapshot()
+    assert checks["glpi"]["ok"] is True and checks["glpi"]["error"] is None
+    assert checks["wazuh"]["ok"] is False
+    assert "connection refused" in checks["wazuh"]["error"]
+    assert checks["database"]["ok"] is True
+    assert len(checks["redis"]["history"]) == 3
+    assert checks["redis"]["latency_ms"] >= 0
+
+
+def test_handlers_only_read_the_snapshot(app, client, probes, monkeypatch):
+    monkeypatch.setattr(health_monitor, "_history", {})
+    calls = []
+    monkeypatch.setitem(monitor_module.PROBES, "glpi", lambda t: calls.append(t))
+
+    assert _glpi_alive() is False  # not probed yet: no inline probe either
+    assert calls == []
+    body = client.get("/health/deep").get_json()
+    assert body["checks"]["glpi"]["ok"] is None
+
+    health_monitor.check_all()
+    assert _glpi_alive() is True
+    response = client.get("/health/deep")
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "degraded"  # wazuh is down
+
+    monkeypatch.setitem(monitor_module.PROBES, "database", failing)
+    health_monitor.check("database")
+    assert client.get("/health/deep").status_code == 503
+
+
+def test_hung_probe_does_not_hold_back_the_others(app, probes, monkeypatch):
+    monkeypatch.setitem(app.config, "HEALTH_CHECK_TIMEOUT", 0.1)
+    release = threading.Event()
+    monkeypatch.setitem(monitor_module.PROBES, "database", lambda t: release.wait(5))
+    monitor = HealthMonitor()
+    try:
+        results = monitor.check_all()
+    finally:
+        release.set()
+
+    assert results["database"]["ok"] is False
+    assert "no answer within" in results["database"]["error"]
+    assert results["glpi"]["ok"] is True
+    assert results["wazuh"]["ok"] is False
+
+
+def test_old_results_are_reported_stale(app, probes, monkeypatch):
+    monkeypatch.setitem(app.config, "HEALTH_CHECK_INTERVAL", 30)
+    monitor = HealthMonitor()
+    monitor.check_all()
+    assert monitor.snapshot()["glpi"]["stale"] is False
+
+    old = (datetime.utcnow() - timedelta(minutes=5)).isoformat() + "Z"
+    for history in monitor._history.values():
+        history[-1]["checked_at"] = old
+    checks = monitor.snapshot()
+    assert checks["glpi"]["stale"] is True and checks["glpi"]["ok"] is None
+    assert monitor.latest("glpi")["ok"] is None
@@ -0,0 +1,32 @@
+import time
+import uuid
+from app.models.ids import uuid7
+
+
+def test_uuid7_layout():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert isinstance(value, uuid.UUID)
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before <= value.int >> 80 <= after + 1
+
+
+def test_uuid7_is_monotonic_within_a_millisecond():
+    values = [uuid7() for _ in range(10000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_event_ids_follow_insertion_order(client, init_database):
+    ids = []
+    for i in range(5):
+        response = client.post(
+            "/api/ingest",
+            json={"source": "ids", "event_type": "port_scan", "severity": "low", "description": f"Scan {i}"},
+        )
+        ids.append(uuid.UUID(response.get_json()["id"]))
+    assert ids == sorted(ids)
+    assert {i.version for i in ids} == {7}
@@ -0,0 +1,60 @@
+from datetime import date
+from app.services.partitions import (
+    _period,
+    drop_expired_partitions,
+    ensure_partitions,
+    is_partitioned,
+    partition_name,
+)
+
+
+def test_daily_and_weekly_periods(app):
+    with app.app_context():
+        assert _period(date(2025, 1, 15)) == (date(2025, 1, 15), date(2025, 1, 16))
+        app.config["EVENTS_PARTITION_INTERVAL"] = "week"
+        # 2025-01-15 was a Wednesday: weekly partitions start on Monday
+        assert _period(date(2025, 1, 15)) == (date(2025, 1, 13), date(2025, 1, 20))
+    assert partition_name(date(2025, 1, 13)) == "events_p20250113"
+
+
+def test_partition_maintenance_is_a_no_op_without_postgresql(app, init_database):
+    assert is_partitioned() is False
+    assert ensure_partitions() == []
+    assert drop_expired_partitions(30) == []
+
+
+def test_event_lookup_by_id_with_composite_key(client, init_database):
+    created = client.post(
+        "/api/ingest",
+        json={"source": "ids", "event_type": "port_scan", "severity": "low", "description": "Scan"},
+    ).get_json()
+
+    assert client.get(f"/api/events/{created['id']}").get_json()["id"] == created["id"]
+    response = client.patch(f"/api/events/{created['id']}/status", json={"status": "resolved"})
+    assert response.get_json()["status"] == "resolved"
+
+
+def test_cleanup_only_deletes_old_resolved_events(app, init_database, monkeypatch):
+    from datetime import datetime, timedelta
+    from app import db
+    from app.models import Event, EventSeverity, EventSource, EventStatus
+    from app.tasks import cleanup_old_events
+
+    monkeypatch.setattr("app.tasks.app", app)
+    old = datetime.utcnow() - timedelta(days=120)
+    for status in (EventStatus.RESOLVED, EventStatus.NEW, EventStatus.INVESTIGATING):
+        db.session.add(
+            Event(
+                timestamp=old,
+                source=EventSource.IDS,
+                event_type="port_scan",
+                severity=EventSeverity.LOW,
+                description=status.value,
+                status=status,
+                updated_at=old,
+            )
+        )
+    db.session.commit()
+
+    assert cleanup_old_events(days=90) == {"deleted_count": 1}
+    assert sorted(e.description for e in Event.query.all()) == ["investigating", "new"]
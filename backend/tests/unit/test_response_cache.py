@@ -0,0 +1,151 @@
+import threading
+import time
+import pytest
+from app.services.response_cache import ResponseCache, response_cache
+
+
+@pytest.fixture
+def cache_config(app):
+    app.config.update(
+        DASHBOARD_CACHE_ENABLED=True,
+        DASHBOARD_CACHE_TTL=30,
+        DASHBOARD_CACHE_MIN_TTL=0,
+        DASHBOARD_CACHE_REDIS=False,
+        DASHBOARD_CACHE_SHARED_VERSION=False,
+    )
+    response_cache.clear()
+    yield app.config
+    response_cache.clear()
+
+
+def test_concurrent_misses_compute_once(app, cache_config):
+    cache = ResponseCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return '{"ok": true}', 200
+
+    def worker(results):
+        with app.app_context():
+            results.append(cache.get_or_compute("/api/dashboard/stats?", compute))
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(state for _, state in results) == ["HIT"] * 7 + ["MISS"]
+
+
+def test_ingest_version_invalidates_entries(app, cache_config):
+    cache = ResponseCache()
+    compute = lambda: ('{"n": 1}', 200)
+
+    assert cache.get_or_compute("k", compute)[1] == "MISS"
+    assert cache.get_or_compute("k", compute)[1] == "HIT"
+
+    cache.bump_version()
+    assert cache.get_or_compute("k", compute)[1] == "MISS"
+
+    # Within the minimum TTL an entry is served even after an ingest
+    cache_config["DASHBOARD_CACHE_MIN_TTL"] = 60
+    cache.bump_version()
+    assert cache.get_or_compute("k", compute)[1] == "HIT"
+
+
+def test_errors_are_not_cached(app, cache_config):
+    cache = ResponseCache()
+    compute = lambda: ('{"error": "boom"}', 500)
+
+    assert cache.get_or_compute("k", compute)[1] == "MISS"
+    assert cache.get_or_compute("k", compute)[1] == "MISS"
+
+
+def test_dashboard_route_is_cached_until_ingest(client, init_database, cache_config):
+    first = client.get("/api/dashboard/sites?b=2&a=1")
+    second = client.get("/api/dashboard/sites?a=1&b=2")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+
+    client.post(
+        "/api/ingest",
+        json={
+            "source": "firewall",
+            "event_type": "port_scan",
+            "severity": "high",
+            "description": "Scan",
+            "site_id": "site_001",
+        },
+    )
+    third = client.get("/api/dashboard/sites?a=1&b=2")
+    assert third.headers["X-Cache"] == "MISS"
+    assert third.get_json()["sites"][0]["site_id"] == "site_001"
+
+
+def test_version_is_bumped_once_rollups_are_flushed(client, init_database, cache_config, monkeypatch):
+    from app.services.rollups import rollup_buffer
+
+    # Background merger that has not run yet
+    monkeypatch.setattr(rollup_buffer, "after_write", lambda: None)
+    version = response_cache.current_version()
+    client.post(
+        "/api/ingest",
+        json={"source": "firewall", "event_type": "port_scan", "severity": "high", "description": "Scan"},
+    )
+    assert response_cache.current_version() == version
+
+    rollup_buffer.flush()
+    assert response_cache.current_version() == version + 1
+
+
+def test_replica_entries_expire_after_the_replica_lag(app, cache_config):
+    from flask import g
+
+    cache = ResponseCache()
+    cache_config["REPLICA_MAX_LAG"] = 5
+    compute = lambda: ('{"n": 1}', 200)
+
+    with app.test_request_context():
+        g.replica_key = "replica_0"
+        entry, state = cache.get_or_compute("k", compute)
+        assert (state, entry["max_age"]) == ("MISS", 5)
+
+        entry["created"] -= 10  # same version, but older than the lag
+        assert cache.get_or_compute("k", compute)[1] == "MISS"
+
+
+class FakeRedis:
+    """The part of redis.Redis the ingest version uses."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+def test_worker_bumps_reach_other_processes(app, cache_config, monkeypatch):
+    """A version bump in a Celery worker invalidates the web process's entries."""
+    import redis
+
+    shared = FakeRedis()
+    monkeypatch.setattr(redis.Redis, "from_url", lambda url, **kwargs: shared)
+    cache_config["DASHBOARD_CACHE_SHARED_VERSION"] = True
+    web, worker = ResponseCache(), ResponseCache()
+    compute = lambda: ('{"n": 1}', 200)
+
+    with app.app_context():
+        assert web.get_or_compute("k", compute)[1] == "MISS"
+        assert web.get_or_compute("k", compute)[1] == "HIT"
+
+        worker.bump_version()
+        assert web.get_or_compute("k", compute)[1] == "MISS"
@@ -0,0 +1,143 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.models import Event, EventSeverity, EventSource, EventStatus
+from app.services.rule_dsl import compile_expression, RuleSyntaxError
+
+
+def make_event(**overrides):
+    fields = dict(
+        source=EventSource.FIREWALL,
+        event_type="auth_failure",
+        severity=EventSeverity.HIGH,
+        status=EventStatus.NEW,
+        description="Failed SSH login",
+        raw_log="sshd[1234]: Failed password for root from 10.0.0.5",
+        site_id="site_001",
+        event_metadata={"source_ip": "10.0.0.5", "net": {"dest_port": 22}},
+    )
+    fields.update(overrides)
+    return Event(**fields)
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ('event_type = "auth_failure"', True),
+        ('event_type IN ("port_scan", "auth_failure") AND source = "firewall"', True),
+        ('NOT site_id = "site_001"', False),
+        ('site_id NOT IN ("site_002")', True),
+        ('severity >= "high"', True),
+        ('severity > "high"', False),
+        ("metadata.net.dest_port < 1024", True),
+        ('metadata.source_ip = "10.0.0.5" OR event_type = "malware"', True),
+        (r'raw_log ~ "sshd\\[\\d+\\]"', True),
+        ("metadata.missing > 3", False),
+        ("NOT metadata.missing > 3", False),
+        ("assigned_to = null", True),
+        # Numbers compared with strings as their JSON text, like ->>
+        ('metadata.net.dest_port IN ("22", "80")', True),
+        ("metadata.source_ip < 1024", False),
+        ("NOT metadata.source_ip < 1024", False),
+    ],
+)
+def test_predicate(expression, expected):
+    assert compile_expression(expression).matches(make_event()) is expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        'event_type = "x" AND',
+        'unknown_field = "x"',
+        'severity = "urgent"',
+        'raw_log ~ "("',
+        'event_type NOT "x"',
+        'metadata.port IN (22, "ssh")',
+    ],
+)
+def test_syntax_errors(expression):
+    with pytest.raises(RuleSyntaxError):
+        compile_expression(expression)
+
+
+@pytest.mark.parametrize("expression", [["event_type", "=", "x"], {"event_type": "x"}, 3, None])
+def test_non_string_expressions_are_syntax_errors(expression):
+    with pytest.raises(RuleSyntaxError):
+        compile_expression(expression)
+
+
+def test_documented_regex_rule_matches_sshd_logs():
+    # As written in docs/reference.md: regex escapes are not string escapes
+    expression = compile_expression(
+        r'event_type IN ("auth_failure", "port_scan") AND severity >= "high"'
+        r' AND (metadata.dest_port < 1024 OR raw_log ~ "sshd\[\d+\]")'
+    )
+    assert expression.matches(make_event(raw_log="sshd[1234]: Failed password"))
+    assert not expression.matches(make_event(raw_log="sshd[d+]: Failed password"))
+
+
+def test_quotes_and_backslashes_are_escapes():
+    assert compile_expression(r'description = "say \"hi\" \\o/"').matches(
+        make_event(description='say "hi" \\o/')
+    )
+
+
+def test_compiled_expression_is_cached():
+    assert compile_expression('site_id = "a"') is compile_expression('site_id = "a"')
+
+
+def test_sql_clause_matches_predicate(app, init_database):
+    with app.app_context():
+        init_database.session.add_all(
+            [
+                make_event(),
+                make_event(site_id="site_002", severity=EventSeverity.LOW),
+                make_event(event_metadata={"net": {"dest_port": 8080}}),
+            ]
+        )
+        init_database.session.commit()
+
+        expression = compile_expression(
+            'severity >= "medium" AND metadata.net.dest_port < 1024 AND raw_log ~ "sshd"'
+        )
+        rows = Event.query.filter(expression.clause).all()
+        assert len(rows) == 1
+        assert all(expression.matches(e) for e in rows)
+        assert sum(expression.matches(e) for e in Event.query.all()) == 1
+
+
+def test_metadata_values_of_another_type_match_neither_way(app, init_database):
+    """SQL and Python agree on values that are not of the compared type."""
+    with app.app_context():
+        init_database.session.add_all(
+            [
+                make_event(event_metadata={"port": 22}),
+                make_event(event_metadata={"port": "22"}),
+                make_event(event_metadata={"port": "ssh"}),
+                make_event(event_metadata={"port": True}),
+            ]
+        )
+        init_database.session.commit()
+        events = Event.query.all()
+
+        for text, expected in [
+            ("metadata.port < 1024", [22]),
+            ("NOT metadata.port < 1024", []),
+            ("metadata.port IN (22, 23)", [22]),
+            ('metadata.port IN ("ssh", "http")', ["ssh"]),
+            ("metadata.port = true", [True]),
+        ]:
+            expression = compile_expression(text)
+            rows = Event.query.filter(expression.clause).all()
+            assert sorted(map(repr, (e.event_metadata["port"] for e in rows))) == sorted(
+                map(repr, expected)
+            ), text
+            assert [e for e in events if expression.matches(e)] == rows, text
+
+
+def test_numeric_metadata_casts_are_guarded_on_postgresql():
+    clause = compile_expression("metadata.port < 1024").clause
+    sql = str(clause.compile(dialect=postgresql.dialect()))
+    assert "CASE WHEN jsonb_typeof((events.metadata -> " in sql
+    assert "AS FLOAT) END <" in sql
@@ -0,0 +1,135 @@
+import random
+from datetime import datetime, timedelta
+from collections import Counter
+from app import db
+from app.models import Event, EventSeverity, EventSource
+from app.services.sketches import (
+    TOPK,
+    HyperLogLog,
+    SpaceSaving,
+    rebuild_sketches,
+    sketch_store,
+)
+
+
+def _stream(seed=7, n=5000):
+    rng = random.Random(seed)
+    heavy = [f"10.0.0.{i}" for i in range(5)]
+    return [
+        rng.choice(heavy) if rng.random() < 0.6 else f"192.168.{rng.randrange(50)}.{rng.randrange(250)}"
+        for _ in range(n)
+    ]
+
+
+def test_space_saving_is_exact_below_capacity():
+    sketch = SpaceSaving(capacity=10)
+    for item in ["a", "b", "a", "c", "a", "b"]:
+        sketch.offer(item)
+
+    top = sketch.top(2)
+    assert [(t["value"], t["count"], t["error"]) for t in top] == [("a", 3, 0), ("b", 2, 0)]
+    assert sketch.bound() == 0
+
+
+def test_space_saving_error_bounds_hold():
+    stream = _stream()
+    truth = Counter(stream)
+    sketch = SpaceSaving(capacity=50)
+    for item in stream:
+        sketch.offer(item)
+
+    for item, (count, error, _, _) in sketch.counters.items():
+        assert count - error <= truth[item] <= count
+    for item, true_count in truth.items():
+        if item not in sketch.counters:
+            assert true_count <= sketch.bound()
+    assert {t["value"] for t in sketch.top(5)} == {f"10.0.0.{i}" for i in range(5)}
+
+
+def test_merged_sketches_match_a_single_pass():
+    stream = _stream(seed=11, n=6000)
+    truth = Counter(stream)
+    merged = SpaceSaving(capacity=50)
+    for start in range(0, len(stream), 1000):
+        hourly = SpaceSaving(capacity=50)
+        for item in stream[start:start + 1000]:
+            hourly.offer(item)
+        merged.merge(SpaceSaving.from_bytes(hourly.to_bytes()))
+
+    for item, (count, error, _, _) in merged.counters.items():
+        assert count - error <= truth[item] <= count
+    for item, true_count in truth.items():
+        if item not in merged.counters:
+            assert true_count <= merged.bound()
+    assert {t["value"] for t in merged.top(5)} == {f"10.0.0.{i}" for i in range(5)}
+
+
+def test_hyperloglog_estimates_within_error():
+    sketch = HyperLogLog(precision=12)
+    for i in range(20000):
+        sketch.add(f"10.{i // 65536}.{i // 256 % 256}.{i % 256}")
+        sketch.add("203.0.113.7")
+
+    assert abs(sketch.count() - 20001) <= 20001 * 4 * sketch.relative_error
+
+
+def test_hyperloglog_small_counts_are_exact_enough():
+    sketch = HyperLogLog(precision=12)
+    for site in ["site_001", "site_002", "site_003", "site_001"]:
+        sketch.add(site)
+    assert sketch.count() == 3
+
+
+def test_hyperloglog_merge_is_a_union():
+    monday, tuesday = HyperLogLog(), HyperLogLog()
+    for i in range(3000):
+        monday.add(f"user{i}")
+    for i in range(2000, 6000):
+        tuesday.add(f"user{i}")
+
+    week = HyperLogLog.from_bytes(monday.to_bytes())
+    week.merge(tuesday)
+    assert abs(week.count() - 6000) <= 6000 * 4 * week.relative_error
+    assert len(week.to_bytes()) < 4096
+
+
+def test_hyperloglog_downsample_matches_a_sketch_built_at_that_precision():
+    fine, coarse = HyperLogLog(precision=12), HyperLogLog(precision=10)
+    for i in range(5000):
+        fine.add(f"host{i}")
+        coarse.add(f"host{i}")
+
+    assert fine.downsample(10).registers == coarse.registers
+
+
+def test_hyperloglog_merge_across_precisions():
+    """Buckets written before a precision change still merge."""
+    old, new = HyperLogLog(precision=10), HyperLogLog(precision=12)
+    for i in range(3000):
+        old.add(f"user{i}")
+    for i in range(2000, 6000):
+        new.add(f"user{i}")
+
+    new.merge(old)
+    assert new.precision == 10
+    assert abs(new.count() - 6000) <= 6000 * 4 * new.relative_error
+
+
+def test_rebuild_sketches_from_events(app, init_database):
+    for ip in ["203.0.113.7", "203.0.113.7", "198.51.100.2"]:
+        db.session.add(
+            Event(
+                source=EventSource.FIREWALL,
+                event_type="port_scan",
+                severity=EventSeverity.HIGH,
+                description="Scan",
+                event_metadata={"source_ip": ip},
+            )
+        )
+    db.session.commit()
+
+    assert rebuild_sketches(days=1) == 2
+    top = sketch_store.window(TOPK, "ip", datetime.utcnow() - timedelta(hours=1)).top(1)
+    assert top[0]["value"] == "203.0.113.7"
+    assert top[0]["count"] == 2
+    assert top[0]["high"] == 2
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+from app.services.timeseries import fill_gaps, floor_bucket, lttb
+
+
+def test_floor_bucket_aligns_on_epoch():
+    ts = datetime(2024, 5, 1, 10, 47, 12)
+    assert floor_bucket(ts, timedelta(minutes=5)) == datetime(2024, 5, 1, 10, 45)
+    assert floor_bucket(ts, timedelta(hours=1)) == datetime(2024, 5, 1, 10)
+    assert floor_bucket(ts, timedelta(days=1)) == datetime(2024, 5, 1)
+    aware = datetime(2024, 5, 1, 12, 47, tzinfo=timezone(timedelta(hours=2)))
+    assert floor_bucket(aware, timedelta(minutes=30)) == datetime(2024, 5, 1, 10, 30)
+
+
+def test_fill_gaps_covers_the_whole_window():
+    start = datetime(2024, 5, 1, 10, 3)
+    counts = {datetime(2024, 5, 1, 10, 5): 4, datetime(2024, 5, 1, 10, 20): 1}
+
+    series = fill_gaps(counts, start, datetime(2024, 5, 1, 10, 24), timedelta(minutes=5))
+
+    assert [t.minute for t, _ in series] == [0, 5, 10, 15, 20]
+    assert [c for _, c in series] == [0, 4, 0, 0, 1]
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    points = [(i, 0) for i in range(1000)]
+    points[420] = (420, 50)
+    points[777] = (777, -30)
+
+    sampled = lttb(points, 50, x=lambda p: p[0], y=lambda p: p[1])
+
+    assert len(sampled) == 50
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert (420, 50) in sampled and (777, -30) in sampled
+    assert [p[0] for p in sampled] == sorted(p[0] for p in sampled)
+
+
+def test_lttb_leaves_short_series_alone():
+    points = [(i, i) for i in range(10)]
+    assert lttb(points, 10, x=lambda p: p[0], y=lambda p: p[1]) == points
+    assert lttb(points, 2, x=lambda p: p[0], y=lambda p: p[1]) == points
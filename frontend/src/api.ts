@@ -1,5 +1,5 @@
 import axios from 'axios'
-import { SecurityEvent, AlertRule, DashboardStats, SiteSummary, Endpoint, AlertComment, Analyst, Playbook, PlaybookExecution, GLPIAsset, Incident, HeatmapEntry, TopIP, SourceDetail } from './types'
+import { SecurityEvent, AlertRule, DashboardStats, SiteSummary, Endpoint, AlertComment, Analyst, Playbook, PlaybookExecution, GLPIAsset, Incident, HeatmapEntry, TopIP, SourceDetail, DashboardOverview } from './types'
 
 // ── Module-level client cache ─────────────────────────────────────────────────
 // Survives React component unmounts — data persists for the lifetime of the SPA
@@ -24,8 +24,17 @@ const api = axios.create({
 })
 
 // Events
+// With `paginate: 'keyset'`, pages are cursor-based (pass next_cursor /
+// prev_cursor back as `cursor`) and `total` is only returned when `count` is
+// requested; otherwise offset pages with `total` and `pages`.
+// `highlight` adds a `snippet` to search results on PostgreSQL;
+// `mode: 'contains'` searches a literal substring (3 characters minimum).
+// Events omit raw_log and metadata unless listed in `fields` (or 'all')
 export async function fetchEvents(params?: {
   page?: number
+  paginate?: 'keyset'
+  cursor?: string
+  count?: 'exact' | 'estimate'
   per_page?: number
   limit?: number
   status?: string
@@ -33,7 +42,16 @@ export async function fetchEvents(params?: {
   source?: string
   site_id?: string
   search?: string
-}): Promise<{ events: SecurityEvent[]; total: number; pages: number }> {
+  mode?: 'contains'
+  highlight?: boolean
+  fields?: string
+}): Promise<{
+  events: SecurityEvent[]
+  next_cursor?: string | null
+  prev_cursor?: string | null
+  total?: number
+  pages?: number
+}> {
   const { data } = await api.get('/events', { params })
   return data
 }
@@ -147,12 +165,14 @@ export async function fetchDashboardStatsWithRange(timeRange: string): Promise<D
   return data
 }
 
-export async function fetchDashboardTrendsWithRange(timeframe: string): Promise<{
-  hourly: Array<{ hour: string; count: number }>
+export async function fetchDashboardTrendsWithRange(timeframe: string, maxPoints?: number): Promise<{
+  hourly: Array<{ hour: string; timestamp: string; count: number }>
   daily: Array<{ date: string; critical: number; high: number; medium: number; low: number }>
   timeframe: string
 }> {
-  const { data } = await api.get('/dashboard/trends', { params: { timeframe } })
+  const { data } = await api.get('/dashboard/trends', {
+    params: maxPoints ? { timeframe, max_points: maxPoints } : { timeframe },
+  })
   return data
 }
 
@@ -166,6 +186,17 @@ export async function fetchTopIPs(hours?: number): Promise<{ top_ips: TopIP[] }>
   return data
 }
 
+// All dashboard panels in one request, computed in parallel server-side
+export async function fetchDashboardOverview(params: {
+  timeframe?: string
+  max_points?: number
+  days?: number
+  hours?: number
+}): Promise<DashboardOverview> {
+  const { data } = await api.get('/dashboard/overview', { params })
+  return data
+}
+
 // Source details — cached 30 s client-side (matches server GLPI probe cache TTL)
 export function fetchSourceDetails(): Promise<{ sources: Record<string, SourceDetail> }> {
   return _cached('source-details', 30 * 1000, () => api.get('/dashboard/source-details').then(r => r.data))
@@ -24,6 +24,13 @@ export default function EventCard({ event, onClick }: EventCardProps) {
           </div>
           <h3 className="font-medium text-white truncate">{event.event_type}</h3>
           <p className="text-gray-400 text-sm mt-1 line-clamp-2">{event.description}</p>
+          {event.snippet && (
+            // Escaped by the API, only the <mark> tags are markup
+            <p
+              className="text-gray-500 text-xs mt-1 line-clamp-2 [&_mark]:bg-yellow-500/30 [&_mark]:text-yellow-200"
+              dangerouslySetInnerHTML={{ __html: event.snippet }}
+            />
+          )}
         </div>
         <div className="text-right text-sm text-gray-400">
           <div>{format(new Date(event.timestamp), 'HH:mm:ss', { locale: fr })}</div>
@@ -2,7 +2,7 @@ import { AreaChart, Area, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'rec
 import clsx from 'clsx'
 import { useLanguage } from '../context/LanguageContext'
 
-type TimeRange = '5m' | '15m' | '30m' | '1h' | '6h' | '24h' | '7d' | '30d'
+type TimeRange = '5m' | '15m' | '30m' | '1h' | '6h' | '24h' | '7d' | '30d' | '90d' | '1y'
 
 interface EventVolumeChartProps {
     data: Array<{ time: string; value: number }>
@@ -21,6 +21,8 @@ const timeRangeOptions: Array<{ value: TimeRange; label: string }> = [
     { value: '24h', label: '24h' },
     { value: '7d', label: '7d' },
     { value: '30d', label: '30d' },
+    { value: '90d', label: '90d' },
+    { value: '1y', label: '1y' },
 ]
 
 export default function EventVolumeChart({
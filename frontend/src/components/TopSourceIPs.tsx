@@ -7,20 +7,27 @@ import { useLanguage } from '../context/LanguageContext'
 
 interface Props {
   refreshTrigger?: number
+  // Provided by the parent (e.g. from /dashboard/overview): skips the fetch
+  data?: TopIP[] | null
 }
 
-export default function TopSourceIPs({ refreshTrigger }: Props) {
+export default function TopSourceIPs({ refreshTrigger, data }: Props) {
   const { t } = useLanguage()
   const [ips, setIps] = useState<TopIP[]>([])
   const [loading, setLoading] = useState(true)
   const [activePopover, setActivePopover] = useState<string | null>(null)
 
   useEffect(() => {
+    if (data) {
+      setIps(data)
+      setLoading(false)
+      return
+    }
     fetchTopIPs(24)
       .then((data) => setIps(data.top_ips || []))
       .catch(() => setIps([]))
       .finally(() => setLoading(false))
-  }, [refreshTrigger])
+  }, [refreshTrigger, data])
 
   // Close popover on click outside
   useEffect(() => {
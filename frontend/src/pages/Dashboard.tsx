@@ -1,8 +1,8 @@
 import { useEffect, useState, useCallback } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { Activity, AlertTriangle, Monitor, Users, Radio, Pause, ShieldAlert } from 'lucide-react'
-import { fetchDashboardStats, fetchDashboardTrendsWithRange, fetchEvents, fetchDashboardHeatmap } from '../api'
-import { DashboardStats, SecurityEvent, HeatmapEntry } from '../types'
+import { fetchDashboardOverview, fetchDashboardTrendsWithRange, fetchEvents } from '../api'
+import { DashboardStats, DashboardDelta, SecurityEvent, HeatmapEntry, TopIP } from '../types'
 import StatCard from '../components/StatCard'
 import EventVolumeChart from '../components/EventVolumeChart'
 import AlertsBySourceChart from '../components/AlertsBySourceChart'
@@ -15,15 +15,25 @@ import ActivityHeatmap from '../components/ActivityHeatmap'
 import TopSourceIPs from '../components/TopSourceIPs'
 import { ToastContainer, toast } from '../components/Toast'
 import { useLanguage } from '../context/LanguageContext'
+import { useSocket } from '../hooks/useSocket'
 import clsx from 'clsx'
 
 interface DashboardProps {
   realtimeEvents: SecurityEvent[]
 }
 
-type TimeRange = '5m' | '15m' | '30m' | '1h' | '6h' | '24h' | '7d' | '30d'
+type TimeRange = '5m' | '15m' | '30m' | '1h' | '6h' | '24h' | '7d' | '30d' | '90d' | '1y'
 
 // Source colors for donut chart — matches real infrastructure
+// Points kept by the server (LTTB) for the event volume chart, whatever the timeframe
+const TREND_MAX_POINTS = 120
+
+// Live mode resync: KPIs are pushed as deltas while the socket is connected,
+// the full snapshot is only refetched to pick up what deltas cannot carry
+// (trends, heatmap, events leaving the 24h window)
+const POLL_INTERVAL_MS = 10000
+const RESYNC_INTERVAL_MS = 60000
+
 const SOURCE_COLORS: Record<string, string> = {
   firewall: '#ef4444',    // red
   endpoint: '#3b82f6',    // blue
@@ -34,12 +44,14 @@ const SOURCE_COLORS: Record<string, string> = {
 export default function Dashboard({ realtimeEvents }: DashboardProps) {
   const navigate = useNavigate()
   const { t, locale } = useLanguage()
+  const { socket, connected } = useSocket()
   const [stats, setStats] = useState<DashboardStats | null>(null)
   const [trends, setTrends] = useState<{
     hourly: Array<{ hour: string; count: number }>
     daily: Array<{ date: string; critical: number; high: number; medium: number; low: number }>
   } | null>(null)
   const [heatmapData, setHeatmapData] = useState<HeatmapEntry[]>([])
+  const [topIPs, setTopIPs] = useState<TopIP[] | null>(null)
   const [criticalAlerts, setCriticalAlerts] = useState<SecurityEvent[]>([])
   const [loading, setLoading] = useState(true)
   const [chartLoading, setChartLoading] = useState(false)
@@ -69,16 +81,21 @@ export default function Dashboard({ realtimeEvents }: DashboardProps) {
         fetchEventsParams.end_time = currentTimeSlice.end
       }
 
-      const [statsData, trendsData, eventsData, heatmapResult] = await Promise.all([
-        fetchDashboardStats(),
-        fetchDashboardTrendsWithRange(currentTimeRange),
+      const [overview, eventsData] = await Promise.all([
+        fetchDashboardOverview({
+          timeframe: currentTimeRange,
+          max_points: TREND_MAX_POINTS,
+          days: currentHeatmapDays,
+          hours: 24,
+        }),
         fetchEvents(fetchEventsParams),
-        fetchDashboardHeatmap(currentHeatmapDays),
       ])
-      setStats(statsData)
-      setTrends(trendsData)
+      // Sections that failed or timed out are null: keep showing the previous data
+      if (overview.stats) setStats(overview.stats)
+      if (overview.trends) setTrends(overview.trends)
+      if (overview.heatmap) setHeatmapData(overview.heatmap.heatmap || [])
+      if (overview.top_ips) setTopIPs(overview.top_ips.top_ips || [])
       setCriticalAlerts(eventsData.events || [])
-      setHeatmapData(heatmapResult.heatmap || [])
       setRefreshCounter((c: number) => c + 1)
     } catch (error) {
       console.error('Failed to load dashboard data:', error)
@@ -91,23 +108,41 @@ export default function Dashboard({ realtimeEvents }: DashboardProps) {
     loadData()
   }, [loadData])
 
-  // Live mode auto-refresh
+  // Live mode auto-refresh: poll only when KPI deltas are not being pushed
   useEffect(() => {
     if (!isLiveMode) return
 
     const interval = setInterval(() => {
       loadData()
-    }, 10000) // Refresh every 10 seconds in live mode
+    }, connected ? RESYNC_INTERVAL_MS : POLL_INTERVAL_MS)
 
     return () => clearInterval(interval)
-  }, [isLiveMode, loadData])
+  }, [isLiveMode, loadData, connected])
+
+  // Live mode KPI deltas pushed by the server
+  useEffect(() => {
+    if (!socket || !isLiveMode) return
+
+    const subscribe = () => socket.emit('subscribe_dashboard')
+    const handleDelta = (delta: DashboardDelta) => {
+      setStats((prev: DashboardStats | null) => prev && applyDashboardDelta(prev, delta))
+    }
+    subscribe()
+    socket.on('connect', subscribe) // rooms are lost on reconnect
+    socket.on('dashboard_delta', handleDelta)
+    return () => {
+      socket.off('connect', subscribe)
+      socket.off('dashboard_delta', handleDelta)
+      socket.emit('unsubscribe_dashboard')
+    }
+  }, [socket, isLiveMode])
 
   // Handle time range change
   const handleTimeRangeChange = async (range: TimeRange) => {
     setTimeRange(range)
     setChartLoading(true)
     try {
-      const trendsData = await fetchDashboardTrendsWithRange(range)
+      const trendsData = await fetchDashboardTrendsWithRange(range, TREND_MAX_POINTS)
       setTrends(trendsData)
     } catch (error) {
       console.error('Failed to load trends:', error)
@@ -324,8 +359,8 @@ export default function Dashboard({ realtimeEvents }: DashboardProps) {
         </div>
       </div>
 
-      {/* Severity Trend (visible uniquement pour 7d/30d) */}
-      {(timeRange === '7d' || timeRange === '30d') && (
+      {/* Severity Trend (visible uniquement pour 7d et plus) */}
+      {['7d', '30d', '90d', '1y'].includes(timeRange) && (
         <SeverityTrendChart data={trends?.daily ?? []} loading={chartLoading} />
       )}
 
@@ -350,7 +385,7 @@ export default function Dashboard({ realtimeEvents }: DashboardProps) {
         </div>
         <div className="space-y-4">
           <EndpointStatusCard maxDisplay={5} />
-          <TopSourceIPs refreshTrigger={refreshCounter} />
+          <TopSourceIPs refreshTrigger={refreshCounter} data={topIPs} />
         </div>
       </div>
 
@@ -374,6 +409,27 @@ export default function Dashboard({ realtimeEvents }: DashboardProps) {
 }
 
 // Helper functions
+function addCounts(counts: Record<string, number>, delta: Record<string, number>): Record<string, number> {
+  const result = { ...counts }
+  for (const [key, value] of Object.entries(delta)) {
+    result[key] = (result[key] || 0) + value
+  }
+  return result
+}
+
+function applyDashboardDelta(stats: DashboardStats, delta: DashboardDelta): DashboardStats {
+  return {
+    ...stats,
+    total_events: stats.total_events + delta.events,
+    events_last_24h: stats.events_last_24h + delta.events,
+    active_alerts: stats.active_alerts + delta.active_alerts,
+    critical_open: stats.critical_open + delta.critical_open,
+    by_severity: addCounts(stats.by_severity, delta.by_severity),
+    by_source: addCounts(stats.by_source, delta.by_source),
+    by_status: addCounts(stats.by_status, delta.by_status),
+  }
+}
+
 function formatSourceName(source: string): string {
   const names: Record<string, string> = {
     firewall: 'Firewall',
@@ -2,7 +2,7 @@ import { useEffect, useState } from 'react'
 import { useLocation } from 'react-router-dom'
 import { useRole } from '../context/RoleContext'
 import { Search, Filter, ChevronLeft, ChevronRight, LayoutList, LayoutGrid } from 'lucide-react'
-import { fetchEvents, updateEventStatus } from '../api'
+import { fetchEvent, fetchEvents, updateEventStatus } from '../api'
 import { SecurityEvent, EventStatus } from '../types'
 import EventCard from '../components/EventCard'
 import SeverityBadge from '../components/SeverityBadge'
@@ -20,13 +20,19 @@ export default function Events() {
 
   const [events, setEvents] = useState<SecurityEvent[]>([])
   const [loading, setLoading] = useState(true)
+  // Cursor pagination: `page` is only the displayed position
   const [page, setPage] = useState(1)
+  const [cursor, setCursor] = useState<string | undefined>(undefined)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [prevCursor, setPrevCursor] = useState<string | null>(null)
   const [totalPages, setTotalPages] = useState(1)
   const [selectedEvent, setSelectedEvent] = useState<SecurityEvent | null>(null)
 
   // Filters — pre-populated from navigation state (e.g. from endpoint "View Logs")
   const [viewMode, setViewMode] = useState<'list' | 'grid'>('list')
   const [search, setSearch] = useState('')
+  // 'contains' matches fragments (partial hosts, paths, SRC=10.0.) literally
+  const [searchMode, setSearchMode] = useState<'text' | 'contains'>('text')
   const [siteIdFilter] = useState<string>(locationState?.site_id ?? '')
   const [severityFilter, setSeverityFilter] = useState<string>(locationState?.severity ?? '')
   const [statusFilter, setStatusFilter] = useState<string>('')
@@ -35,22 +41,35 @@ export default function Events() {
 
   useEffect(() => {
     loadEvents()
-  }, [page, perPage, search, siteIdFilter, severityFilter, statusFilter, sourceFilter])
+  }, [cursor, perPage, search, searchMode, siteIdFilter, severityFilter, statusFilter, sourceFilter])
+
+  function resetPage() {
+    setCursor(undefined)
+    setPage(1)
+  }
 
   async function loadEvents() {
     setLoading(true)
     try {
       const data = await fetchEvents({
-        page,
+        paginate: 'keyset',
+        cursor,
+        // Estimated from the query plan, once per filter change
+        count: cursor ? undefined : 'estimate',
         per_page: perPage,
         site_id: siteIdFilter || undefined,
         severity: severityFilter || undefined,
         status: statusFilter || undefined,
         source: sourceFilter || undefined,
-        search: search || undefined,
+        // The API rejects substrings shorter than 3 characters
+        search: searchMode === 'contains' && search.length < 3 ? undefined : search || undefined,
+        mode: searchMode === 'contains' ? 'contains' : undefined,
+        highlight: search && searchMode === 'text' ? true : undefined,
       })
       setEvents(data.events)
-      setTotalPages(data.pages)
+      setNextCursor(data.next_cursor ?? null)
+      setPrevCursor(data.prev_cursor ?? null)
+      if (data.total !== undefined) setTotalPages(Math.max(1, Math.ceil(data.total / perPage)))
     } catch (error) {
       console.error('Failed to load events:', error)
     } finally {
@@ -58,9 +77,17 @@ export default function Events() {
     }
   }
 
+  // The list leaves out the raw log and metadata: load the full event
+  function selectEvent(event: SecurityEvent) {
+    setSelectedEvent(event)
+    fetchEvent(event.id)
+      .then((full) => setSelectedEvent((current) => (current?.id === full.id ? full : current)))
+      .catch((error) => console.error('Failed to load event:', error))
+  }
+
   function handleSearch(e: React.FormEvent) {
     e.preventDefault()
-    setPage(1)
+    resetPage()
     loadEvents()
   }
 
@@ -141,9 +168,18 @@ export default function Events() {
               </div>
             </div>
 
+            <label className="flex items-center gap-2 text-sm text-gray-300">
+              <input
+                type="checkbox"
+                checked={searchMode === 'contains'}
+                onChange={(e) => { setSearchMode(e.target.checked ? 'contains' : 'text'); resetPage() }}
+              />
+              Substring
+            </label>
+
             <CustomSelect
               value={severityFilter}
-              onChange={(v) => { setSeverityFilter(v); setPage(1) }}
+              onChange={(v) => { setSeverityFilter(v); resetPage() }}
               placeholder="All Severities"
               options={[
                 { value: '', label: 'All Severities' },
@@ -156,7 +192,7 @@ export default function Events() {
 
             <CustomSelect
               value={statusFilter}
-              onChange={(v) => { setStatusFilter(v); setPage(1) }}
+              onChange={(v) => { setStatusFilter(v); resetPage() }}
               placeholder="All Status"
               options={[
                 { value: '', label: 'All Status' },
@@ -169,7 +205,7 @@ export default function Events() {
 
             <CustomSelect
               value={sourceFilter}
-              onChange={(v) => { setSourceFilter(v); setPage(1) }}
+              onChange={(v) => { setSourceFilter(v); resetPage() }}
               placeholder="All Sources"
               options={[
                 { value: '', label: 'All Sources' },
@@ -182,7 +218,7 @@ export default function Events() {
 
             <CustomSelect
               value={String(perPage)}
-              onChange={(v) => { setPerPage(Number(v)); setPage(1) }}
+              onChange={(v) => { setPerPage(Number(v)); resetPage() }}
               placeholder="20 / page"
               options={[
                 { value: '10', label: '10 / page' },
@@ -215,7 +251,7 @@ export default function Events() {
               <EventCard
                 key={event.id}
                 event={event}
-                onClick={() => setSelectedEvent(event)}
+                onClick={() => selectEvent(event)}
               />
             ))}
           </div>
@@ -224,18 +260,26 @@ export default function Events() {
         {/* Pagination */}
         <div className="flex items-center justify-center gap-4 mt-6">
           <button
-            onClick={() => setPage((p) => Math.max(1, p - 1))}
-            disabled={page === 1}
+            onClick={() => {
+              if (!prevCursor) return
+              setCursor(prevCursor)
+              setPage((p) => Math.max(1, p - 1))
+            }}
+            disabled={!prevCursor}
             className="p-2 bg-gray-700 rounded-lg disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-600"
           >
             <ChevronLeft className="w-5 h-5" />
           </button>
           <span className="text-gray-400">
-            Page {page} of {totalPages}
+            Page {page} of ~{Math.max(page, totalPages)}
           </span>
           <button
-            onClick={() => setPage((p) => Math.min(totalPages, p + 1))}
-            disabled={page === totalPages}
+            onClick={() => {
+              if (!nextCursor) return
+              setCursor(nextCursor)
+              setPage((p) => p + 1)
+            }}
+            disabled={!nextCursor}
             className="p-2 bg-gray-700 rounded-lg disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-600"
           >
             <ChevronRight className="w-5 h-5" />
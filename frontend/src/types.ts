@@ -9,13 +9,16 @@ export interface SecurityEvent {
   event_type: string
   severity: Severity
   description: string
+  // Left out of /api/events lists unless requested with `fields`
   raw_log?: string
-  metadata: Record<string, unknown>
+  metadata?: Record<string, unknown>
   status: EventStatus
   assigned_to?: string
   site_id?: string
   created_at: string
   updated_at?: string
+  // Search results with highlight: HTML-escaped text with matches in <mark>
+  snippet?: string | null
 }
 
 export interface AlertRule {
@@ -89,6 +92,35 @@ export interface SiteSummary {
   low: number
 }
 
+// Pushed on the 'dashboard' Socket.IO room: counts to add to the snapshot
+export interface DashboardDelta {
+  interval: number
+  // Net change of the event count (ingested minus deleted); eps only counts ingested
+  events: number
+  eps: number
+  by_severity: Record<string, number>
+  by_source: Record<string, number>
+  by_site: Record<string, number>
+  by_status: Record<string, number>
+  active_alerts: number
+  critical_open: number
+}
+
+// /dashboard/overview: a section is null when it failed or timed out
+export interface DashboardOverview {
+  stats: DashboardStats | null
+  trends: {
+    hourly: Array<{ hour: string; timestamp: string; count: number }>
+    daily: Array<{ date: string; critical: number; high: number; medium: number; low: number }>
+    timeframe: string
+  } | null
+  heatmap: { heatmap: HeatmapEntry[], days: number } | null
+  sites: { sites: SiteSummary[] } | null
+  top_ips: { top_ips: TopIP[] } | null
+  source_details: { sources: Record<string, SourceDetail> } | null
+  errors: Record<string, 'timeout' | 'error'>
+}
+
 // GLPI Asset types
 export interface GLPIAsset {
   id: number